@@ -7,30 +7,72 @@
 # with no omitted lines.
 ##################################################################################
 
+import base64
+import json
 import os
+import click
 from flask import Flask, jsonify, request  # ADDED: request for POST
 from flask_cors import CORS
-from sqlalchemy import text
-from datetime import datetime
+from sqlalchemy import text, tuple_
+import calendar
+from datetime import datetime, timedelta, timezone
 
 # Import db and model classes (not 'app') from models
-from models import db, Violation, RiskClassification
-from seed import seed_db
+from models import (
+    db, Violation, RiskClassification, Category, ViolationType, Location, ViolationStatus, month_key
+)
+from seed import seed_db, DEFAULT_SEED
+from instrumentation import init_instrumentation
+from profiling import PROFILE_MODES, init_profiling, profile_job
+from search_index import SEARCH_PAGE_DEFAULT, SEARCH_PAGE_MAX, search_businesses
+from compression import cached_response, init_compression, invalidate_response_cache
+from json_provider import FastJSONProvider, json_rows, requested_format
 
 # ------------------------------------------------------------------------------
 # Create the Flask app here (instead of models.py) to avoid circular imports
 # ------------------------------------------------------------------------------
 app = Flask(__name__)
+# orjson-backed JSON (stdlib fallback); must precede init_instrumentation
+app.json = FastJSONProvider(app)
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(BASE_DIR, 'instance', 'violations.db')
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+# DATABASE_URL lets benchmarks and tooling point the app at another database
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get("DATABASE_URL", f"sqlite:///{db_path}")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# /debug/metrics (Prometheus text) and the per-request JSON log line; off unless
+# DEBUG_METRICS_ENABLED=1, since the API is served with CORS "*"
+app.config['DEBUG_METRICS_ENABLED'] = os.environ.get("DEBUG_METRICS_ENABLED", "0") == "1"
+# Statements slower than this (ms) are logged with EXPLAIN QUERY PLAN; -1 disables
+app.config['SLOW_QUERY_THRESHOLD_MS'] = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+app.config['SLOW_QUERY_LOG'] = os.environ.get("SLOW_QUERY_LOG", os.path.join(BASE_DIR, 'instance', 'slow_queries.log'))
+# /debug/profile endpoints stay disabled unless a token is configured
+app.config['PROFILING_TOKEN'] = os.environ.get("PROFILING_TOKEN")
+app.config['PROFILE_DIR'] = os.environ.get("PROFILE_DIR", os.path.join(BASE_DIR, 'instance', 'profiles'))
+# Parquet snapshots for analytics offload (see snapshot.py)
+app.config['SNAPSHOT_DIR'] = os.environ.get("SNAPSHOT_DIR", os.path.join(BASE_DIR, 'instance', 'snapshots'))
+# Memory-mapped violation columns for batch scoring (see column_store.py)
+app.config['COLUMN_STORE_DIR'] = os.environ.get("COLUMN_STORE_DIR", os.path.join(BASE_DIR, 'instance', 'column_store'))
+
+# gzip/brotli for responses over COMPRESS_MIN_SIZE bytes; cached routes keep
+# their compressed bytes for RESPONSE_CACHE_TTL seconds (see compression.py)
+app.config['COMPRESS_ENABLED'] = os.environ.get("COMPRESS_ENABLED", "1") != "0"
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+app.config['RESPONSE_CACHE_TTL'] = float(os.environ.get("RESPONSE_CACHE_TTL", "60"))
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "64"))
+app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
 
 # Initialize SQLAlchemy with this app
 db.init_app(app)
 
+# Per-request SQL / serialization timing, Server-Timing headers, /debug/metrics
+init_instrumentation(app)
+# Guarded cProfile / sampling capture for the next N requests
+init_profiling(app)
+# Response compression + compressed response cache
+init_compression(app)
+
 # ------------------------------------------------------------------------------
 CORS(app, resources={r"/*": {"origins": "*"}})
 
@@ -38,51 +80,271 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 def home():
     return jsonify({"message": "Fujairah Municipality API is Running"}), 200
 
+def int_arg(name, default):
+    """
+    request.args[name] as an int: `default` when the parameter is absent,
+    None when it is present but not an integer (callers answer 400).
+    """
+    raw = request.args.get(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+# ------------------------------------------------------------------------
+# Violation rows with the dictionary-encoded columns joined back to names
+# ------------------------------------------------------------------------
+def violation_rows_query():
+    return db.session.query(
+        Violation.id,
+        Violation.business_name,
+        ViolationType.name.label("violation_type"),
+        Category.name.label("category"),
+        Violation.severity,
+        Violation.fine,
+        Violation.timestamp,
+        Location.name.label("location"),
+        Violation.month,
+        Violation.resolution_date,
+        Violation.corrective_actions,
+        ViolationStatus.name.label("status")
+    ).join(ViolationType, Violation.violation_type_id == ViolationType.id
+    ).join(Category, Violation.category_id == Category.id
+    ).join(Location, Violation.location_id == Location.id
+    ).join(ViolationStatus, Violation.status_id == ViolationStatus.id)
+
+def serialize_violation(v):
+    return {
+        "id": v.id,
+        "business_name": v.business_name,
+        "violation_type": v.violation_type,
+        "category": v.category,
+        "severity": v.severity,
+        "fine": v.fine,
+        "timestamp": v.timestamp,
+        "location": v.location,
+        "month": v.month,
+        "resolution_date": v.resolution_date,
+        "corrective_actions": v.corrective_actions,
+        "status": v.status
+    }
+
 @app.route('/violations', methods=['GET'])
+@cached_response
 def get_violations():
-    violations = Violation.query.all()
-    out = []
-    for v in violations:
-        out.append({
-            "id": v.id,
-            "business_name": v.business_name,
-            "violation_type": v.violation_type,
-            "category": v.category,
-            "severity": v.severity,
-            "fine": v.fine,
-            "timestamp": v.timestamp.strftime("%Y-%m-%d %H:%M:%S") if v.timestamp else None,
-            "location": v.location,
-            "month": v.month,
-            "resolution_date": v.resolution_date.strftime("%Y-%m-%d %H:%M:%S") if v.resolution_date else None,
-            "corrective_actions": v.corrective_actions,
-            "status": v.status
-        })
-    return jsonify(out)
+    # Same keys as serialize_violation(); rows go to the encoder as tuples
+    return json_rows(violation_rows_query().order_by(Violation.id).all())
+
+RISK_LIST_COLUMNS = (
+    RiskClassification.business_name,
+    RiskClassification.total_violations,
+    RiskClassification.total_fines,
+    RiskClassification.last_violation_date,
+    RiskClassification.risk_level,
+    RiskClassification.weighted_risk_score,
+    RiskClassification.advanced_risk_score,
+    RiskClassification.industry_risk_factor,
+    RiskClassification.violation_frequency_score,
+    RiskClassification.inspection_history,
+    RiskClassification.unpaid_fines,
+    RiskClassification.average_fine,
+    RiskClassification.risk_model_details,
+    RiskClassification.description,
+    RiskClassification.location,
+    RiskClassification.business_type
+)
 
-@app.route('/risk', methods=['GET'])
-def get_risk():
-    data = RiskClassification.query.all()
-    result = []
-    for r in data:
-        result.append({
+# ------------------------------------------------------------------------
+# /risk listing: sort / filter / keyset paging run in SQL
+# ------------------------------------------------------------------------
+RISK_PAGE_PARAMS = ("sort", "order", "q", "risk_level", "business_type", "limit", "after")
+# risk_level sorts by score: levels are score bands, and the score is indexed
+RISK_SORT_COLUMNS = {
+    "business_name": RiskClassification.business_name,
+    "total_violations": RiskClassification.total_violations,
+    "risk_level": RiskClassification.advanced_risk_score,
+    "advanced_risk_score": RiskClassification.advanced_risk_score,
+}
+RISK_PAGE_DEFAULT = 25
+RISK_PAGE_MAX = 200
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("'after' is not a valid cursor") from None
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("'after' is not a valid cursor")
+    return values
+
+def risk_page():
+    """
+    One page of /risk: summary columns only (no report text), ordered by
+    (sort column, id) so `after` can resume with a row-value comparison that
+    seeks in the column's index instead of counting an OFFSET.
+    """
+    args = request.args
+    sort = args.get("sort", "business_name")
+    column = RISK_SORT_COLUMNS.get(sort)
+    if column is None:
+        raise ValueError(f"'sort' must be one of {', '.join(RISK_SORT_COLUMNS)}")
+    order = args.get("order", "asc")
+    if order not in ("asc", "desc"):
+        raise ValueError("'order' must be asc or desc")
+    limit = int_arg("limit", RISK_PAGE_DEFAULT)
+    if limit is None or not 1 <= limit <= RISK_PAGE_MAX:
+        raise ValueError(f"'limit' must be an integer between 1 and {RISK_PAGE_MAX}")
+
+    query = RiskClassification.query
+    if args.get("risk_level"):
+        query = query.filter(RiskClassification.risk_level == args["risk_level"])
+    if args.get("business_type"):
+        query = query.filter(RiskClassification.business_type == args["business_type"])
+    if args.get("q"):
+        pattern = args["q"].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(RiskClassification.business_name.like(f"%{pattern}%", escape="\\"))
+    total = query.count()
+
+    key = tuple_(column, RiskClassification.id)
+    if args.get("after"):
+        value, last_id = decode_cursor(args["after"])
+        query = query.filter(key > tuple_(value, last_id) if order == "asc" else key < tuple_(value, last_id))
+    if order == "asc":
+        query = query.order_by(column.asc(), RiskClassification.id.asc())
+    else:
+        query = query.order_by(column.desc(), RiskClassification.id.desc())
+
+    rows = query.with_entities(
+        RiskClassification.id,
+        column.label("sort_value"),
+        RiskClassification.business_name,
+        RiskClassification.total_violations,
+        RiskClassification.risk_level,
+        RiskClassification.advanced_risk_score,
+        RiskClassification.business_type,
+        RiskClassification.location
+    ).limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [{
             "business_name": r.business_name,
             "total_violations": r.total_violations,
-            "total_fines": r.total_fines,
-            "last_violation_date": r.last_violation_date.strftime("%Y-%m-%d %H:%M:%S") if r.last_violation_date else None,
             "risk_level": r.risk_level,
-            "weighted_risk_score": r.weighted_risk_score,
             "advanced_risk_score": r.advanced_risk_score,
-            "industry_risk_factor": r.industry_risk_factor,
-            "violation_frequency_score": r.violation_frequency_score,
-            "inspection_history": r.inspection_history,
-            "unpaid_fines": r.unpaid_fines,
-            "average_fine": r.average_fine,
-            "risk_model_details": r.risk_model_details,
-            "description": r.description,
+            "business_type": r.business_type,
+            "location": r.location
+        } for r in rows],
+        "total": total,
+        "next": encode_cursor([rows[-1].sort_value, rows[-1].id]) if more else None
+    }
+
+@app.route('/risk', methods=['GET'])
+@cached_response
+def get_risk():
+    """
+    Without query parameters: every business with all columns (ViolationTrends
+    reads it to map business names to risk levels; the dashboard uses
+    /dashboard/bootstrap and RiskAnalysis the paged form). With any of sort,
+    order, q, risk_level, business_type, limit, after: one page,
+    {"items", "total", "next"}; pass `next` back as `after` for the following
+    page.
+    """
+    if any(name in request.args for name in RISK_PAGE_PARAMS):
+        try:
+            return jsonify(risk_page())
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return json_rows(db.session.query(*RISK_LIST_COLUMNS).order_by(RiskClassification.id).all())
+
+TOP_K_DEFAULT = 10
+TOP_K_MAX = 100
+
+def top_risk(k, risk_level="High", industry=None, location=None):
+    """The k highest advanced_risk_score businesses as ranked dicts."""
+    query = RiskClassification.query.with_entities(
+        RiskClassification.business_name,
+        RiskClassification.risk_level,
+        RiskClassification.advanced_risk_score,
+        RiskClassification.total_violations,
+        RiskClassification.business_type,
+        RiskClassification.location
+    )
+    if risk_level:
+        query = query.filter(RiskClassification.risk_level == risk_level)
+    if industry:
+        query = query.filter(RiskClassification.business_type == industry)
+    if location:
+        query = query.filter(RiskClassification.location == location)
+
+    rows = query.order_by(
+        RiskClassification.advanced_risk_score.desc(), RiskClassification.id
+    ).limit(k).all()
+    return [{
+        "rank": i + 1,
+        "business_name": r.business_name,
+        "risk_level": r.risk_level,
+        "advanced_risk_score": r.advanced_risk_score,
+        "total_violations": r.total_violations,
+        "business_type": r.business_type,
+        "location": r.location
+    } for i, r in enumerate(rows)]
+
+@app.route('/risk/top', methods=['GET'])
+def get_top_risk():
+    """
+    Highest advanced_risk_score businesses, e.g. /risk/top?k=3&industry=Restaurant.
+    risk_level defaults to High (pass risk_level=Medium/Low to rank those);
+    industry filters on business_type, location on location. Served from the
+    (risk_level | business_type, advanced_risk_score DESC) indexes.
+    """
+    k = int_arg("k", TOP_K_DEFAULT)
+    if k is None or not 1 <= k <= TOP_K_MAX:
+        return jsonify({"error": f"'k' must be an integer between 1 and {TOP_K_MAX}"}), 400
+
+    return jsonify(top_risk(
+        k,
+        risk_level=request.args.get("risk_level", "High"),
+        industry=request.args.get("industry"),
+        location=request.args.get("location")
+    ))
+
+@app.route('/search', methods=['GET'])
+def search():
+    """
+    Ranked full-text search over business name, description, location and
+    the business's violation types / corrective actions, e.g.
+    /search?q=seafood hyg&limit=20&offset=0. See search_index.py.
+    """
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "'q' is required"}), 400
+    limit = int_arg("limit", SEARCH_PAGE_DEFAULT)
+    if limit is None or not 1 <= limit <= SEARCH_PAGE_MAX:
+        return jsonify({"error": f"'limit' must be an integer between 1 and {SEARCH_PAGE_MAX}"}), 400
+    offset = int_arg("offset", 0)
+    if offset is None or offset < 0:
+        return jsonify({"error": "'offset' must be a non-negative integer"}), 400
+
+    rows, more = search_businesses(q, limit, offset)
+    return jsonify({
+        "items": [{
+            "rank": offset + i + 1,
+            "business_name": r.business_name,
+            "risk_level": r.risk_level,
+            "total_violations": r.total_violations,
+            "business_type": r.business_type,
             "location": r.location,
-            "business_type": r.business_type
-        })
-    return jsonify(result)
+            "description": r.description,
+            "snippet": r.snippet
+        } for i, r in enumerate(rows)],
+        "next": offset + limit if more else None
+    })
 
 @app.route('/businesses', methods=['GET'])
 def get_businesses():
@@ -94,120 +356,343 @@ def get_businesses():
         RiskClassification.location,
         RiskClassification.business_type
     ).all()
-    data = []
-    for b in rows:
-        data.append({
-            "business_name": b.business_name,
-            "total_violations": b.total_violations,
-            "risk_level": b.risk_level,
-            "description": b.description,
-            "location": b.location,
-            "business_type": b.business_type
-        })
-    return jsonify(data)
+    return json_rows(rows)
 
 @app.route('/analytics', methods=['GET'])
 def get_analytics():
+    try:
+        fmt = requested_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     sql = text("""
-        SELECT violation_type, COUNT(*) AS occurrence, SUM(fine) AS total_fines
-        FROM violation
-        GROUP BY violation_type
-        ORDER BY occurrence DESC;
+        SELECT vt.name AS violation_type, agg.occurrence, agg.total_fines
+        FROM (
+            SELECT violation_type_id, COUNT(*) AS occurrence, SUM(fine) AS total_fines
+            FROM violation
+            GROUP BY violation_type_id
+        ) AS agg
+        JOIN violation_type vt ON vt.id = agg.violation_type_id
+        ORDER BY agg.occurrence DESC;
     """)
     results = db.session.execute(sql).fetchall()
-    return jsonify([dict(row._mapping) for row in results])
+    return json_rows(results, format=fmt)
+
+# ------------------------------------------------------------------------
+# Trend windows: ?from= / ?to= as YYYY-MM (whole months) or YYYY-MM-DD, inclusive
+# ------------------------------------------------------------------------
+SQL_DATETIME = "%Y-%m-%d %H:%M:%S"
+MONTH_LABEL_SQL = "printf('%04d-%02d', month_key / 12, month_key % 12 + 1)"
+
+def _parse_trend_bound(value, name):
+    """(datetime, day precision?) for a from/to parameter."""
+    for fmt, by_day in (("%Y-%m-%d", True), ("%Y-%m", False)):
+        try:
+            return datetime.strptime(value, fmt), by_day
+        except ValueError:
+            pass
+    raise ValueError(f"'{name}' must be YYYY-MM or YYYY-MM-DD")
+
+def _months_before(dt, months):
+    year, month0 = divmod(dt.year * 12 + dt.month - 1 - months, 12)
+    day = min(dt.day, calendar.monthrange(year, month0 + 1)[1])
+    return datetime(year, month0 + 1, day)
+
+def trend_window(default_months=None, month_column="month_key", ts_column="timestamp"):
+    """
+    ("WHERE ..." or "", params) for the request's from/to window. Month bounds
+    filter on the indexed integer month key and day bounds add a plain range
+    on the timestamp, so the window is an index range scan either way. Without
+    `from` the window starts `default_months` months back to the day, the
+    boundary of SQLite's date('now', '-N months') (UTC). month_column=None
+    uses timestamps only.
+    """
+    clauses, params = [], {}
+    start, end = request.args.get("from"), request.args.get("to")
+
+    if start:
+        start_dt, by_day = _parse_trend_bound(start, "from")
+    elif default_months:
+        start_dt, by_day = _months_before(datetime.now(timezone.utc), default_months), True
+    else:
+        start_dt = None
+    if start_dt is not None:
+        if not by_day:
+            start_dt = start_dt.replace(day=1)
+        if month_column:
+            clauses.append(f"{month_column} >= :from_key")
+            params["from_key"] = month_key(start_dt.year, start_dt.month)
+        if by_day or not month_column:
+            clauses.append(f"{ts_column} >= :from_ts")
+            params["from_ts"] = start_dt.strftime(SQL_DATETIME)
+
+    if end:
+        end_dt, by_day = _parse_trend_bound(end, "to")
+        if month_column:
+            clauses.append(f"{month_column} <= :to_key")
+            params["to_key"] = month_key(end_dt.year, end_dt.month)
+        if by_day or not month_column:
+            stop = end_dt + timedelta(days=1) if by_day else _months_before(end_dt, -1)
+            clauses.append(f"{ts_column} < :to_ts")
+            params["to_ts"] = stop.strftime(SQL_DATETIME)
+
+    return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
 
 @app.route('/trends/violations', methods=['GET'])
 def get_violation_trends():
     try:
-        sql = text("""
-            SELECT strftime('%Y-%m', timestamp) AS month, category, business_name, violation_type, COUNT(*) AS total_violations
-            FROM violation
-            WHERE timestamp >= date('now','-12 months')
-            GROUP BY month, category, business_name, violation_type
-            ORDER BY month ASC;
+        fmt = requested_format()
+        where, params = trend_window(default_months=12)
+        sql = text(f"""
+            SELECT {MONTH_LABEL_SQL} AS month, c.name AS category, agg.business_name, vt.name AS violation_type, agg.total_violations
+            FROM (
+                SELECT month_key, category_id, business_name, violation_type_id, COUNT(*) AS total_violations
+                FROM violation
+                {where}
+                GROUP BY month_key, category_id, business_name, violation_type_id
+            ) AS agg
+            JOIN category c ON c.id = agg.category_id
+            JOIN violation_type vt ON vt.id = agg.violation_type_id
+            ORDER BY agg.month_key ASC;
         """)
-        data = db.session.execute(sql).fetchall()
-        return jsonify([dict(row._mapping) for row in data])
+        data = db.session.execute(sql, params).fetchall()
+        return json_rows(data, format=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/trends/violations/all', methods=['GET'])
+@cached_response(params=("from", "to", "format"))
 def get_all_violation_trends():
     try:
-        sql = text("""
-            SELECT strftime('%Y-%m', timestamp) AS month, category, business_name, violation_type, COUNT(*) AS total_violations
-            FROM violation
-            GROUP BY month, category, business_name, violation_type
-            ORDER BY month ASC;
+        fmt = requested_format()
+        where, params = trend_window()
+        sql = text(f"""
+            SELECT {MONTH_LABEL_SQL} AS month, c.name AS category, agg.business_name, vt.name AS violation_type, agg.total_violations
+            FROM (
+                SELECT month_key, category_id, business_name, violation_type_id, COUNT(*) AS total_violations
+                FROM violation
+                {where}
+                GROUP BY month_key, category_id, business_name, violation_type_id
+            ) AS agg
+            JOIN category c ON c.id = agg.category_id
+            JOIN violation_type vt ON vt.id = agg.violation_type_id
+            ORDER BY agg.month_key ASC;
         """)
-        data = db.session.execute(sql).fetchall()
-        return jsonify([dict(row._mapping) for row in data])
+        data = db.session.execute(sql, params).fetchall()
+        return json_rows(data, format=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/trends/fines', methods=['GET'])
 def get_fine_trends():
     try:
-        sql = text("""
-            SELECT strftime('%Y-%m', timestamp) AS month, SUM(fine) AS total_fines
+        fmt = requested_format()
+        where, params = trend_window(default_months=24)
+        sql = text(f"""
+            SELECT {MONTH_LABEL_SQL} AS month, SUM(fine) AS total_fines
             FROM violation
-            WHERE timestamp >= date('now','-24 months')
-            GROUP BY month
-            ORDER BY month ASC;
+            {where}
+            GROUP BY month_key
+            ORDER BY month_key ASC;
         """)
-        data = db.session.execute(sql).fetchall()
-        return jsonify([dict(row._mapping) for row in data])
+        data = db.session.execute(sql, params).fetchall()
+        return json_rows(data, format=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/trends/business-risk', methods=['GET'])
 def get_business_risk_trends():
     try:
-        sql = text("""
-            SELECT business_name, strftime('%Y-%m', last_violation_date) AS month, risk_level
+        fmt = requested_format()
+        # One row per business, so there is no month key to group on: the window
+        # is a range on ix_risk_last_violation, and the month label is the
+        # stored datetime text's "YYYY-MM" prefix instead of a strftime() parse
+        where, params = trend_window(month_column=None, ts_column="last_violation_date")
+        sql = text(f"""
+            SELECT business_name, substr(last_violation_date, 1, 7) AS month, risk_level
             FROM risk_classification
+            {where}
             ORDER BY month ASC, risk_level DESC;
         """)
-        data = db.session.execute(sql).fetchall()
-        return jsonify([dict(row._mapping) for row in data])
+        data = db.session.execute(sql, params).fetchall()
+        return json_rows(data, format=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/trends/repeat-offenders', methods=['GET'])
 def get_repeat_offenders():
     try:
-        sql = text("""
-            SELECT business_name, COUNT(*) AS violation_count, MAX(timestamp) AS last_violation_date,
+        fmt = requested_format()
+        # (business_name, timestamp) index covers the range, count and MAX
+        where, params = trend_window(default_months=6, month_column=None)
+        sql = text(f"""
+            SELECT business_name, COUNT(*) AS violation_count,
+                strftime('%Y-%m-%d %H:%M:%S', MAX(timestamp)) AS last_violation_date,
                 CASE
                     WHEN COUNT(*) >= 7 THEN 'High Risk'
                     WHEN COUNT(*) BETWEEN 4 AND 6 THEN 'Medium Risk'
                     ELSE 'Low Risk'
                 END AS risk_status
             FROM violation
-            WHERE timestamp >= date('now','-6 months')
+            {where}
             GROUP BY business_name
             ORDER BY violation_count DESC;
         """)
-        data = db.session.execute(sql).fetchall()
-        return jsonify([dict(row._mapping) for row in data])
+        data = db.session.execute(sql, params).fetchall()
+        return json_rows(data, format=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/trends/geo-hotspots', methods=['GET'])
 def get_geo_hotspots():
     try:
-        sql = text("""
-            SELECT location, COUNT(*) AS total_violations
-            FROM violation
-            GROUP BY location
-            ORDER BY total_violations DESC;
+        fmt = requested_format()
+        where, params = trend_window()
+        sql = text(f"""
+            SELECT l.name AS location, agg.total_violations
+            FROM (
+                SELECT location_id, COUNT(*) AS total_violations
+                FROM violation
+                {where}
+                GROUP BY location_id
+            ) AS agg
+            JOIN location l ON l.id = agg.location_id
+            ORDER BY agg.total_violations DESC;
         """)
-        data = db.session.execute(sql).fetchall()
-        return jsonify([dict(row._mapping) for row in data])
+        data = db.session.execute(sql, params).fetchall()
+        return json_rows(data, format=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ------------------------------------------------------------------------
+# Dashboard widgets: the series each chart renders, aggregated in SQL
+# ------------------------------------------------------------------------
+DISTRIBUTION_STATUSES = ("Open", "Closed")
+DISTRIBUTION_RISK_LEVELS = ("High", "Medium", "Low")
+DISTRIBUTION_TOP_LOCATIONS = 3
+
+def dashboard_distribution():
+    """
+    {"status", "risk_levels", "locations"} as [{"name", "value"}] pie series:
+    Open/Closed violation counts, businesses per risk level, and violations
+    in the top DISTRIBUTION_TOP_LOCATIONS locations plus "Other". All three
+    come from one statement over the status / location / risk_level indexes.
+    """
+    top = DISTRIBUTION_TOP_LOCATIONS
+    statuses = ", ".join(f"'{n}'" for n in DISTRIBUTION_STATUSES)
+    levels = ", ".join(f"'{n}'" for n in DISTRIBUTION_RISK_LEVELS)
+    sql = text(f"""
+        WITH locations AS (
+            SELECT l.name, agg.n, ROW_NUMBER() OVER (ORDER BY agg.n DESC, l.name) AS rank
+            FROM (SELECT location_id, COUNT(*) AS n FROM violation GROUP BY location_id) AS agg
+            JOIN location l ON l.id = agg.location_id
+        )
+        SELECT 'status' AS series, s.name, agg.n AS value, 0 AS position
+        FROM (SELECT status_id, COUNT(*) AS n FROM violation GROUP BY status_id) AS agg
+        JOIN violation_status s ON s.id = agg.status_id
+        WHERE s.name IN ({statuses})
+        UNION ALL
+        SELECT 'risk_levels', risk_level, COUNT(*), 0
+        FROM risk_classification
+        WHERE risk_level IN ({levels})
+        GROUP BY risk_level
+        UNION ALL
+        SELECT 'locations', CASE WHEN MIN(rank) <= {top} THEN name ELSE 'Other' END, SUM(n), MIN(rank, {top + 1})
+        FROM locations
+        GROUP BY MIN(rank, {top + 1})
+    """)
+    rows = db.session.execute(sql).fetchall()
+
+    counts = {(r.series, r.name): r.value for r in rows if r.series != "locations"}
+    locations = sorted((r for r in rows if r.series == "locations"), key=lambda r: r.position)
+    return {
+        "status": [{"name": n, "value": counts.get(("status", n), 0)} for n in DISTRIBUTION_STATUSES],
+        "risk_levels": [{"name": n, "value": counts.get(("risk_levels", n), 0)} for n in DISTRIBUTION_RISK_LEVELS],
+        "locations": [{"name": r.name, "value": r.value} for r in locations if r.value]
+    }
+
+@app.route('/dashboard/distribution', methods=['GET'])
+@cached_response
+def get_dashboard_distribution():
+    """
+    Everything RiskDistributionChart draws in one small response, e.g.
+    {"status": [{"name": "Open", "value": 5342}, ...], "risk_levels": [...],
+     "locations": [{"name": "Downtown", "value": 2116}, ..., {"name": "Other", ...}]}
+    """
+    return jsonify(dashboard_distribution())
+
+DASHBOARD_TOP_RISK = 3
+DASHBOARD_TREND_MONTHS = 6
+DASHBOARD_HOTSPOTS = 5
+
+def dashboard_kpis():
+    row = db.session.execute(text("""
+        SELECT COALESCE(SUM(total_violations), 0) AS total_violations,
+               COALESCE(SUM(total_fines), 0) AS total_fines,
+               COALESCE(SUM(risk_level = 'High'), 0) AS high_risk_businesses
+        FROM risk_classification
+    """)).first()
+    return dict(row._mapping)
+
+def dashboard_trend():
+    """Violations per month for the last DASHBOARD_TREND_MONTHS months with data in the past year."""
+    where, params = trend_window(default_months=12)
+    rows = db.session.execute(text(f"""
+        SELECT {MONTH_LABEL_SQL} AS month, COUNT(*) AS total_violations
+        FROM violation
+        {where}
+        GROUP BY month_key
+        ORDER BY month_key DESC
+        LIMIT :months
+    """), {**params, "months": DASHBOARD_TREND_MONTHS}).fetchall()
+    return [dict(r._mapping) for r in reversed(rows)]
+
+def dashboard_hotspots():
+    rows = db.session.execute(text("""
+        SELECT l.name AS location, agg.total_violations
+        FROM (
+            SELECT location_id, COUNT(*) AS total_violations
+            FROM violation
+            GROUP BY location_id
+        ) AS agg
+        JOIN location l ON l.id = agg.location_id
+        ORDER BY agg.total_violations DESC
+        LIMIT :n
+    """), {"n": DASHBOARD_HOTSPOTS}).fetchall()
+    return [dict(r._mapping) for r in rows]
+
+@app.route('/dashboard/bootstrap', methods=['GET'])
+@cached_response
+def get_dashboard_bootstrap():
+    """
+    Everything the dashboard renders in one response (and one cache entry):
+    {"kpis": {"total_violations", "total_fines", "high_risk_businesses"},
+     "high_risk": /risk/top?k=3 rows, "distribution": /dashboard/distribution,
+     "trend": [{"month", "total_violations"}] for the last 6 months,
+     "hotspots": the top 5 [{"location", "total_violations"}]}.
+    All five queries run back to back on the request's session and
+    connection. SQLite executes one statement at a time per connection, so
+    threading them would not help; each one is a small aggregate.
+    """
+    return jsonify({
+        "kpis": dashboard_kpis(),
+        "high_risk": top_risk(DASHBOARD_TOP_RISK),
+        "distribution": dashboard_distribution(),
+        "trend": dashboard_trend(),
+        "hotspots": dashboard_hotspots()
+    })
+
 @app.route('/api/generate_report/<business_name>', methods=['GET'])
 def generate_report(business_name):
     record = RiskClassification.query.filter_by(business_name=business_name).first()
@@ -248,8 +733,47 @@ def generate_report(business_name):
 # Existing seed CLI command
 # ------------------------------------------------------------------------
 @app.cli.command("seed")
-def seed_cli():
-    seed_db()
+@click.option("--seed", "seed_value", type=int, default=DEFAULT_SEED, help="Root seed for the generator.")
+@click.option("--workers", type=int, default=1, help="Generator processes (output is identical).")
+@click.option("--businesses", type=int, default=None, help="Number of businesses to generate.")
+@click.option("--shard-dir", default=None, help="Keep generated shards in this directory.")
+@click.option("--profile", "profile_mode", type=click.Choice(PROFILE_MODES), default=None,
+              help="Profile the run and write a pstats/speedscope file to PROFILE_DIR.")
+def seed_cli(seed_value, workers, businesses, shard_dir, profile_mode):
+    with profile_job("seed", mode=profile_mode, out_dir=app.config['PROFILE_DIR']):
+        seed_db(seed=seed_value, workers=workers, num_businesses=businesses, shard_dir=shard_dir)
+
+@app.cli.command("snapshot")
+@click.option("--out", default=None, help="Snapshots root (default SNAPSHOT_DIR).")
+@click.option("--keep", type=int, default=3, help="Number of snapshots to keep.")
+def snapshot_cli(out, keep):
+    """Export violations, risk scores and status history to Parquet."""
+    from snapshot import export_snapshot
+    click.echo(export_snapshot(out or app.config['SNAPSHOT_DIR'], keep=keep))
+
+@app.cli.command("refresh-column-store")
+@click.option("--out", default=None, help="Store directory (default COLUMN_STORE_DIR).")
+def refresh_column_store_cli(out):
+    """Rebuild the memory-mapped violation columns used for batch scoring."""
+    from column_store import refresh_column_store
+    click.echo(refresh_column_store(out or app.config['COLUMN_STORE_DIR']))
+
+@app.cli.command("rebuild-search-index")
+def rebuild_search_index_cli():
+    """Recreate the FTS5 business search table and its sync triggers."""
+    from search_index import rebuild_search_index
+    count = rebuild_search_index()
+    click.echo("FTS5 unavailable; /search uses the LIKE fallback" if count is None else f"{count} businesses indexed")
+
+@app.cli.command("rescore")
+@click.option("--as-of", "as_of", type=click.DateTime(), default=None, help="Score date (default now).")
+@click.option("--store", default=None, help="Column store directory (default COLUMN_STORE_DIR).")
+@click.option("--no-refresh", is_flag=True, help="Score the existing column store without refreshing it.")
+def rescore_cli(as_of, store, no_refresh):
+    """Advance the scoring clock; rewrite businesses whose risk level changed."""
+    from rescore import rescore
+    click.echo(rescore(as_of or datetime.now(), store or app.config['COLUMN_STORE_DIR'],
+                       refresh=not no_refresh))
 
 # ------------------------------------------------------------------------
 # NEW: Single Violation Endpoint - GET /violations/<violation_id>
@@ -257,24 +781,11 @@ def seed_cli():
 # ------------------------------------------------------------------------
 @app.route('/violations/<int:violation_id>', methods=['GET'])
 def get_single_violation(violation_id):
-    violation = Violation.query.get(violation_id)
+    violation = violation_rows_query().filter(Violation.id == violation_id).first()
     if not violation:
         return jsonify({"error": "Violation not found"}), 404
 
-    data = {
-        "id": violation.id,
-        "business_name": violation.business_name,
-        "violation_type": violation.violation_type,
-        "category": violation.category,
-        "severity": violation.severity,
-        "fine": violation.fine,
-        "timestamp": violation.timestamp.strftime("%Y-%m-%d %H:%M:%S") if violation.timestamp else None,
-        "location": violation.location,
-        "month": violation.month,
-        "resolution_date": violation.resolution_date.strftime("%Y-%m-%d %H:%M:%S") if violation.resolution_date else None,
-        "corrective_actions": violation.corrective_actions,
-        "status": violation.status
-    }
+    data = serialize_violation(violation)
     return jsonify(data), 200
 
 # ------------------------------------------------------------------------
@@ -295,17 +806,18 @@ def get_distinct_violation_fields():
     """
     try:
         # Distinct categories
-        cat_sql = text("SELECT DISTINCT category FROM violation WHERE category != '' AND category IS NOT NULL ORDER BY category;")
+        # Lookup tables hold each name once; only list the ones still referenced
+        cat_sql = text("SELECT name FROM category WHERE name != '' AND id IN (SELECT DISTINCT category_id FROM violation) ORDER BY name;")
         cats = db.session.execute(cat_sql).fetchall()
         categories = [row[0] for row in cats if row[0]]
 
         # Distinct violation types
-        vt_sql = text("SELECT DISTINCT violation_type FROM violation WHERE violation_type != '' AND violation_type IS NOT NULL ORDER BY violation_type;")
+        vt_sql = text("SELECT name FROM violation_type WHERE name != '' AND id IN (SELECT DISTINCT violation_type_id FROM violation) ORDER BY name;")
         vts = db.session.execute(vt_sql).fetchall()
         violation_types = [row[0] for row in vts if row[0]]
 
         # Distinct statuses
-        st_sql = text("SELECT DISTINCT status FROM violation WHERE status != '' AND status IS NOT NULL ORDER BY status;")
+        st_sql = text("SELECT name FROM violation_status WHERE name != '' AND id IN (SELECT DISTINCT status_id FROM violation) ORDER BY name;")
         sts = db.session.execute(st_sql).fetchall()
         statuses = [row[0] for row in sts if row[0]]
 
@@ -331,23 +843,14 @@ def get_violation_status_history(violation_id):
     """
     # We'll do a raw query to the violation_status_history table
     sql = text("""
-        SELECT id, violation_id, status, notes, updated_at
+        SELECT id, violation_id, status, notes, strftime('%Y-%m-%d %H:%M:%S', updated_at) AS updated_at
         FROM violation_status_history
         WHERE violation_id = :vid
-        ORDER BY updated_at ASC
+        ORDER BY violation_status_history.updated_at ASC
     """)
     result = db.session.execute(sql, {"vid": violation_id}).fetchall()
-    history = []
-    for row in result:
-        rowd = dict(row._mapping)
-        # Format the date
-        rowd["updated_at"] = (
-            rowd["updated_at"].strftime("%Y-%m-%d %H:%M:%S")
-            if isinstance(rowd["updated_at"], datetime)
-            else str(rowd["updated_at"])
-        )
-        history.append(rowd)
-    return jsonify(history), 200
+    # updated_at is formatted in SQL, in the API datetime format
+    return json_rows(result), 200
 
 @app.route('/violations/<int:violation_id>/status-history', methods=['POST'])
 def add_violation_status_history(violation_id):
@@ -381,6 +884,7 @@ def add_violation_status_history(violation_id):
         "upd": now
     })
     db.session.commit()
+    invalidate_response_cache()
     return jsonify({"message": "Status step added successfully"}), 201
 
 if __name__ == "__main__":
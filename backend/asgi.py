@@ -0,0 +1,66 @@
+##################################################################################
+# asgi.py
+#
+# ASGI serving mode for the Flask app. The route handlers in app.py stay as
+# they are (synchronous, SQLAlchemy + SQLite). a2wsgi's WSGIMiddleware runs
+# each request on a bounded thread pool, and the server's event loop owns
+# the sockets:
+#   - a burst of dashboard fetches holds open connections, not threads
+#   - at most ASGI_THREADS handlers run at once (default 15, the same as
+#     SQLAlchemy's default pool of 5 + 10 overflow connections), so slow
+#     aggregates queue instead of piling up threads that wait for a
+#     pool connection
+#   - SQLite releases the GIL while a statement runs, so the handlers
+#     overlap their query time
+#
+# It does not add throughput: the handlers are the same synchronous code, and
+# bench_load.py at 100k violations gives ~30 req/s in both modes, bounded by
+# handler CPU time (see README, ASGI Serving). What it changes is how many
+# handlers run at once, which trims tail latency under a burst.
+#
+# Needs the optional `a2wsgi` and `uvicorn` packages:
+#
+#   pip install -r requirements-asgi.txt
+#   uvicorn asgi:application --port 5000            # or: python asgi.py
+##################################################################################
+
+import os
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # optional dependency
+    WSGIMiddleware = None
+
+from app import app
+
+DEFAULT_ASGI_THREADS = 15
+
+class FlaskASGI:
+    """
+    The WSGI app behind a2wsgi's thread pool (`threads` workers). Lifespan
+    events are acknowledged here, so servers start without warnings.
+    """
+
+    def __init__(self, wsgi_app, threads=DEFAULT_ASGI_THREADS):
+        if WSGIMiddleware is None:
+            raise RuntimeError("ASGI serving needs a2wsgi: pip install -r requirements-asgi.txt")
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        else:
+            await self.wsgi(scope, receive, send)
+
+application = FlaskASGI(app, threads=int(os.environ.get("ASGI_THREADS", DEFAULT_ASGI_THREADS)))
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(application, host=os.environ.get("HOST", "127.0.0.1"), port=int(os.environ.get("PORT", "5000")))
@@ -0,0 +1,259 @@
+##################################################################################
+# benchmarks/bench_api.py
+#
+# Latency + payload benchmarks for every route in app.py at scaled dataset sizes.
+#
+#   python benchmarks/bench_api.py                          # 10k,100k,1m,10m violations
+#   python benchmarks/bench_api.py --sizes 10k,100k --repeat 10
+#   python benchmarks/bench_api.py --compare benchmarks/results/api-<rev>.json
+#   python benchmarks/bench_api.py --cache                  # time cache hits instead
+#
+# Fixture databases are built once per (size, seed) with seed.py's generator and
+# cached under benchmarks/.data/. Each size runs in its own process (the app
+# binds its database at import time via DATABASE_URL), using Flask's test client.
+# The response cache is off (RESPONSE_CACHE_TTL=0) unless --cache is given, so
+# cached routes are timed running their queries, as in earlier results; each
+# route records the X-Cache header of its last call.
+# Results are written as JSON to benchmarks/results/api-<git revision>.json.
+##################################################################################
+
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import (
+    AVG_VIOLATIONS_PER_BUSINESS, DATA_DIR, compare_metric, format_size,
+    load_results, parse_size, write_results
+)
+
+DEFAULT_SIZES = "10k,100k,1m,10m"
+
+# (method, path template, JSON body); {business} / {violation_id} / {term} are
+# filled from the fixture database
+ROUTES = [
+    ("GET", "/", None),
+    ("GET", "/violations", None),
+    ("GET", "/violations/{violation_id}", None),
+    ("GET", "/violations/distinct-fields", None),
+    ("GET", "/risk", None),
+    ("GET", "/risk?limit=25", None),
+    ("GET", "/risk?sort=advanced_risk_score&order=desc&limit=25", None),
+    ("GET", "/risk?q={term}&limit=25", None),
+    ("GET", "/risk/top?k=3", None),
+    ("GET", "/search?q={term}&limit=20", None),
+    ("GET", "/businesses", None),
+    ("GET", "/analytics", None),
+    ("GET", "/analytics?format=columnar", None),
+    ("GET", "/trends/violations", None),
+    ("GET", "/trends/violations?format=columnar", None),
+    ("GET", "/trends/violations/all", None),
+    ("GET", "/trends/violations/all?format=columnar", None),
+    ("GET", "/trends/fines", None),
+    ("GET", "/trends/business-risk", None),
+    ("GET", "/trends/repeat-offenders", None),
+    ("GET", "/trends/geo-hotspots", None),
+    ("GET", "/dashboard/distribution", None),
+    ("GET", "/dashboard/bootstrap", None),
+    ("GET", "/api/generate_report/{business}", None),
+    ("GET", "/violations/{violation_id}/status-history", None),
+    ("POST", "/violations/{violation_id}/status-history", {"status": "Legal Review", "notes": "benchmark"}),
+]
+
+def fixture_path(size, seed):
+    return os.path.join(DATA_DIR, f"violations-{format_size(size)}-seed{seed}.db")
+
+###############################################################################
+# Child process: build (if needed) and measure one database
+###############################################################################
+def build_fixture(app, size, seed, workers):
+    from seed import seed_db
+
+    num_businesses = max(1, math.ceil(size / AVG_VIOLATIONS_PER_BUSINESS))
+    start = time.perf_counter()
+    with app.app_context():
+        seed_db(seed=seed, workers=workers, num_businesses=num_businesses)
+    return time.perf_counter() - start
+
+def fixture_params(app):
+    from models import db, Violation, RiskClassification
+
+    with app.app_context():
+        business = db.session.query(RiskClassification.business_name).filter(
+            RiskClassification.total_violations > 0
+        ).order_by(RiskClassification.id).first()
+        violation_id = db.session.query(Violation.id).order_by(Violation.id).first()
+        counts = {
+            "violations": db.session.query(db.func.count(Violation.id)).scalar(),
+            "businesses": db.session.query(db.func.count(RiskClassification.id)).scalar()
+        }
+    params = {
+        "business": business[0] if business else "",
+        "violation_id": violation_id[0] if violation_id else 1,
+        # A word from a real business name, for the search routes
+        "term": (business[0].split() or [""])[0] if business else ""
+    }
+    return params, counts
+
+def time_route(client, method, path, body, repeat, warmup, budget):
+    """
+    Calls one route warmup + repeat times. A route whose single call exceeds
+    `budget` seconds is only timed once, so the largest sizes still finish.
+    """
+    timings = []
+    payload = 0
+    status = None
+    cache_state = None
+    for i in range(warmup + repeat):
+        start = time.perf_counter()
+        try:
+            resp = client.open(path, method=method, json=body)
+        except Exception as e:  # record the failure instead of aborting the run
+            return {"error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start
+        status = resp.status_code
+        payload = len(resp.get_data())
+        cache_state = resp.headers.get("X-Cache")
+        resp.close()
+        if i >= warmup or elapsed > budget:
+            timings.append(elapsed)
+        if elapsed > budget:
+            break
+
+    timings_ms = sorted(t * 1000.0 for t in timings)
+    p95_index = min(len(timings_ms) - 1, math.ceil(0.95 * len(timings_ms)) - 1)
+    return {
+        "status": status,
+        "bytes": payload,
+        "cache": cache_state,
+        "runs": len(timings_ms),
+        "min_ms": timings_ms[0],
+        "median_ms": statistics.median(timings_ms),
+        "mean_ms": statistics.fmean(timings_ms),
+        "p95_ms": timings_ms[p95_index]
+    }
+
+def run_child(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    if not args.cache:
+        os.environ["RESPONSE_CACHE_TTL"] = "0"
+    from app import app
+
+    build_seconds = None
+    if args.build:
+        build_seconds = build_fixture(app, args.size, args.seed, args.workers)
+
+    params, counts = fixture_params(app)
+    client = app.test_client()
+    routes = {}
+    for method, template, body in ROUTES:
+        path = template.format(**params)
+        name = f"{method} {template}"
+        routes[name] = time_route(client, method, path, body, args.repeat, args.warmup, args.budget)
+        r = routes[name]
+        if "error" in r:
+            print(f"  {name:<60} ERROR {r['error']}", file=sys.stderr)
+        else:
+            print(f"  {name:<60} {r['median_ms']:>10.2f} ms  {r['bytes']:>12,} B", file=sys.stderr)
+
+    with open(args.child_output, "w", encoding="utf-8") as fh:
+        json.dump({"build_seconds": build_seconds, **counts, "routes": routes}, fh)
+
+###############################################################################
+# Parent: one child per size, then write / compare results
+###############################################################################
+def run_size(size, args):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    db_file = fixture_path(size, args.seed)
+    build = args.rebuild or not os.path.exists(db_file)
+    if build and os.path.exists(db_file):
+        os.remove(db_file)
+
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        child_output = tmp.name
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child",
+        "--db", db_file, "--size", str(size), "--seed", str(args.seed),
+        "--workers", str(args.workers), "--repeat", str(args.repeat),
+        "--warmup", str(args.warmup), "--budget", str(args.budget),
+        "--child-output", child_output
+    ]
+    if build:
+        cmd.append("--build")
+    if args.cache:
+        cmd.append("--cache")
+
+    print(f"[{format_size(size)}] {'building + ' if build else ''}measuring {db_file}", file=sys.stderr)
+    try:
+        proc = subprocess.run(cmd)
+        if proc.returncode != 0:
+            return {"error": f"benchmark process exited with {proc.returncode}"}
+        with open(child_output, encoding="utf-8") as fh:
+            return json.load(fh)
+    finally:
+        os.remove(child_output)
+
+def print_comparison(base, current):
+    print(f"\nComparison against {base['meta']['revision']} ({base['meta']['created_at']}):")
+    if base.get("config", {}).get("cache", False) != current["config"].get("cache", False):
+        print("  note: one run timed response-cache hits (--cache), the other did not")
+    for size, cur in current["sizes"].items():
+        old = base.get("sizes", {}).get(size)
+        if not old or "routes" not in cur or "routes" not in old:
+            continue
+        print(f"[{size}]")
+        for name, r in cur["routes"].items():
+            o = old["routes"].get(name)
+            if not o or "error" in r or "error" in o:
+                continue
+            t = compare_metric(o["median_ms"], r["median_ms"])
+            b = compare_metric(o["bytes"], r["bytes"])
+            t_str = f"{t:5.2f}x" if t is not None else "  n/a"
+            b_str = f"{b:5.2f}x" if b is not None else "  n/a"
+            print(f"  {name:<60} time {t_str}  bytes {b_str}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated violation counts, e.g. 10k,100k")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes for fixture builds")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=60.0, help="Seconds; slower routes are timed once")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild cached fixture databases")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on (times cache hits)")
+    parser.add_argument("--output", default=None, help="Result file (default results/api-<rev>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare against")
+    # internal, used for the per-size child process
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--build", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args)
+        return
+
+    sizes = {}
+    for text in args.sizes.split(","):
+        size = parse_size(text)
+        sizes[format_size(size)] = run_size(size, args)
+
+    current = {"sizes": sizes, "config": {
+        "seed": args.seed, "repeat": args.repeat, "warmup": args.warmup, "cache": args.cache
+    }}
+    path = write_results("api", current, args.output)
+    print(f"\nResults written to {path}")
+
+    if args.compare:
+        print_comparison(load_results(args.compare), load_results(path))
+
+if __name__ == "__main__":
+    main()
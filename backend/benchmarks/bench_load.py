@@ -0,0 +1,255 @@
+##################################################################################
+# benchmarks/bench_load.py
+#
+# Concurrent-client load test: requests/sec and latency percentiles for the
+# dashboard's routes, served by the threaded WSGI dev server (what
+# `python app.py` runs) and by the ASGI mode in asgi.py.
+#
+#   python benchmarks/bench_load.py                         # 100k violations, 100 clients
+#   python benchmarks/bench_load.py --clients 50,100,200 --duration 15
+#   python benchmarks/bench_load.py --modes asgi --no-cache
+#
+# Each mode runs as a separate server process on the fixture database that
+# bench_api.py uses, built here if it is missing. The clients are asyncio
+# keep-alive connections written with the standard library only, so the
+# load generator adds no dependencies. --no-cache sets RESPONSE_CACHE_TTL=0,
+# so every request runs its queries. Results are written as JSON to
+# benchmarks/results/load-<git revision>.json.
+##################################################################################
+
+import argparse
+import asyncio
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from common import BACKEND_DIR, DATA_DIR, format_size, parse_size, write_results
+from bench_api import build_fixture, fixture_path
+
+# What one dashboard visit fetches, plus the chart endpoints it links to
+ROUTES = [
+    "/dashboard/bootstrap",
+    "/dashboard/distribution",
+    "/risk/top?k=3",
+    "/trends/violations?format=columnar",
+    "/trends/geo-hotspots",
+    "/trends/fines",
+    "/analytics",
+]
+
+REQUEST_TIMEOUT = 30.0
+
+SERVERS = {
+    "wsgi": "from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)",
+    "asgi": "import uvicorn; uvicorn.run('asgi:application', host='127.0.0.1', port={port}, log_level='warning')",
+}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+###############################################################################
+# Server process
+###############################################################################
+def start_server(mode, db_file, port, cache, timeout=60.0):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_file}")
+    # Per-request logging would dominate the measurement
+    env["DEBUG_METRICS_ENABLED"] = "0"
+    env["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    if not cache:
+        env["RESPONSE_CACHE_TTL"] = "0"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SERVERS[mode].format(port=port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{mode} server did not start within {timeout:.0f}s")
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+###############################################################################
+# Load generator
+###############################################################################
+async def _read_response(reader):
+    """(status, keep_alive) after reading one full response body."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    version, status = status_line.split(b" ", 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get(b"transfer-encoding") == b"chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif b"content-length" in headers:
+        await reader.readexactly(int(headers[b"content-length"]))
+    else:
+        await reader.read()
+        return int(status), False
+
+    connection = headers.get(b"connection")
+    keep_alive = connection == b"keep-alive" if version == b"HTTP/1.0" else connection != b"close"
+    return int(status), keep_alive
+
+async def _request(reader, writer, port, path):
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        f"Accept-Encoding: gzip\r\nConnection: keep-alive\r\n\r\n".encode()
+    )
+    await writer.drain()
+    return await _read_response(reader)
+
+async def _client(port, offset, stop_at, latencies, statuses, errors):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < stop_at:
+        path = ROUTES[i % len(ROUTES)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection("127.0.0.1", port), REQUEST_TIMEOUT
+                )
+            status, keep_alive = await asyncio.wait_for(_request(reader, writer, port, path), REQUEST_TIMEOUT)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+async def _run_load(port, clients, duration):
+    latencies, statuses, errors = [], {}, {}
+    start = time.perf_counter()
+    stop_at = start + duration
+    await asyncio.gather(*(
+        _client(port, c, stop_at, latencies, statuses, errors) for c in range(clients)
+    ))
+    return time.perf_counter() - start, latencies, statuses, errors
+
+def run_load(port, clients, duration, warmup):
+    if warmup > 0:
+        asyncio.run(_run_load(port, clients, warmup))
+    elapsed, latencies, statuses, errors = asyncio.run(_run_load(port, clients, duration))
+    latencies_ms = sorted(t * 1000.0 for t in latencies)
+
+    def pct(p):
+        if not latencies_ms:
+            return None
+        return latencies_ms[min(len(latencies_ms) - 1, math.ceil(p * len(latencies_ms)) - 1)]
+
+    return {
+        "requests": len(latencies_ms),
+        "seconds": elapsed,
+        "rps": len(latencies_ms) / elapsed,
+        "median_ms": statistics.median(latencies_ms) if latencies_ms else None,
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "errors": errors
+    }
+
+###############################################################################
+# Main
+###############################################################################
+def ensure_fixture(size, seed, workers):
+    db_file = fixture_path(size, seed)
+    if not os.path.exists(db_file):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"building {db_file}", file=sys.stderr)
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--build-fixture", db_file,
+             "--size", str(size), "--seed", str(seed), "--workers", str(workers)],
+            check=True
+        )
+    return db_file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="100k", help="Fixture size in violations, e.g. 10k")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes for fixture builds")
+    parser.add_argument("--modes", default="wsgi,asgi", help=f"Comma-separated, from: {', '.join(SERVERS)}")
+    parser.add_argument("--clients", default="100", help="Comma-separated concurrent client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each run")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache (RESPONSE_CACHE_TTL=0)")
+    parser.add_argument("--output", default=None, help="Result file (default results/load-<rev>.json)")
+    # internal, used to build the fixture in a fresh process
+    parser.add_argument("--build-fixture", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    size = parse_size(args.size)
+    if args.build_fixture:
+        os.environ["DATABASE_URL"] = f"sqlite:///{args.build_fixture}"
+        from app import app
+        build_fixture(app, size, args.seed, args.workers)
+        return
+
+    db_file = ensure_fixture(size, args.seed, args.workers)
+    client_counts = [int(c) for c in args.clients.split(",")]
+    runs = {}
+    for mode in args.modes.split(","):
+        port = free_port()
+        proc = start_server(mode, db_file, port, cache=not args.no_cache)
+        try:
+            for clients in client_counts:
+                r = run_load(port, clients, args.duration, args.warmup)
+                runs[f"{mode} x{clients}"] = {"mode": mode, "clients": clients, **r}
+                failed = sum(r["errors"].values()) + sum(v for k, v in r["statuses"].items() if k != "200")
+                median = f"{r['median_ms']:8.1f}" if r["median_ms"] is not None else "     n/a"
+                p95 = f"{r['p95_ms']:8.1f}" if r["p95_ms"] is not None else "     n/a"
+                print(f"  {mode:<5} {clients:>4} clients  {r['rps']:>9.1f} req/s  "
+                      f"median {median} ms  p95 {p95} ms  failed {failed}", file=sys.stderr)
+        finally:
+            stop_server(proc)
+
+    current = {
+        "runs": runs,
+        "config": {
+            "size": format_size(size), "seed": args.seed, "duration": args.duration,
+            "warmup": args.warmup, "cache": not args.no_cache, "routes": ROUTES
+        }
+    }
+    path = write_results("load", current, args.output)
+    print(f"\nResults written to {path}")
+
+if __name__ == "__main__":
+    main()
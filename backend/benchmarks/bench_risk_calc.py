@@ -0,0 +1,247 @@
+##################################################################################
+# benchmarks/bench_risk_calc.py
+#
+# Micro-benchmarks for the risk_calc scoring path:
+#   compute_risk_score_enhanced (dict records and ViolationBatch),
+#   compute_aggregated_risk, compute_weighted_risk,
+#   compute_repeated_category_factor, classify_risk, generate_extended_report
+#
+# Each function runs on synthetic businesses with 1, 10, 100 and 10,000
+# violations; reported per case: ns/call, ns/violation and tracemalloc peak
+# bytes for one call.
+#
+#   python benchmarks/bench_risk_calc.py
+#   python benchmarks/bench_risk_calc.py --baseline benchmarks/results/risk_calc-<rev>.json --threshold 1.25
+#
+# With --baseline the script exits non-zero when any case's ns/violation is
+# more than `threshold` times the baseline value.
+##################################################################################
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from common import compare_metric, load_results, write_results
+
+from risk_calc import (
+    classify_risk,
+    compute_aggregated_risk,
+    compute_repeated_category_factor,
+    compute_risk_score_enhanced,
+    compute_weighted_risk,
+    decayed_fines,
+    generate_extended_report,
+    repeated_severity_bumps,
+    ViolationBatch
+)
+from seed import SEED_END_DATE, SEED_START_DATE, SEED_TOTAL_DAYS, VIOLATION_CATALOG
+
+DEFAULT_SIZES = "1,10,100,10000"
+BUSINESS_TYPE = "Restaurant"
+
+# Fixed benchmark inputs for the report generator
+GLOBAL_STATS = {
+    "global_avg_score": 1.1,
+    "global_count": 449,
+    "industry_avg_score": 1.3,
+    "industry_count": 80,
+    "last6_violations": 1200,
+    "prior6_violations": 1000
+}
+
+###############################################################################
+# Synthetic businesses
+###############################################################################
+def make_business(n, seed=0, catalog=VIOLATION_CATALOG):
+    """
+    One business with exactly n violations, in the dict format seed.py passes
+    to compute_risk_score_enhanced, plus the aggregate inputs the legacy
+    functions take.
+    """
+    rng = np.random.default_rng(seed)
+    n_types = len(catalog["type_names"])
+    types = rng.integers(n_types, size=n)
+    cats = catalog["type_category"][types]
+    fines = catalog["fine_tiers"][types, 0].astype(np.int64)
+    days = rng.integers(0, SEED_TOTAL_DAYS + 1, size=n)
+    ts = np.datetime64(SEED_START_DATE, "us") + days.astype("timedelta64[D]")
+    closed = rng.random(n) < 0.2
+
+    base_sev = catalog["severity"][types].astype(np.int64)
+    eff_sev = base_sev + repeated_severity_bumps(types, ts, [0, n])
+    days_since = (np.datetime64(SEED_END_DATE, "us") - ts) // np.timedelta64(1, "D")
+    decayed = decayed_fines(fines, days_since)
+    ts_list = ts.astype(datetime).tolist()
+
+    records = [{
+        "category": catalog["categories"][cats[i]],
+        "base_severity": int(base_sev[i]),
+        "effective_severity": int(eff_sev[i]),
+        "fine": int(fines[i]),
+        "decayed_fine": float(decayed[i]),
+        "timestamp": ts_list[i],
+        "status": "Closed" if closed[i] else "Open",
+        "days_since": int(days_since[i]),
+        "seed_start": SEED_START_DATE
+    } for i in range(n)]
+
+    span_days = max((max(ts_list) - min(ts_list)).days, 1)
+    cat_counts = np.bincount(cats, minlength=len(catalog["categories"]))
+    top = np.argsort(-cat_counts, kind="stable")[:3]
+    return {
+        "records": records,
+        "batch": ViolationBatch.from_records(records),
+        "timestamps": ts_list,
+        "cat_timestamps": [(r["category"], np.datetime64(r["timestamp"])) for r in records],
+        "frequency": n / (span_days / 30.0),
+        "total_fines": int(fines.sum()),
+        "average_fine": float(fines.mean()),
+        "average_severity": float(base_sev.mean()),
+        "top_categories": [(catalog["categories"][c], int(cat_counts[c])) for c in top if cat_counts[c]],
+        "repeated_offenders": [catalog["categories"][c] for c in np.flatnonzero(cat_counts > 3)],
+        "open_count": int((~closed).sum()),
+        "closed_count": int(closed.sum()),
+        "last_violation_date": max(ts_list)
+    }
+
+def benchmark_cases(biz, n):
+    """(name, zero-argument callable) for every function under test."""
+    score = compute_risk_score_enhanced(biz["records"], BUSINESS_TYPE)
+    return [
+        ("compute_risk_score_enhanced",
+         lambda: compute_risk_score_enhanced(biz["records"], BUSINESS_TYPE)),
+        ("compute_risk_score_enhanced[batch]",
+         lambda: compute_risk_score_enhanced(biz["batch"], BUSINESS_TYPE)),
+        ("compute_aggregated_risk",
+         lambda: compute_aggregated_risk(biz["frequency"], biz["average_fine"], biz["average_severity"],
+                                         biz["timestamps"], 1.0)),
+        ("compute_weighted_risk",
+         lambda: compute_weighted_risk(n, biz["total_fines"], biz["frequency"], biz["average_severity"])),
+        ("compute_repeated_category_factor",
+         lambda: compute_repeated_category_factor(biz["cat_timestamps"], 60)),
+        ("classify_risk",
+         lambda: classify_risk(score)),
+        ("generate_extended_report",
+         lambda: generate_extended_report(
+             business_name="Benchmark Business",
+             final_score=score,
+             risk_level=classify_risk(score),
+             top_categories=biz["top_categories"],
+             repeated_offenders=biz["repeated_offenders"],
+             total_violations=n,
+             last_violation_date=biz["last_violation_date"],
+             business_type=BUSINESS_TYPE,
+             global_stats=GLOBAL_STATS,
+             open_count=biz["open_count"],
+             closed_count=biz["closed_count"]
+         )),
+    ]
+
+###############################################################################
+# Measurement
+###############################################################################
+def time_call(fn, min_time, repeat):
+    """Best-of-`repeat` ns per call, each round looping for at least min_time."""
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time * 1e9 / elapsed))
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter_ns() - start) / loops)
+    return best, loops
+
+def measure_allocations(fn):
+    """Peak traced bytes and number of live blocks allocated during one call."""
+    tracemalloc.start()
+    try:
+        before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak - base, after_blocks - before_blocks
+
+def run(sizes, min_time, repeat):
+    results = {}
+    for n in sizes:
+        biz = make_business(n, seed=n)
+        for name, fn in benchmark_cases(biz, n):
+            ns_call, loops = time_call(fn, min_time, repeat)
+            peak_bytes, live_blocks = measure_allocations(fn)
+            key = f"{name}[{n}]"
+            results[key] = {
+                "function": name,
+                "violations": n,
+                "ns_per_call": ns_call,
+                "ns_per_violation": ns_call / n,
+                "peak_bytes": peak_bytes,
+                "peak_bytes_per_violation": peak_bytes / n,
+                "live_blocks": live_blocks,
+                "loops": loops
+            }
+            print(f"{key:<44} {ns_call:>14,.0f} ns/call {ns_call / n:>12,.0f} ns/violation "
+                  f"{peak_bytes:>12,} B peak", file=sys.stderr)
+    return results
+
+def check_regressions(baseline, current, threshold, min_ns=1000):
+    """
+    Cases whose ns/violation grew by more than `threshold` x. Cases faster
+    than `min_ns` per call in both runs are timer noise and are skipped.
+    """
+    failures = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if not base or max(base["ns_per_call"], cur["ns_per_call"]) < min_ns:
+            continue
+        ratio = compare_metric(base["ns_per_violation"], cur["ns_per_violation"])
+        if ratio is not None and ratio > threshold:
+            failures.append((key, ratio))
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="risk_calc micro-benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated violation counts per business")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds (best is kept)")
+    parser.add_argument("--output", default=None, help="Result file (default results/risk_calc-<rev>.json)")
+    parser.add_argument("--baseline", default=None, help="Earlier result file for the regression check")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Allowed ns/violation ratio vs baseline")
+    parser.add_argument("--min-ns", type=float, default=1000, help="Ignore cases faster than this per call")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    cases = run(sizes, args.min_time, args.repeat)
+    path = write_results("risk_calc", {"cases": cases, "config": {"min_time": args.min_time, "repeat": args.repeat}},
+                         args.output)
+    print(f"\nResults written to {path}")
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        failures = check_regressions(baseline["cases"], cases, args.threshold, args.min_ns)
+        if failures:
+            print(f"\nRegressions over {args.threshold:.2f}x vs {baseline['meta']['revision']}:")
+            for key, ratio in failures:
+                print(f"  {key:<44} {ratio:.2f}x")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.2f}x vs {baseline['meta']['revision']}.")
+
+if __name__ == "__main__":
+    main()
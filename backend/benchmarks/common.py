@@ -0,0 +1,80 @@
+##################################################################################
+# benchmarks/common.py
+#
+# Shared helpers for the benchmark scripts:
+#   - paths for cached fixture databases and JSON results
+#   - git revision / environment metadata stamped on every result file
+#   - size parsing ("10k", "1m") and result comparison
+##################################################################################
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+
+# Make backend modules (app, models, seed, risk_calc) importable from scripts
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Average violations per seeded business, measured from the generator's
+# count distribution; used to size fixtures by violation count
+AVG_VIOLATIONS_PER_BUSINESS = 15.1
+
+def parse_size(text):
+    """ "10k" -> 10000, "1m" -> 1000000, "2500" -> 2500 """
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    digits = text[:-1] if scale != 1 else text
+    return int(float(digits) * scale)
+
+def format_size(n):
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f"{n // 1_000_000}m"
+    if n >= 1_000 and n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_metadata():
+    return {
+        "revision": git_revision(),
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform()
+    }
+
+def write_results(kind, payload, path=None):
+    """Writes payload (plus run metadata) to results/<kind>-<revision>.json by default."""
+    data = {"kind": kind, "meta": run_metadata(), **payload}
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{kind}-{data['meta']['revision']}.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+    return path
+
+def load_results(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+def compare_metric(base, current):
+    """Ratio current / base, or None when either side is missing or zero."""
+    if not base or current is None:
+        return None
+    return current / base
@@ -0,0 +1,308 @@
+##################################################################################
+# column_store.py
+#
+# Memory-mapped columnar copy of the violation table for batch scoring.
+# Each column is a flat binary file read back with np.memmap, so scoring
+# millions of violations never builds ORM objects or per-violation dicts:
+#
+#   <store_dir>/gen-<YYYYmmdd-HHMMSS>/
+#       meta.json            row/business counts, dtypes, lookup names
+#       businesses.json      business names + business types (index = business id)
+#       offsets.i64          business b owns rows offsets[b]:offsets[b + 1]
+#       violation_id.i64
+#       timestamp.i64        microseconds since epoch (view as datetime64[us])
+#       business.i32
+#       category.i16         category_id
+#       violation_type.i16   violation_type_id
+#       fine.i32
+#       severity.i8
+#       status.i8            status_id
+#   <store_dir>/CURRENT      -> name of the newest complete generation
+#
+# Rows are grouped by business and in id order inside each business, which is
+# the layout risk_calc.score_violation_columns() expects.
+#
+#   flask --app app refresh-column-store [--out DIR]
+##################################################################################
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from models import db, Category, ViolationStatus
+from risk_calc import score_violation_columns
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_STORE_DIR = os.path.join(BASE_DIR, "instance", "column_store")
+CURRENT_POINTER = "CURRENT"
+FETCH_ROWS = 100_000
+SCORE_CHUNK_ROWS = 2_000_000
+
+# column name -> (file name, dtype)
+COLUMNS = {
+    "violation_id": ("violation_id.i64", np.int64),
+    "timestamp": ("timestamp.i64", np.int64),
+    "business": ("business.i32", np.int32),
+    "category": ("category.i16", np.int16),
+    "violation_type": ("violation_type.i16", np.int16),
+    "fine": ("fine.i32", np.int32),
+    "severity": ("severity.i8", np.int8),
+    "status": ("status.i8", np.int8),
+}
+
+###############################################################################
+# Refresh from the database
+###############################################################################
+def _create_column(path, dtype, n):
+    # np.memmap can't map zero bytes; empty columns are plain empty files
+    if n == 0:
+        open(path, "wb").close()
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="w+", shape=(n,))
+
+def refresh_column_store(store_dir=DEFAULT_STORE_DIR):
+    """
+    Streams the violation table into a new store generation and switches
+    CURRENT to it; the previous generation is removed afterwards. Readers that
+    already opened the old generation keep their mappings. Must run inside an
+    app context. Returns the generation path.
+    """
+    conn = db.session.connection()
+    n = conn.exec_driver_sql("SELECT COUNT(*) FROM violation").scalar()
+    types = dict(conn.exec_driver_sql(
+        "SELECT business_name, business_type FROM risk_classification"
+    ).fetchall())
+
+    name = f"gen-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    gen_dir = os.path.join(store_dir, name)
+    os.makedirs(gen_dir)
+
+    try:
+        cols = {col: _create_column(os.path.join(gen_dir, fname), dtype, n)
+                for col, (fname, dtype) in COLUMNS.items()}
+        business_names = []
+        result = conn.exec_driver_sql("""
+            SELECT id, business_name, timestamp, category_id, violation_type_id,
+                   fine, severity, status_id
+            FROM violation ORDER BY business_name, id
+        """)
+        pos = 0
+        last_name = None
+        while True:
+            rows = result.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            chunk = list(zip(*rows))
+            names = chunk[1]
+            biz = np.empty(len(rows), dtype=np.int32)
+            for i, biz_name in enumerate(names):
+                if biz_name != last_name:
+                    business_names.append(biz_name)
+                    last_name = biz_name
+                biz[i] = len(business_names) - 1
+
+            end = pos + len(rows)
+            cols["violation_id"][pos:end] = chunk[0]
+            cols["timestamp"][pos:end] = np.array(chunk[2], dtype="datetime64[us]").astype(np.int64)
+            cols["business"][pos:end] = biz
+            cols["category"][pos:end] = chunk[3]
+            cols["violation_type"][pos:end] = chunk[4]
+            cols["fine"][pos:end] = chunk[5]
+            cols["severity"][pos:end] = chunk[6]
+            cols["status"][pos:end] = chunk[7]
+            pos = end
+
+        business = cols["business"][:pos]
+        offsets = np.searchsorted(business, np.arange(len(business_names) + 1)).astype(np.int64)
+        offsets.tofile(os.path.join(gen_dir, "offsets.i64"))
+        for arr in cols.values():
+            if isinstance(arr, np.memmap):
+                arr.flush()
+        del cols, business
+
+        with open(os.path.join(gen_dir, "businesses.json"), "w", encoding="utf-8") as fh:
+            json.dump({
+                "names": business_names,
+                "types": [types.get(b) or "General Business" for b in business_names]
+            }, fh)
+        with open(os.path.join(gen_dir, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "rows": pos,
+                "businesses": len(business_names),
+                "columns": {col: [fname, np.dtype(dtype).str] for col, (fname, dtype) in COLUMNS.items()},
+                "categories": dict(db.session.query(Category.id, Category.name).all()),
+                "statuses": dict(db.session.query(ViolationStatus.id, ViolationStatus.name).all())
+            }, fh, indent=2)
+    except Exception:
+        shutil.rmtree(gen_dir, ignore_errors=True)
+        raise
+    finally:
+        db.session.rollback()   # read-only; release the connection
+
+    pointer_tmp = os.path.join(store_dir, CURRENT_POINTER + ".tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as fh:
+        fh.write(name)
+    os.replace(pointer_tmp, os.path.join(store_dir, CURRENT_POINTER))
+
+    for old in os.listdir(store_dir):
+        if old.startswith("gen-") and old != name:
+            shutil.rmtree(os.path.join(store_dir, old), ignore_errors=True)
+    return gen_dir
+
+###############################################################################
+# Read path
+###############################################################################
+class ColumnStore:
+    """Read-only memmap view of one store generation."""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        with open(os.path.join(store_dir, CURRENT_POINTER), encoding="utf-8") as fh:
+            self.path = os.path.join(store_dir, fh.read().strip())
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        with open(os.path.join(self.path, "businesses.json"), encoding="utf-8") as fh:
+            businesses = json.load(fh)
+        self.business_names = businesses["names"]
+        self.business_types = businesses["types"]
+        self.offsets = np.fromfile(os.path.join(self.path, "offsets.i64"), dtype=np.int64)
+        self.rows = self.meta["rows"]
+        self._columns = {}
+
+    def column(self, name):
+        """Zero-copy memmap of one column (timestamps come back as datetime64[us])."""
+        arr = self._columns.get(name)
+        if arr is None:
+            fname, dtype = COLUMNS[name]
+            if self.rows == 0:
+                arr = np.zeros(0, dtype=dtype)
+            else:
+                arr = np.memmap(os.path.join(self.path, fname), dtype=dtype, mode="r", shape=(self.rows,))
+            if name == "timestamp":
+                arr = arr.view("datetime64[us]")
+            self._columns[name] = arr
+        return arr
+
+    def status_ids(self, status_name):
+        return [int(k) for k, v in self.meta["statuses"].items() if v == status_name]
+
+def open_column_store(store_dir=DEFAULT_STORE_DIR):
+    return ColumnStore(store_dir)
+
+def business_chunks(offsets, max_rows):
+    """[start, stop) business ranges of at most ~max_rows violations each."""
+    n_biz = offsets.size - 1
+    start = 0
+    while start < n_biz:
+        limit = offsets[start] + max_rows
+        stop = int(np.searchsorted(offsets, limit, side="right")) - 1
+        stop = min(max(stop, start + 1), n_biz)
+        yield start, stop
+        start = stop
+
+def _business_rows(offsets, businesses):
+    """Row indices of the given businesses, concatenated, plus their local offsets."""
+    lengths = offsets[businesses + 1] - offsets[businesses]
+    local = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    rows = np.repeat(offsets[businesses] - local[:-1], lengths) + np.arange(local[-1])
+    return rows, local
+
+def score_column_store(store, as_of, chunk_rows=SCORE_CHUNK_ROWS, businesses=None):
+    """
+    Enhanced score for every business in the store, computed a chunk of
+    businesses at a time straight from the mapped columns, so peak memory is
+    bounded by chunk_rows rather than the table size. Returns a float64 array
+    aligned with store.business_names, or with `businesses` (ascending store
+    indices) when only some businesses are scored.
+    """
+    offsets = store.offsets
+    open_ids = np.array(store.status_ids("Open"), dtype=np.int8)
+    cols = {name: store.column(name) for name in
+            ("timestamp", "fine", "severity", "violation_type", "category", "status")}
+
+    if businesses is not None:
+        businesses = np.asarray(businesses, dtype=np.int64)
+        sizes = offsets[businesses + 1] - offsets[businesses]
+        sub_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        scores = np.zeros(businesses.size, dtype=np.float64)
+        for start, stop in business_chunks(sub_offsets, chunk_rows):
+            picked = businesses[start:stop]
+            rows, local = _business_rows(offsets, picked)
+            scores[start:stop] = score_violation_columns(
+                local,
+                cols["timestamp"][rows],
+                cols["fine"][rows],
+                cols["severity"][rows],
+                cols["violation_type"][rows],
+                cols["category"][rows],
+                np.isin(cols["status"][rows], open_ids),
+                [store.business_types[b] for b in picked],
+                as_of
+            )
+        return scores
+
+    scores = np.zeros(offsets.size - 1, dtype=np.float64)
+    for start, stop in business_chunks(offsets, chunk_rows):
+        lo, hi = offsets[start], offsets[stop]
+        rows = slice(lo, hi)
+        scores[start:stop] = score_violation_columns(
+            offsets[start:stop + 1] - lo,
+            cols["timestamp"][rows],
+            cols["fine"][rows],
+            cols["severity"][rows],
+            cols["violation_type"][rows],
+            cols["category"][rows],
+            np.isin(cols["status"][rows], open_ids),
+            store.business_types[start:stop],
+            as_of
+        )
+    return scores
+
+# Odd 64-bit constants for the per-row digest mix
+_DIGEST_MULTIPLIERS = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB
+], dtype=np.uint64)
+
+def business_digests(store, chunk_rows=SCORE_CHUNK_ROWS):
+    """
+    One 64-bit fingerprint per business over every scoring input (ids,
+    timestamps, category, type, fine, severity, status). Any added, removed
+    or edited violation changes it. Returned as int64 so it fits an SQLite
+    INTEGER column.
+    """
+    offsets = store.offsets
+    digests = np.zeros(offsets.size - 1, dtype=np.uint64)
+    names = ("violation_id", "timestamp", "category", "violation_type", "fine", "severity", "status")
+    cols = [store.column(name) for name in names]
+    with np.errstate(over="ignore"):
+        for start, stop in business_chunks(offsets, chunk_rows):
+            lo, hi = offsets[start], offsets[stop]
+            h = np.zeros(hi - lo, dtype=np.uint64)
+            for col, mult in zip(cols, _DIGEST_MULTIPLIERS):
+                values = col[lo:hi]
+                if values.dtype.kind == "M":
+                    values = values.view(np.int64)
+                h = (h ^ values.astype(np.int64).view(np.uint64)) * mult
+                h ^= h >> np.uint64(29)
+            sizes = np.diff(offsets[start:stop + 1])
+            nonempty = sizes > 0
+            part = np.zeros(stop - start, dtype=np.uint64)
+            if nonempty.any():
+                part[nonempty] = np.add.reduceat(h, offsets[start:stop][nonempty] - lo)
+            digests[start:stop] = part
+    return digests.view(np.int64)
+
+if __name__ == "__main__":
+    import argparse
+    from app import app
+
+    parser = argparse.ArgumentParser(description="Refresh the memory-mapped violation column store")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(refresh_column_store(args.out or app.config['COLUMN_STORE_DIR']))
@@ -0,0 +1,273 @@
+##################################################################################
+# compression.py
+#
+# Response compression and a compressed response cache for the Flask app:
+#   - every response over COMPRESS_MIN_SIZE bytes with a compressible mimetype
+#     is encoded with brotli (when the optional `brotli` package is installed)
+#     or gzip, whichever the client prefers in Accept-Encoding
+#   - @cached_response keeps a GET route's raw payload together with each
+#     compressed encoding it has been asked for, so repeat hits skip both the
+#     view and the compressor; entries expire after RESPONSE_CACHE_TTL seconds
+#     and invalidate_response_cache() drops them after writes
+#   - only requests without query parameters are cached, plus the parameters
+#     a route lists in @cached_response(params=...) (normalised, so parameter
+#     order does not matter); the cache is an LRU bounded by
+#     RESPONSE_CACHE_MAX_ENTRIES entries and RESPONSE_CACHE_MAX_BYTES of raw
+#     plus compressed bytes
+#   - a miss is compressed at the fast LIVE_LEVELS; a background thread then
+#     re-encodes the cached variant harder for later hits: CACHED_LEVELS up to
+#     MAX_LEVEL_BODY_BYTES (brotli 11 costs ~3.5 us per byte, 8 s for a 2.4 MB
+#     body), LARGE_BODY_LEVELS above. At most MAX_PENDING_RECOMPRESS re-encodes
+#     wait at a time, and one whose entry was evicted or expired is skipped
+#
+# Call init_compression(app) once; responses carry X-Cache: HIT/MISS when
+# they went through the cache (BYPASS when the body was too large to store).
+##################################################################################
+
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html", "text/csv")
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_MAX_ENTRIES = 64
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Live responses favour speed; cached payloads are encoded once, so squeeze harder
+LIVE_LEVELS = {"br": 4, "gzip": 5}
+CACHED_LEVELS = {"br": 11, "gzip": 9}
+# brotli 11 on a 2.4 MB body takes seconds; br 6 / gzip 9 take ~50 ms
+LARGE_BODY_LEVELS = {"br": 6, "gzip": 9}
+MAX_LEVEL_BODY_BYTES = 64 * 1024
+MAX_PENDING_RECOMPRESS = 4
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def negotiate_encoding():
+    """Best encoding the client accepts, or None (identity)."""
+    return request.accept_encodings.best_match(supported_encodings())
+
+def _set_encoded_body(response, encoding, body):
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+
+###############################################################################
+# Compressed response cache
+###############################################################################
+# Max-level re-encoding runs here, off the request path; the semaphore caps
+# the queue so a burst of misses cannot pile up work (and payloads) behind it
+_recompressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recompress")
+_recompress_slots = threading.BoundedSemaphore(MAX_PENDING_RECOMPRESS)
+
+def cached_levels(size):
+    return CACHED_LEVELS if size <= MAX_LEVEL_BODY_BYTES else LARGE_BODY_LEVELS
+
+class CachedPayload:
+    __slots__ = ("body", "status", "mimetype", "headers", "created", "expires", "cached",
+                 "encoded", "lock")
+
+    def __init__(self, body, status, mimetype, headers):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.headers = headers
+        self.created = time.monotonic()
+        self.expires = float("inf")   # set by ResponseCache.put
+        self.cached = False           # in a ResponseCache; cleared on eviction
+        self.encoded = {}
+        self.lock = threading.Lock()
+
+    def nbytes(self):
+        return len(self.body) + sum(len(b) for b in list(self.encoded.values()))
+
+    def encoded_body(self, encoding):
+        """
+        Compressed bytes for `encoding`. The first request pays for a
+        LIVE_LEVELS encode; the cached_levels() version replaces it once the
+        background re-encode finishes (skipped when the queue is full).
+        """
+        body = self.encoded.get(encoding)
+        if body is None:
+            with self.lock:
+                body = self.encoded.get(encoding)
+                if body is None:
+                    body = compress(self.body, encoding, LIVE_LEVELS[encoding])
+                    self.encoded[encoding] = body
+                    if _recompress_slots.acquire(blocking=False):
+                        _recompressor.submit(self._recompress, encoding)
+        return body
+
+    def _recompress(self, encoding):
+        try:
+            if not self.cached or time.monotonic() > self.expires:
+                return
+            self.encoded[encoding] = compress(self.body, encoding, cached_levels(len(self.body))[encoding])
+        finally:
+            _recompress_slots.release()
+
+class ResponseCache:
+    """
+    Thread-safe LRU of CachedPayloads keyed by path + normalised query string,
+    bounded by entry count and by total raw + compressed bytes.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_MAX_ENTRIES, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def nbytes(self):
+        with self._lock:
+            return sum(e.nbytes() for e in self._entries.values())
+
+    def _drop(self, key):
+        self._entries.pop(key).cached = False
+
+    def get(self, key, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.created > ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, ttl):
+        """Stores `entry` unless its body alone exceeds max_bytes; returns whether it was stored."""
+        if len(entry.body) > self.max_bytes:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            for k in [k for k, e in self._entries.items() if now - e.created > ttl]:
+                self._drop(k)
+            if key in self._entries:
+                self._drop(key)
+            entry.expires = entry.created + ttl
+            entry.cached = True
+            self._entries[key] = entry
+            # Compressed variants grow entries after put(), so re-total here
+            total = sum(e.nbytes() for e in self._entries.values())
+            while len(self._entries) > self.max_entries or (total > self.max_bytes and len(self._entries) > 1):
+                oldest = next(iter(self._entries))
+                total -= self._entries[oldest].nbytes()
+                self._drop(oldest)
+            return True
+
+    def clear(self):
+        with self._lock:
+            for e in self._entries.values():
+                e.cached = False
+            self._entries.clear()
+
+def invalidate_response_cache(app=None):
+    cache = (app or current_app).extensions.get("response_cache")
+    if cache is not None:
+        cache.clear()
+
+def _cache_key(params):
+    """Path plus the allowed query parameters in sorted order, or None if uncacheable."""
+    args = request.args
+    if any(name not in params for name in args):
+        return None
+    query = urlencode([(name, value) for name in sorted(args) for value in args.getlist(name)])
+    return f"{request.path}?{query}"
+
+def cached_response(view=None, params=()):
+    """
+    Caches a GET view's 200 responses. Requests carrying any query parameter
+    outside `params` bypass the cache. A hit rebuilds the response from the
+    stored bytes and serves the stored compressed variant for the client's
+    encoding. Use as @cached_response or @cached_response(params=("from", "to")).
+    """
+    if view is None:
+        return lambda v: cached_response(v, params=params)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        app = current_app
+        cache = app.extensions["response_cache"]
+        ttl = app.config.get("RESPONSE_CACHE_TTL", DEFAULT_CACHE_TTL)
+        key = _cache_key(params) if ttl > 0 else None
+        if key is None:
+            return view(*args, **kwargs)
+        entry = cache.get(key, ttl)
+
+        if entry is None:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            entry = CachedPayload(
+                response.get_data(), response.status_code, response.mimetype,
+                [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-length", "content-type")]
+            )
+            state = "MISS" if cache.put(key, entry, ttl) else "BYPASS"
+        else:
+            state = "HIT"
+
+        response = app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype,
+                                      headers=entry.headers)
+        response.headers["X-Cache"] = state
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding() if app.config.get("COMPRESS_ENABLED", True) else None
+        if encoding and len(entry.body) >= app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE):
+            _set_encoded_body(response, encoding, entry.encoded_body(encoding))
+        return response
+    return wrapper
+
+###############################################################################
+# Flask wiring
+###############################################################################
+def init_compression(app):
+    """
+    Compresses large responses (COMPRESS_MIN_SIZE, COMPRESS_ENABLED) and sets
+    up the cache used by @cached_response (RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES).
+    """
+    app.extensions["response_cache"] = ResponseCache(
+        app.config.get("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES),
+        app.config.get("RESPONSE_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES)
+    )
+
+    @app.after_request
+    def _compress_response(response):
+        if not app.config.get("COMPRESS_ENABLED", True):
+            return response
+        if (response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE):
+            return response
+        encoding = negotiate_encoding()
+        if encoding:
+            _set_encoded_body(response, encoding, compress(body, encoding, LIVE_LEVELS[encoding]))
+        return response
+
+    return app.extensions["response_cache"]
@@ -0,0 +1,351 @@
+##################################################################################
+# instrumentation.py
+#
+# Per-request timing for the Flask app:
+#   - SQLAlchemy before/after_cursor_execute hooks count and time queries per request
+#   - JSON serialization is timed separately (wrapping the app's JSON provider)
+#   - every response gets a Server-Timing header
+#   - with DEBUG_METRICS_ENABLED, one structured log line per request and
+#     /debug/metrics with per-route latency histograms in Prometheus text format
+#   - statements slower than SLOW_QUERY_THRESHOLD_MS go to a rotating slow-query
+#     log with their parameters, route and EXPLAIN QUERY PLAN (executemany
+#     batches are skipped)
+#
+# Call init_instrumentation(app) once, after the app's JSON provider is set.
+##################################################################################
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import JSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+request_logger = logging.getLogger("risk_dashboard.requests")
+slow_query_logger = logging.getLogger("risk_dashboard.slow_queries")
+
+# Prometheus-style latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+###############################################################################
+# Per-request timing state (lives on flask.g)
+###############################################################################
+def _timings():
+    if not has_request_context():
+        return None
+    return g.get("_timings")
+
+@contextmanager
+def timed_section(name):
+    """
+    Times a block inside a request handler as its own Server-Timing entry,
+    e.g. `with timed_section("hydrate"): rows = query.all()`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _timings()
+        if timings is not None:
+            sections = timings["sections"]
+            sections[name] = sections.get(name, 0.0) + (time.perf_counter() - start)
+
+###############################################################################
+# SQL timing
+###############################################################################
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    timings = _timings()
+    if timings is not None:
+        timings["sql_count"] += 1
+        timings["sql_time"] += elapsed
+    # Bulk executemany loads (seeding, rescoring) are slow by design; they
+    # would flood the log without pointing at a query to fix
+    if _slow_query_threshold is not None and elapsed >= _slow_query_threshold and not executemany:
+        _log_slow_query(conn, statement, parameters, elapsed)
+
+_sql_hooks_installed = False
+
+def install_sql_hooks():
+    """Listens on every Engine, so it covers Flask-SQLAlchemy's lazily created one."""
+    global _sql_hooks_installed
+    if _sql_hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _sql_hooks_installed = True
+
+###############################################################################
+# Slow-query log
+###############################################################################
+_slow_query_threshold = None   # seconds; None disables the log
+
+# Statements EXPLAIN QUERY PLAN can describe (writes would be planned, not run,
+# but their plans are rarely what we are after)
+_EXPLAINABLE_PREFIXES = ("select", "with")
+MAX_LOGGED_PARAMS_CHARS = 2000
+
+def configure_slow_query_log(threshold_ms, log_path, max_bytes=5 * 1024 * 1024, backup_count=5):
+    """
+    Logs every statement taking at least threshold_ms to a rotating file at
+    log_path. threshold_ms=None (or negative) turns the log off.
+    """
+    global _slow_query_threshold
+    for handler in list(slow_query_logger.handlers):
+        slow_query_logger.removeHandler(handler)
+        handler.close()
+    if threshold_ms is None or threshold_ms < 0:
+        _slow_query_threshold = None
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.WARNING)
+    slow_query_logger.propagate = False
+    _slow_query_threshold = threshold_ms / 1000.0
+
+def explain_query_plan(conn, statement, parameters):
+    """
+    Runs EXPLAIN QUERY PLAN for `statement` on the raw DBAPI connection (so the
+    cursor hooks don't fire again) and returns the plan as indented lines.
+    """
+    if conn.dialect.name != "sqlite":
+        return None
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE_PREFIXES):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    # rows are (id, parent, notused, detail); indent children under parents
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+def _log_slow_query(conn, statement, parameters, elapsed):
+    if has_request_context():
+        route = request.endpoint or "<unmatched>"
+        path = request.path
+    else:
+        route = path = None   # CLI commands, seeding, background jobs
+
+    try:
+        plan = explain_query_plan(conn, statement, parameters)
+    except Exception as e:  # never let the diagnostics break the request
+        plan = [f"EXPLAIN failed: {type(e).__name__}: {e}"]
+    params = repr(parameters)
+    if len(params) > MAX_LOGGED_PARAMS_CHARS:
+        params = params[:MAX_LOGGED_PARAMS_CHARS] + "..."
+
+    slow_query_logger.warning(json.dumps({
+        "event": "slow_query",
+        "duration_ms": _ms(elapsed),
+        "route": route,
+        "path": path,
+        "statement": " ".join(statement.split()),
+        "parameters": params,
+        "query_plan": plan
+    }))
+
+###############################################################################
+# Serialization timing
+###############################################################################
+class TimedJSONProvider(JSONProvider):
+    """Delegates to the app's existing JSON provider and records time spent in it."""
+
+    def __init__(self, app, inner):
+        super().__init__(app)
+        self.inner = inner
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.inner.dumps(obj, **kwargs)
+        finally:
+            timings = _timings()
+            if timings is not None:
+                timings["serialize_time"] += time.perf_counter() - start
+
+    def loads(self, s, **kwargs):
+        return self.inner.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.inner.response(*args, **kwargs)
+        finally:
+            timings = _timings()
+            if timings is not None:
+                timings["serialize_time"] += time.perf_counter() - start
+
+###############################################################################
+# Latency histograms
+###############################################################################
+class RouteMetrics:
+    """Thread-safe per-(route, method) latency histograms plus status counters."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._status_counts = {}
+        self._sql_totals = {}
+
+    def observe(self, route, method, status, seconds, sql_count, sql_seconds):
+        key = (route, method)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._histograms[key] = hist
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += seconds
+            hist["count"] += 1
+
+            status_key = (route, method, status)
+            self._status_counts[status_key] = self._status_counts.get(status_key, 0) + 1
+            queries, sql_time = self._sql_totals.get(key, (0, 0.0))
+            self._sql_totals[key] = (queries + sql_count, sql_time + sql_seconds)
+
+    def render_prometheus(self):
+        def labels(route, method, **extra):
+            pairs = [("route", route), ("method", method)] + list(extra.items())
+            inner = ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs)
+            return "{" + inner + "}"
+
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        with self._lock:
+            for (route, method), hist in sorted(self._histograms.items()):
+                for bound, count in zip(self.buckets, hist["counts"]):
+                    lines.append(f"http_request_duration_seconds_bucket{labels(route, method, le=repr(bound))} {count}")
+                lines.append(f"http_request_duration_seconds_bucket{labels(route, method, le='+Inf')} {hist['count']}")
+                lines.append(f"http_request_duration_seconds_sum{labels(route, method)} {hist['sum']:.6f}")
+                lines.append(f"http_request_duration_seconds_count{labels(route, method)} {hist['count']}")
+
+            lines.append("# HELP http_requests_total Requests by route and status.")
+            lines.append("# TYPE http_requests_total counter")
+            for (route, method, status), count in sorted(self._status_counts.items()):
+                lines.append(f"http_requests_total{labels(route, method, status=str(status))} {count}")
+
+            lines.append("# HELP sql_queries_total SQL statements executed, by route.")
+            lines.append("# TYPE sql_queries_total counter")
+            for (route, method), (queries, _) in sorted(self._sql_totals.items()):
+                lines.append(f"sql_queries_total{labels(route, method)} {queries}")
+            lines.append("# HELP sql_query_duration_seconds_total Time spent executing SQL, by route.")
+            lines.append("# TYPE sql_query_duration_seconds_total counter")
+            for (route, method), (_, sql_time) in sorted(self._sql_totals.items()):
+                lines.append(f"sql_query_duration_seconds_total{labels(route, method)} {sql_time:.6f}")
+        return "\n".join(lines) + "\n"
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+###############################################################################
+# Flask wiring
+###############################################################################
+def _ms(seconds):
+    return round(seconds * 1000.0, 3)
+
+def init_instrumentation(app):
+    """
+    Installs the hooks on `app` and registers GET /debug/metrics. The
+    endpoint and the per-request log line are off unless
+    DEBUG_METRICS_ENABLED is True. The slow-query log is set up from
+    SLOW_QUERY_THRESHOLD_MS / SLOW_QUERY_LOG.
+    """
+    install_sql_hooks()
+    if app.config.get("SLOW_QUERY_LOG"):
+        configure_slow_query_log(app.config.get("SLOW_QUERY_THRESHOLD_MS"), app.config["SLOW_QUERY_LOG"])
+    app.json = TimedJSONProvider(app, app.json)
+    metrics = RouteMetrics()
+    app.extensions["route_metrics"] = metrics
+
+    if not request_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        request_logger.addHandler(handler)
+        request_logger.setLevel(logging.INFO)
+
+    @app.before_request
+    def _start_timer():
+        g._timings = {
+            "start": time.perf_counter(),
+            "sql_count": 0,
+            "sql_time": 0.0,
+            "serialize_time": 0.0,
+            "sections": {}
+        }
+
+    @app.after_request
+    def _finish_timer(response):
+        timings = g.pop("_timings", None)
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings["start"]
+        sql_time = timings["sql_time"]
+        serialize_time = timings["serialize_time"]
+        section_time = sum(timings["sections"].values())
+        # Everything else: ORM hydration, dict building, Python logic
+        app_time = max(total - sql_time - serialize_time - section_time, 0.0)
+
+        entries = [
+            f'sql;dur={_ms(sql_time)};desc="{timings["sql_count"]} queries"',
+            f"serialize;dur={_ms(serialize_time)}"
+        ]
+        entries += [f"{name};dur={_ms(sec)}" for name, sec in timings["sections"].items()]
+        entries += [f"app;dur={_ms(app_time)}", f"total;dur={_ms(total)}"]
+        response.headers["Server-Timing"] = ", ".join(entries)
+
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.observe(route, request.method, response.status_code, total,
+                        timings["sql_count"], sql_time)
+        if not app.config.get("DEBUG_METRICS_ENABLED", False):
+            return response
+        request_logger.info(json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "duration_ms": _ms(total),
+            "sql_queries": timings["sql_count"],
+            "sql_ms": _ms(sql_time),
+            "serialize_ms": _ms(serialize_time),
+            "app_ms": _ms(app_time),
+            "sections_ms": {name: _ms(sec) for name, sec in timings["sections"].items()},
+            "bytes": response.calculate_content_length()
+        }))
+        return response
+
+    @app.route("/debug/metrics", methods=["GET"])
+    def debug_metrics():
+        if not app.config.get("DEBUG_METRICS_ENABLED", False):
+            return Response("Not Found\n", status=404, mimetype="text/plain")
+        return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    return metrics
@@ -3,6 +3,8 @@
 #
 # Defines:
 #   - Flask & SQLAlchemy setup
+#   - Lookup tables for dictionary-encoded violation columns
+#     (category, violation_type, location, status)
 #   - Violation model (with resolution tracking)
 #   - RiskClassification model
 ##################################################################################
@@ -27,39 +29,159 @@ from flask import Flask
 # ----------------------------
 db = SQLAlchemy()
 
+# ----------------------------
+# Lookup tables: each distinct category / violation type / location / status
+# string is stored once and referenced from Violation by a small integer id.
+# ----------------------------
+class LookupMixin:
+    """
+    Shared behaviour for the name lookup tables.
+    `intern(name)` returns the row for a name, creating it on first use
+    (with any extra column values passed as keywords).
+    Ids are cached per process so seeding doesn't query once per violation.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+
+    @classmethod
+    def intern(cls, name, **attrs):
+        cache = cls.__dict__.get("_id_cache")
+        if cache is None:
+            cache = {}
+            cls._id_cache = cache
+        cached_id = cache.get(name)
+        if cached_id is not None:
+            row = db.session.get(cls, cached_id)
+            if row is not None and row.name == name:
+                return row
+        row = cls.query.filter_by(name=name).first()
+        if row is None:
+            row = cls(name=name, **attrs)
+            db.session.add(row)
+            db.session.flush()
+        cache[name] = row.id
+        return row
+
+    @classmethod
+    def clear_cache(cls):
+        cls._id_cache = {}
+
+class Category(LookupMixin, db.Model):
+    __tablename__ = 'category'
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+class ViolationType(LookupMixin, db.Model):
+    __tablename__ = 'violation_type'
+    name = db.Column(db.String(200), unique=True, nullable=False)
+    code = db.Column(db.String(10), nullable=True, index=True)  # regulatory Code, e.g. "1.1"
+
+class Location(LookupMixin, db.Model):
+    __tablename__ = 'location'
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+class ViolationStatus(LookupMixin, db.Model):
+    __tablename__ = 'violation_status'
+    name = db.Column(db.String(20), unique=True, nullable=False)
+
+LOOKUP_MODELS = (Category, ViolationType, Location, ViolationStatus)
+
+def clear_lookup_caches():
+    # Call after drop_all()/create_all() so stale ids are never reused
+    for model in LOOKUP_MODELS:
+        model.clear_cache()
+
+def _lookup_property(rel_name, model):
+    """
+    Exposes a dictionary-encoded column under its old string name, so
+    `Violation(category="...")` and `v.category` keep working.
+    """
+    def getter(self):
+        ref = getattr(self, rel_name)
+        return ref.name if ref is not None else None
+
+    def setter(self, value):
+        setattr(self, rel_name, model.intern(value) if value is not None else None)
+
+    return property(getter, setter)
+
+def month_key(year, month):
+    """Integer month key (year * 12 + month - 1); consecutive months differ by 1."""
+    return year * 12 + month - 1
+
+def month_from_key(key):
+    """month_key() back to "YYYY-MM"."""
+    return f"{key // 12:04d}-{key % 12 + 1:02d}"
+
 class Violation(db.Model):
     __tablename__ = 'violation'
+    # Trend queries filter on a month_key range and group by the remaining
+    # columns, so each one is a covering index range scan
+    __table_args__ = (
+        db.Index("ix_violation_month_trend", "month_key", "category_id", "business_name", "violation_type_id"),
+        db.Index("ix_violation_month_fine", "month_key", "fine"),
+        db.Index("ix_violation_business_timestamp", "business_name", "timestamp"),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    business_name = db.Column(db.String(100), nullable=False)
-    violation_type = db.Column(db.String(200), nullable=False)
-    category = db.Column(db.String(50), nullable=False)
+    business_name = db.Column(db.String(100), nullable=False, index=True)
+    violation_type_id = db.Column(db.Integer, db.ForeignKey('violation_type.id'), nullable=False, index=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False, index=True)
     severity = db.Column(db.Integer, nullable=False)
     fine = db.Column(db.Integer, nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False)
-    location = db.Column(db.String(100), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey('location.id'), nullable=False, index=True)
     month = db.Column(db.String(7), nullable=True)  # e.g. "YYYY-MM"
+    month_key = db.Column(db.Integer, nullable=True)  # month_key(year, month) of timestamp
 
     resolution_date = db.Column(db.DateTime, nullable=True)
     corrective_actions = db.Column(db.Text, nullable=True)
-    status = db.Column(db.String(20), nullable=False, default="Open")
+    status_id = db.Column(db.Integer, db.ForeignKey('violation_status.id'), nullable=False, index=True)
+
+    # Many-to-one loads hit the session identity map, so decoding is cheap
+    violation_type_ref = db.relationship(ViolationType)
+    category_ref = db.relationship(Category)
+    location_ref = db.relationship(Location)
+    status_ref = db.relationship(ViolationStatus)
+
+    violation_type = _lookup_property("violation_type_ref", ViolationType)
+    category = _lookup_property("category_ref", Category)
+    location = _lookup_property("location_ref", Location)
+    status = _lookup_property("status_ref", ViolationStatus)
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("status", "Open")
+        ts = kwargs.get("timestamp")
+        if ts is not None:
+            kwargs.setdefault("month", ts.strftime("%Y-%m"))
+            kwargs.setdefault("month_key", month_key(ts.year, ts.month))
+        super().__init__(**kwargs)
 
 class RiskClassification(db.Model):
     __tablename__ = 'risk_classification'
     id = db.Column(db.Integer, primary_key=True)
     business_name = db.Column(db.String(100), unique=True, nullable=False)
-    total_violations = db.Column(db.Integer, nullable=False)
+    total_violations = db.Column(db.Integer, nullable=False, index=True)
     total_fines = db.Column(db.Integer, nullable=False)
     last_violation_date = db.Column(db.DateTime, nullable=True)
     risk_level = db.Column(db.String(20), nullable=False)
     weighted_risk_score = db.Column(db.Float, nullable=False)
-    advanced_risk_score = db.Column(db.Float, nullable=False)
+    advanced_risk_score = db.Column(db.Float, nullable=False, index=True)
     industry_risk_factor = db.Column(db.String(20), nullable=False)
     violation_frequency_score = db.Column(db.Float, nullable=False)
     inspection_history = db.Column(db.String(200), nullable=True)
     unpaid_fines = db.Column(db.Integer, nullable=False)
     average_fine = db.Column(db.Float, nullable=False)
     risk_model_details = db.Column(db.Text, nullable=True)
+    # Date the time-decayed advanced_risk_score was computed relative to
+    scored_as_of = db.Column(db.DateTime, nullable=True)
+    # column_store.business_digests() fingerprint of the violations scored
+    inputs_digest = db.Column(db.BigInteger, nullable=True)
 
     description = db.Column(db.Text, nullable=True)
     location = db.Column(db.String(100), nullable=True)
     business_type = db.Column(db.String(100), nullable=True)
+
+# Ordered indexes for ranked lookups: a top-K query walks one of these in
+# score order and stops after K rows
+db.Index("ix_risk_level_score", RiskClassification.risk_level, RiskClassification.advanced_risk_score.desc())
+db.Index("ix_risk_type_score", RiskClassification.business_type, RiskClassification.advanced_risk_score.desc())
+# /trends/business-risk windows on the last violation date
+db.Index("ix_risk_last_violation", RiskClassification.last_violation_date, RiskClassification.risk_level)
@@ -0,0 +1,306 @@
+##################################################################################
+# profiling.py
+#
+# On-demand profiling for routes and CLI jobs:
+#   - "cprofile" mode: deterministic cProfile, saved as a .pstats file
+#   - "sampling" mode: low-overhead stack sampler, saved as speedscope JSON
+#     (open at https://www.speedscope.app)
+#
+# Routes are profiled by arming the app for the next N matching requests:
+#   POST /debug/profile/arm      {"mode": "cprofile", "requests": 5, "route": "/risk"}
+#   GET  /debug/profile          -> armed state + captured files
+#   GET  /debug/profile/<name>   -> download one capture
+# All three require the X-Profiling-Token header to match PROFILING_TOKEN and
+# return 404 when no token is configured.
+#
+# Jobs (seed, rescore) are wrapped with profile_job(label, mode).
+##################################################################################
+
+import cProfile
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import g, jsonify, request, send_from_directory
+
+PROFILE_MODES = ("cprofile", "sampling")
+DEFAULT_SAMPLE_INTERVAL = 0.001   # seconds between stack samples
+MAX_ARMED_REQUESTS = 100
+
+_CAPTURE_NAME = re.compile(r"^[\w.-]+\.(pstats|speedscope\.json)$")
+
+# cProfile hooks the whole process on Python 3.12+ (sys.monitoring), so a
+# second enable() raises ValueError; only one cProfile session runs at a time
+_cprofile_lock = threading.Lock()
+
+def cprofile_active():
+    return _cprofile_lock.locked()
+
+###############################################################################
+# Sampling profiler (speedscope output)
+###############################################################################
+class SamplingProfiler:
+    """
+    Samples the stack of the thread that called start() from a background
+    thread every `interval` seconds. Only that thread is sampled, so other
+    requests served concurrently don't leak into the profile.
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._frames = {}      # (name, file, line) -> index
+        self._samples = []
+        self._weights = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._elapsed = time.perf_counter() - self._started
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            now = time.perf_counter()
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                index = self._frames.get(key)
+                if index is None:
+                    index = self._frames[key] = len(self._frames)
+                stack.append(index)
+                frame = frame.f_back
+            stack.reverse()   # speedscope wants root first
+            self._samples.append(stack)
+            self._weights.append(now - last)
+            last = now
+
+    def to_speedscope(self, name):
+        frames = [None] * len(self._frames)
+        for (func, filename, line), index in self._frames.items():
+            frames[index] = {"name": func, "file": filename, "line": line}
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "risk-dashboard profiling.py",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self._elapsed,
+                "samples": self._samples,
+                "weights": self._weights
+            }]
+        }
+
+###############################################################################
+# Capture sessions
+###############################################################################
+class ProfileSession:
+    """One cProfile or sampling capture, written to out_dir on stop()."""
+
+    def __init__(self, mode, label, out_dir):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.label = label
+        self.out_dir = out_dir
+        self._profiler = cProfile.Profile() if mode == "cprofile" else SamplingProfiler()
+
+    def start(self):
+        """Starts the capture; RuntimeError when another cProfile session is running."""
+        if self.mode == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                raise RuntimeError("Another cProfile session is already active")
+            try:
+                self._profiler.enable()
+            except BaseException:
+                _cprofile_lock.release()
+                raise
+        else:
+            self._profiler.start()
+        return self
+
+    def stop(self):
+        """Stops the capture and returns the path of the written file."""
+        if self.mode == "cprofile":
+            self._profiler.disable()
+            _cprofile_lock.release()
+        else:
+            self._profiler.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = f"{stamp}-{_safe_label(self.label)}"
+        if self.mode == "cprofile":
+            path = os.path.join(self.out_dir, base + ".pstats")
+            self._profiler.dump_stats(path)
+        else:
+            path = os.path.join(self.out_dir, base + ".speedscope.json")
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(self._profiler.to_speedscope(self.label), fh)
+        return path
+
+def _safe_label(label):
+    return re.sub(r"[^\w.-]+", "_", label).strip("_") or "profile"
+
+def default_profile_dir():
+    return os.environ.get(
+        "PROFILE_DIR",
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance", "profiles")
+    )
+
+@contextmanager
+def profile_job(label, mode="cprofile", out_dir=None):
+    """
+    Profiles the enclosed block when mode is set (None/"" is a no-op), e.g.
+
+        with profile_job("seed", mode="sampling"):
+            seed_db(...)
+
+    Worker processes started inside the block are not profiled; run
+    generators with workers=1 to see the scoring path.
+    """
+    if not mode:
+        yield None
+        return
+    session = ProfileSession(mode, label, out_dir or default_profile_dir()).start()
+    try:
+        yield session
+    finally:
+        path = session.stop()
+        print(f"Profile written to {path}", file=sys.stderr)
+
+###############################################################################
+# Flask wiring
+###############################################################################
+class ProfileArm:
+    """Thread-safe "profile the next N matching requests" state."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.mode = None
+        self.remaining = 0
+        self.route = None
+
+    def arm(self, mode, count, route=None):
+        with self._lock:
+            self.mode, self.remaining, self.route = mode, count, route
+
+    def claim(self, route, endpoint):
+        """
+        Returns the mode to profile this request with, or None. While a
+        cProfile capture is running, cprofile requests are not claimed (and
+        not counted), since only one can run at a time.
+        """
+        with self._lock:
+            if self.remaining <= 0:
+                return None
+            if self.route and self.route not in (route, endpoint):
+                return None
+            if self.mode == "cprofile" and cprofile_active():
+                return None
+            self.remaining -= 1
+            return self.mode
+
+    def state(self):
+        with self._lock:
+            return {"mode": self.mode, "remaining": self.remaining, "route": self.route}
+
+def init_profiling(app):
+    """
+    Registers the /debug/profile endpoints and per-request capture hooks.
+    Config: PROFILING_TOKEN (unset disables the endpoints), PROFILE_DIR.
+    """
+    armed = ProfileArm()
+    app.extensions["profile_arm"] = armed
+
+    def out_dir():
+        return app.config.get("PROFILE_DIR") or default_profile_dir()
+
+    def authorized():
+        token = app.config.get("PROFILING_TOKEN")
+        supplied = request.headers.get("X-Profiling-Token", "")
+        return bool(token) and hmac.compare_digest(token, supplied)
+
+    @app.before_request
+    def _maybe_start_profile():
+        if request.path.startswith("/debug/profile"):
+            return
+        route = request.url_rule.rule if request.url_rule else None
+        mode = armed.claim(route, request.endpoint)
+        if mode:
+            label = f"{request.method}-{route or request.path}"
+            # Profiling must never fail the request it profiles
+            try:
+                g._profile_session = ProfileSession(mode, label, out_dir()).start()
+            except (RuntimeError, ValueError) as e:
+                app.logger.warning("Profile of %s not started: %s", label, e)
+
+    @app.teardown_request
+    def _maybe_stop_profile(exc):
+        session = g.pop("_profile_session", None)
+        if session is not None:
+            path = session.stop()
+            app.logger.info("Profile written to %s", path)
+
+    @app.route("/debug/profile/arm", methods=["POST"])
+    def arm_profile():
+        if not authorized():
+            return jsonify({"error": "Not found"}), 404
+        data = request.get_json(silent=True) or {}
+        mode = data.get("mode", "cprofile")
+        if mode not in PROFILE_MODES:
+            return jsonify({"error": f"mode must be one of {list(PROFILE_MODES)}"}), 400
+        try:
+            count = int(data.get("requests", 1))
+        except (TypeError, ValueError):
+            return jsonify({"error": "requests must be an integer"}), 400
+        if not 0 <= count <= MAX_ARMED_REQUESTS:
+            return jsonify({"error": f"requests must be between 0 and {MAX_ARMED_REQUESTS}"}), 400
+        armed.arm(mode, count, data.get("route"))
+        return jsonify(armed.state()), 200
+
+    @app.route("/debug/profile", methods=["GET"])
+    def list_profiles():
+        if not authorized():
+            return jsonify({"error": "Not found"}), 404
+        directory = out_dir()
+        files = sorted(os.listdir(directory), reverse=True) if os.path.isdir(directory) else []
+        captures = [
+            {"name": name, "bytes": os.path.getsize(os.path.join(directory, name))}
+            for name in files if _CAPTURE_NAME.match(name)
+        ]
+        return jsonify({"armed": armed.state(), "captures": captures}), 200
+
+    @app.route("/debug/profile/<name>", methods=["GET"])
+    def download_profile(name):
+        if not authorized() or not _CAPTURE_NAME.match(name):
+            return jsonify({"error": "Not found"}), 404
+        return send_from_directory(out_dir(), name, as_attachment=True)
+
+    return armed
@@ -1,6 +1,13 @@
 import csv
 import os
 
+def normalize_violation_type(text):
+    """
+    Collapses runs of whitespace so CSV formatting drift (double spaces,
+    trailing newlines) doesn't break lookups keyed by violation type.
+    """
+    return " ".join(text.split())
+
 def load_regulatory_mapping(csv_path):
     """
     Loads a CSV file containing fine information for each violation type.
@@ -9,11 +16,13 @@ def load_regulatory_mapping(csv_path):
     Returns a dict keyed by Violation Type, for example:
       {
         "Failure to report contagious diseases among workers": {
+          "code": "1.1",
           "category": "Personal Hygiene & Health Violations",
           "offenses": ["500", "1000", "2000"],
           "additional_action": ""
         },
         "Selling or providing unfit or spoiled food": {
+          "code": "9.1",
           "category": "Unsafe Food Violations",
           "offenses": ["Confiscation", "Confiscation", "Confiscation"],
           "additional_action": ""
@@ -34,7 +43,8 @@ def load_regulatory_mapping(csv_path):
         for row in reader:
             # We assume these columns exist:
             #   "Category", "Violation Type", "First Offense", "Second Offense", "Third Offense", "Additional Action"
-            v_type = row["Violation Type"].strip()
+            v_type = normalize_violation_type(row["Violation Type"])
+            code = row["Code"].strip() if "Code" in row else ""
             category = row["Category"].strip()
             # Store each offense exactly as a string
             first_offense  = row["First Offense"].strip()
@@ -43,6 +53,7 @@ def load_regulatory_mapping(csv_path):
             additional_action = row["Additional Action"].strip() if "Additional Action" in row else ""
 
             mapping[v_type] = {
+                "code": code,
                 "category": category,
                 "offenses": [first_offense, second_offense, third_offense],
                 "additional_action": additional_action
@@ -50,8 +61,39 @@ def load_regulatory_mapping(csv_path):
 
     return mapping
 
+def load_regulatory_rows(csv_path):
+    """
+    Same CSV as load_regulatory_mapping(), but returns every row in file order,
+    including rows that share a violation type text with another Code:
+      [
+        {"code": "1.1", "category": "...", "violation_type": "...",
+         "offenses": ["500", "1000", "2000"], "additional_action": ""},
+        ...
+      ]
+    """
+    rows = []
+    if not os.path.exists(csv_path):
+        return rows
+
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            rows.append({
+                "code": row["Code"].strip(),
+                "category": row["Category"].strip(),
+                "violation_type": normalize_violation_type(row["Violation Type"]),
+                "offenses": [
+                    row["First Offense"].strip(),
+                    row["Second Offense"].strip(),
+                    row["Third Offense"].strip()
+                ],
+                "additional_action": row["Additional Action"].strip() if "Additional Action" in row else ""
+            })
+    return rows
+
 # Adjust the CSV path if needed
 csv_file_path = os.path.join(os.path.dirname(__file__), "Violations_Dataset.csv")
 
 # This global variable can be imported elsewhere:
 REGULATORY_MAPPING = load_regulatory_mapping(csv_file_path)
+REGULATORY_ROWS = load_regulatory_rows(csv_file_path)
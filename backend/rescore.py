@@ -0,0 +1,210 @@
+##################################################################################
+# rescore.py
+#
+# Nightly "advance the clock" rescoring. Time decay makes every enhanced
+# score drift as days pass, so the scores stored by seed.py are only valid
+# for RiskClassification.scored_as_of. This job:
+#
+#   1. refreshes the memory-mapped column store (column_store.py),
+#   2. fingerprints every business's violations; a digest that differs from
+#      RiskClassification.inputs_digest means the inputs changed,
+#   3. for unchanged businesses, bounds how far the score can have moved since
+#      scored_as_of (risk_calc.score_change_bounds) and keeps only those whose
+#      bounds reach another risk level,
+#   4. fully rescores the changed and possibly-crossing businesses and rewrites
+#      their row and extended report; every other row keeps its stored score
+#      and scored_as_of, so nightly work scales with churn, not fleet size.
+#
+# Rows seeded without a digest count as changed, so the first run after a
+# seed rescores everything once. Businesses with no violations are not in the
+# column store; a zero score does not decay, so their rows only change when
+# their last violations were removed, and then they are reset to the seed's
+# no-violation values.
+#
+#   flask --app app rescore [--as-of YYYY-MM-DD] [--store DIR] [--no-refresh]
+##################################################################################
+
+import numpy as np
+
+from models import db, RiskClassification
+from column_store import (
+    DEFAULT_STORE_DIR, SCORE_CHUNK_ROWS, business_chunks,
+    business_digests, open_column_store, refresh_column_store, score_column_store
+)
+from risk_calc import (
+    OPEN_OVERDUE_DAYS,
+    RISK_LEVELS,
+    classify_risk_levels,
+    score_change_bounds,
+    fetch_global_stats,
+    generate_extended_report
+)
+from seed import NO_VIOLATION_SCORES, determine_industry_label, executemany
+
+def _sql_datetime(value):
+    # Same text format SQLAlchemy's SQLite DateTime writes
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+def _newly_overdue(store, since, as_of, chunk_rows=SCORE_CHUNK_ROWS):
+    """
+    Per business, open violations that were not yet overdue at `since` (one
+    datetime64 per business) but are at `as_of`.
+    """
+    offsets = store.offsets
+    counts = np.zeros(offsets.size - 1, dtype=np.int64)
+    open_ids = np.array(store.status_ids("Open"), dtype=np.int8)
+    ts_col, status_col = store.column("timestamp"), store.column("status")
+    as_of = np.datetime64(as_of, "us")
+    day = np.timedelta64(1, "D")
+
+    for start, stop in business_chunks(offsets, chunk_rows):
+        lo, hi = offsets[start], offsets[stop]
+        sizes = np.diff(offsets[start:stop + 1])
+        ts = ts_col[lo:hi]
+        before = (np.repeat(since[start:stop], sizes) - ts) // day
+        after = (as_of - ts) // day
+        hit = np.isin(status_col[lo:hi], open_ids) & (before <= OPEN_OVERDUE_DAYS) & (after > OPEN_OVERDUE_DAYS)
+        seg = np.repeat(np.arange(stop - start), sizes)
+        counts[start:stop] = np.bincount(seg[hit], minlength=stop - start)
+    return counts
+
+def _report_inputs(store, b, open_ids):
+    """The per-business aggregates generate_extended_report() needs, from the store."""
+    lo, hi = store.offsets[b], store.offsets[b + 1]
+    cat_names = store.meta["categories"]
+    cats = store.column("category")[lo:hi].astype(np.int64)
+    codes, counts = np.unique(cats, return_counts=True)
+    top = np.argsort(-counts, kind="stable")[:3]
+    n_open = int(np.isin(store.column("status")[lo:hi], open_ids).sum())
+    return {
+        "top_categories": [(cat_names[str(codes[i])], int(counts[i])) for i in top],
+        "repeated_offenders": [cat_names[str(c)] for c in codes[counts > 3]],
+        "total_violations": int(hi - lo),
+        "last_violation_date": store.column("timestamp")[lo:hi].max().item(),
+        "open_count": n_open,
+        "closed_count": int(hi - lo) - n_open
+    }
+
+def select_candidates(store, as_of, stored_rows):
+    """
+    Store indices of the businesses that need a full rescore: inputs changed
+    (or were never fingerprinted), clock moved backwards, or the score bounds
+    reach a different risk level. `stored_rows` is aligned with
+    store.business_names; None marks a business without a risk row.
+    Returns (candidate indices, digests).
+    """
+    digests = business_digests(store)
+    as_of_us = np.datetime64(as_of, "us")
+
+    has_row = np.array([r is not None for r in stored_rows], dtype=bool)
+    old_scores = np.array([r.advanced_risk_score if r else 0.0 for r in stored_rows], dtype=np.float64)
+    old_levels = np.array([RISK_LEVELS.index(r.risk_level) if r and r.risk_level in RISK_LEVELS else -1
+                           for r in stored_rows], dtype=np.int64)
+    since = np.array([r.scored_as_of if r and r.scored_as_of else as_of for r in stored_rows],
+                     dtype="datetime64[us]")
+    stored_digests = np.array([r.inputs_digest if r and r.inputs_digest is not None else 0
+                               for r in stored_rows], dtype=np.int64)
+    unknown = np.array([not r or r.scored_as_of is None or r.inputs_digest is None
+                        for r in stored_rows], dtype=bool)
+
+    changed = unknown | (stored_digests != digests) | (since > as_of_us)
+    elapsed_days = (as_of_us - since) / np.timedelta64(1, "D")
+    lower, upper = score_change_bounds(
+        old_scores, elapsed_days, store.business_types, _newly_overdue(store, since, as_of)
+    )
+    may_cross = (classify_risk_levels(lower) != old_levels) | (classify_risk_levels(upper) != old_levels)
+    return np.flatnonzero(has_row & (changed | may_cross)), digests
+
+def reset_emptied(by_name, store, as_of):
+    """
+    Resets the rows of businesses that still count violations but have none
+    in the store to NO_VIOLATION_SCORES. Returns the reset row ids.
+    """
+    in_store = set(store.business_names)
+    ids = [r.id for name, r in by_name.items() if name not in in_store and r.total_violations]
+    executemany(
+        "UPDATE risk_classification SET "
+        + ", ".join(f"{c} = ?" for c in NO_VIOLATION_SCORES)
+        + ", inspection_history = ?, risk_model_details = ?, scored_as_of = ?, inputs_digest = NULL"
+        + " WHERE id = ?",
+        [(*NO_VIOLATION_SCORES.values(), "No violations recorded.",
+          "No violations, automatically Low risk.", _sql_datetime(as_of), i) for i in ids]
+    )
+    return ids
+
+def rescore(as_of, store_dir=DEFAULT_STORE_DIR, refresh=True):
+    """
+    Rescores the businesses whose risk level may have changed by `as_of` and
+    rewrites their rows and reports. Must run inside an app context. Returns
+    a summary dict.
+    """
+    if refresh:
+        refresh_column_store(store_dir)
+    store = open_column_store(store_dir)
+
+    by_name = {r.business_name: r for r in db.session.query(
+        RiskClassification.id, RiskClassification.business_name, RiskClassification.risk_level,
+        RiskClassification.business_type, RiskClassification.advanced_risk_score,
+        RiskClassification.scored_as_of, RiskClassification.inputs_digest,
+        RiskClassification.total_violations
+    )}
+    stored_rows = [by_name.get(name) for name in store.business_names]
+    candidates, digests = select_candidates(store, as_of, stored_rows)
+
+    scores = score_column_store(store, as_of, businesses=candidates)
+    levels = classify_risk_levels(scores)
+    open_ids = np.array(store.status_ids("Open"), dtype=np.int8)
+    fines = store.column("fine")
+    inputs = [_report_inputs(store, b, open_ids) for b in candidates]
+
+    score_rows = []
+    for i, b in enumerate(candidates):
+        lo, hi = store.offsets[b], store.offsets[b + 1]
+        total_fines = int(fines[lo:hi].sum())
+        score_rows.append((
+            float(scores[i]),
+            RISK_LEVELS[levels[i]],
+            determine_industry_label(scores[i]),
+            inputs[i]["total_violations"],
+            total_fines,
+            total_fines / inputs[i]["total_violations"],
+            _sql_datetime(inputs[i]["last_violation_date"]),
+            _sql_datetime(as_of),
+            int(digests[b]),
+            stored_rows[b].id
+        ))
+    executemany(
+        "UPDATE risk_classification SET advanced_risk_score = ?, risk_level = ?, "
+        "industry_risk_factor = ?, total_violations = ?, total_fines = ?, average_fine = ?, "
+        "last_violation_date = ?, scored_as_of = ?, inputs_digest = ? WHERE id = ?",
+        score_rows
+    )
+
+    # Reports are benchmarked against the updated scores, as in seed.py
+    global_stats_by_type = {}
+    report_rows = []
+    crossed = 0
+    for i, b in enumerate(candidates):
+        row = stored_rows[b]
+        crossed += RISK_LEVELS[levels[i]] != row.risk_level
+        if row.business_type not in global_stats_by_type:
+            global_stats_by_type[row.business_type] = fetch_global_stats(row.business_type)
+        report_rows.append((generate_extended_report(
+            business_name=store.business_names[b],
+            final_score=float(scores[i]),
+            risk_level=RISK_LEVELS[levels[i]],
+            business_type=row.business_type,
+            global_stats=global_stats_by_type[row.business_type],
+            **inputs[i]
+        ), row.id))
+    executemany("UPDATE risk_classification SET risk_model_details = ? WHERE id = ?", report_rows)
+    emptied = reset_emptied(by_name, store, as_of)
+    db.session.commit()
+
+    return {
+        "as_of": as_of.isoformat(),
+        "businesses": len(store.business_names),
+        "rescored": len(candidates),
+        "emptied": len(emptied),
+        "level_changes": int(crossed)
+    }
@@ -2,8 +2,12 @@
 # risk_calc.py
 #
 # Includes:
+#   - Code-keyed severity map compiled into dense NumPy lookup tables
+#   - Shared NumPy monthly trend slope kernel (single + batched)
 #   - Legacy aggregator logic
+#   - Slotted ViolationRecord / columnar ViolationBatch scoring inputs
 #   - Advanced aggregator (time-decayed, repeated severity, etc.)
+#   - Batch scorer over columns (Parquet snapshot read path)
 #   - fetch_global_stats(): queries average scores and violation trends
 #   - generate_extended_report(): multi-paragraph with bullet points, category analysis,
 #       next steps, and benchmark comparisons.
@@ -11,195 +15,283 @@
 
 import random
 import numpy as np
-from collections import defaultdict
 from models import db, RiskClassification, Violation
 
 try:
-    from regulatory_mapping import REGULATORY_MAPPING
+    from regulatory_mapping import REGULATORY_MAPPING, REGULATORY_ROWS, normalize_violation_type
 except ImportError:
     REGULATORY_MAPPING = {}
+    REGULATORY_ROWS = []
+
+    def normalize_violation_type(text):
+        return " ".join(text.split())
 
 ###############################################################################
 # CSV-based compute_fine
 ###############################################################################
 def compute_fine(category, violation_type):
-    if not REGULATORY_MAPPING or violation_type not in REGULATORY_MAPPING:
+    idx = code_index_for_type(violation_type)
+    if idx < 0:
         return 0
-    row = REGULATORY_MAPPING[violation_type]
-    numeric_fines = []
-    for off_str in row["offenses"]:
-        try:
-            val = int(off_str)
-            numeric_fines.append(val)
-        except ValueError:
-            pass
+    # Offense tiers were parsed once into FINE_TIERS; 0 marks non-numeric ones
+    numeric_fines = [int(f) for f in FINE_TIERS[idx] if f > 0]
     if not numeric_fines:
         return 0
     return random.choice(numeric_fines)
 
 ###############################################################################
-# Full line-by-line violation_type_severity_map from your CSV (NO lines omitted)
+# Full line-by-line severity map from your CSV (NO lines omitted), keyed by the
+# regulatory Code column so lookups never depend on the exact sentence text
 ###############################################################################
-violation_type_severity_map = {
+violation_code_severity_map = {
     # 1) Personal Hygiene & Health Violations
-    "Failure to report contagious diseases among workers": 4,
-    "Workers with open wounds not properly covered": 3,
-    "Failure to properly wash hands, especially after different uses": 4,
-    "Poor personal hygiene practices while working": 3,
-    "Failure to maintain personal cleanliness (hair, nails, etc.)": 3,
-    "Failure to wear clean work attire, gloves, or head coverings": 3,
-    "Failure to provide valid health cards for workers": 3,
+    "1.1": 4,  # Failure to report contagious diseases among workers
+    "1.2": 3,  # Workers with open wounds not properly covered
+    "1.3": 4,  # Failure to properly wash hands, especially after different uses
+    "1.4": 3,  # Poor personal hygiene practices while working
+    "1.5": 3,  # Failure to maintain personal cleanliness (hair, nails, etc.)
+    "1.6": 3,  # Failure to wear clean work attire, gloves, or head coverings
+    "1.7": 3,  # Failure to provide valid health cards for workers
 
     # 2) Food Source & Quality Violations
-    "Receiving, using, displaying, or selling food from unapproved sources or produced in unauthorized manners": 4,
-    "Using prohibited or non-compliant materials in food production, or exceeding permissible limits for flavors, colors, or preservatives": 5,
-    "Failure to verify food safety before delivery or receipt (due to contamination, spoilage, pests, expired shelf life, or incorrect storage temperature)": 4,
-    "Failure to transfer food to the designated storage area immediately after receipt": 3,
-    "Lack of a back door for food receipt and unloading (unsuitable receiving area)": 2,
+    "2.1": 4,  # Receiving, using, displaying, or selling food from unapproved sources or produced in unauthorized manners
+    "2.2": 5,  # Using prohibited or non-compliant materials in food production, or exceeding permissible limits for flavors, colors, or preservatives
+    "2.3": 4,  # Failure to verify food safety before delivery or receipt (due to contamination, spoilage, pests, expired shelf life, or incorrect storage temperature)
+    "2.4": 3,  # Failure to transfer food to the designated storage area immediately after receipt
+    "2.5": 2,  # Lack of a back door for food receipt and unloading (unsuitable receiving area)
 
     # 3) Food Preparation & Handling Violations
-    "Incorrect thawing of food and refreezing meals multiple times": 5,
-    "Failure to cook food at appropriate temperatures": 5,
-    "Inadequate reheating and improper cooling of food": 5,
-    "Improper handling and presentation of food, equipment, or utensils": 4,
-    "Food preparation outside the designated premises or during maintenance": 4,
-    "Processing or manufacturing pork and its derivatives inside the establishment, or failing to separate pork and its equipment from other products (for authorized establishments only)": 5,
-    "Unauthorized personnel in kitchen or food preparation areas": 3,
-    "Use of unwashed vegetables": 3,
+    "3.1": 5,  # Incorrect thawing of food and refreezing meals multiple times
+    "3.2": 5,  # Failure to cook food at appropriate temperatures
+    "3.3": 5,  # Inadequate reheating and improper cooling of food
+    "3.4": 4,  # Improper handling and presentation of food, equipment, or utensils
+    "3.5": 4,  # Food preparation outside the designated premises or during maintenance
+    "3.6": 5,  # Processing or manufacturing pork and its derivatives inside the establishment, or failing to separate pork and its equipment from other products (for authorized establishments only)
+    "3.7": 3,  # Unauthorized personnel in kitchen or food preparation areas
+    "3.8": 3,  # Use of unwashed vegetables
 
     # 4) Cross-Contamination Violations
-    "Using utensils, equipment, or surfaces for vegetables and ready-to-eat food after handling raw meat without proper cleaning": 5,
-    "Using unclean utensils, equipment, towels, or surfaces": 4,
-    "Storing raw food with ready-to-eat food": 5,
-    "Handling ready-to-eat food with bare hands": 5,
-    "Draining wastewater into food preparation sinks": 4,
-    "Placing food under leaking pipes or sinks": 4,
-    "Washing hands or equipment in food washing sinks": 3,
-    "Lack of barriers at sinks to separate food washing from hand washing": 3,
-    "Condensed water dripping onto food": 3,
+    "4.1": 5,  # Using utensils, equipment, or surfaces for vegetables and ready-to-eat food after handling raw meat without proper cleaning
+    "4.2": 4,  # Using unclean utensils, equipment, towels, or surfaces
+    "4.3": 5,  # Storing raw food with ready-to-eat food
+    "4.4": 5,  # Handling ready-to-eat food with bare hands
+    "4.5": 4,  # Draining wastewater into food preparation sinks
+    "4.6": 4,  # Placing food under leaking pipes or sinks
+    "4.7": 3,  # Washing hands or equipment in food washing sinks
+    "4.8": 3,  # Lack of barriers at sinks to separate food washing from hand washing
+    "4.9": 3,  # Condensed water dripping onto food
 
     # 5) Temperature & Time Control Violations
-    "Improper storage temperature for hot and cold food": 5,
-    "Failure to store dry, refrigerated, and frozen food at the correct temperature": 5,
-    "Lack of temperature measuring devices and temperature recording logs": 4,
-    "Inefficient temperature control in the establishment, kitchen, or storage areas, and failure to operate air conditioning": 4,
-    "Leaving perishable food at unsafe temperatures for more than 4 hours or storing cooked food for more than 48 hours": 5,
+    "5.1": 5,  # Improper storage temperature for hot and cold food
+    "5.2": 5,  # Failure to store dry, refrigerated, and frozen food at the correct temperature
+    "5.3": 4,  # Lack of temperature measuring devices and temperature recording logs
+    "5.4": 4,  # Inefficient temperature control in the establishment, kitchen, or storage areas, and failure to operate air conditioning
+    "5.5": 5,  # Leaving perishable food at unsafe temperatures for more than 4 hours or storing cooked food for more than 48 hours
 
     # 6) Food Storage & Display Violations
-    "Storing food in containers previously used for hazardous or toxic substances": 5,
-    "Placing food in uncovered containers exposed to contamination": 4,
-    "Storing food directly on the floor without shelves or platforms": 3,
-    "Failure to maintain cleanliness of food items on shelves and improper cleaning of storage shelves": 3,
-    "Failure to remove or withdraw unfit food products": 5,
+    "6.1": 5,  # Storing food in containers previously used for hazardous or toxic substances
+    "6.6": 5,  # Storing food in containers previously used for hazardous or toxic substances
+    "6.2": 4,  # Placing food in uncovered containers exposed to contamination
+    "6.3": 3,  # Storing food directly on the floor without shelves or platforms
+    "6.4": 3,  # Failure to maintain cleanliness of food items on shelves and improper cleaning of storage shelves
+    "6.5": 5,  # Failure to remove or withdraw unfit food products
 
     # 7) Equipment & Utensil Violations
-    "Failure to provide equipment and tools that meet specifications and activity requirements": 3,
-    "Equipment and tools are made of unsuitable materials, improperly installed, or difficult to maintain": 4,
-    "Using unclean, broken, or improperly stored utensils and equipment that are not suitable for the activity": 4,
-    "Using unclean or improperly stored towels and disposable containers": 3,
-    "Water tanks, plumbing, and filters are unsuitable or do not meet specifications": 4,
-    "Placing newspapers or cardboard on shelves or inside refrigerators": 2,
-    "Improper installation or placement of gas cylinders": 2,
+    "7.1": 3,  # Failure to provide equipment and tools that meet specifications and activity requirements
+    "7.2": 4,  # Equipment and tools are made of unsuitable materials, improperly installed, or difficult to maintain
+    "7.3": 4,  # Using unclean, broken, or improperly stored utensils and equipment that are not suitable for the activity
+    "7.4": 3,  # Using unclean or improperly stored towels and disposable containers
+    "7.5": 4,  # Water tanks, plumbing, and filters are unsuitable or do not meet specifications
+    "7.6": 2,  # Placing newspapers or cardboard on shelves or inside refrigerators
+    "7.7": 2,  # Improper installation or placement of gas cylinders
 
     # 8) Food Storage Facility Violations
-    "Storage area is unclean, damp, disorganized, too small, or lacks platforms and shelves": 3,
-    "Storing food with non-food items that negatively affect it, such as detergents and pesticides": 4,
-    "Failure to properly isolate expired or unfit food within the establishment": 4,
-    "Storing different types of food together improperly": 4,
-    "Storing or keeping fruits and vegetables in unsuitable crates": 3,
+    "8.1": 3,  # Storage area is unclean, damp, disorganized, too small, or lacks platforms and shelves
+    "8.2": 4,  # Storing food with non-food items that negatively affect it, such as detergents and pesticides
+    "8.3": 4,  # Failure to properly isolate expired or unfit food within the establishment
+    "8.4": 4,  # Storing different types of food together improperly
+    "8.5": 3,  # Storing or keeping fruits and vegetables in unsuitable crates
 
     # 9) Unsafe Food Violations
-    "Selling or providing unfit or spoiled food": 5,
-    "Selling or displaying expired food": 5,
-    "Selling or serving food contaminated with insects, solid residues, or chemicals": 5,
-    "Selling or displaying adulterated food": 5,
-    "Providing food that resulted in food poisoning": 5,
-    "Selling or using bulging canned food, or food showing leakage or rust": 4,
-    "Selling or distributing food found to contain contaminants through laboratory testing": 5,
-    "Reusing leftover food": 4,
+    "9.1": 5,  # Selling or providing unfit or spoiled food
+    "9.2": 5,  # Selling or displaying expired food
+    "9.3": 5,  # Selling or serving food contaminated with insects, solid residues, or chemicals
+    "9.4": 5,  # Selling or displaying adulterated food
+    "9.5": 5,  # Providing food that resulted in food poisoning
+    "9.6": 4,  # Selling or using bulging canned food, or food showing leakage or rust
+    "9.7": 5,  # Selling or distributing food found to contain contaminants through laboratory testing
+    "9.8": 4,  # Reusing leftover food
 
     # 10) Pest Control Violations
-    "Presence of insects, rodents, or their waste in the establishment": 4,
-    "Failure to install protective mesh on doors and windows or presence of openings around doors, windows, air conditioners, or water pipes": 3,
-    "Failure to provide insect and rodent traps or improper maintenance of these devices": 3,
-    "Failure to obtain or renew a certified pest control contract": 3,
-    "Failure to provide a pesticide storage area or not meeting the required specifications": 4,
-    "Unlicensed pest control companies or employing unqualified workers for pesticide application": 5,
-    "Failure to use protective equipment when handling pesticides": 3,
-    "Food contamination due to pesticide spraying": 5,
-    "Selling, displaying, or using expired, unregistered, or banned pesticides": 5,
-    "Unlicensed pest control companies conducting business": 5,
-    "Failure to provide pesticide-related documents, safety data sheets, or ministry approval certificates": 3,
+    "10.1": 4,  # Presence of insects, rodents, or their waste in the establishment
+    "10.2": 3,  # Failure to install protective mesh on doors and windows or presence of openings around doors, windows, air conditioners, or water pipes
+    "10.3": 3,  # Failure to provide insect and rodent traps or improper maintenance of these devices
+    "10.4": 3,  # Failure to obtain or renew a certified pest control contract
+    "10.5": 4,  # Failure to provide a pesticide storage area or not meeting the required specifications
+    "10.6": 5,  # Unlicensed pest control companies or employing unqualified workers for pesticide application
+    "10.7": 3,  # Failure to use protective equipment when handling pesticides
+    "10.8": 5,  # Food contamination due to pesticide spraying
+    "10.9": 5,  # Selling, displaying, or using expired, unregistered, or banned pesticides
+    "10.10": 5,  # Unlicensed pest control companies conducting business
+    "10.11": 3,  # Failure to provide pesticide-related documents, safety data sheets, or ministry approval certificates
 
     # 11) Sanitation & Cleaning Violations
-    "Failure to regularly clean floors, walls, and ceilings, and properly sanitize surfaces, equipment, utensils, and towels": 3,
-    "Failure to clean floors, walls, and ceilings": 2,
-    "Failure to maintain cleanliness in restrooms or waste collection areas": 3,
-    "Failure to provide adequate cleaning agents, disinfectants, and cleaning tools or improper storage of these materials": 3,
-    "Incorrect use of cleaning agents, disinfectants, or sanitizers": 2,
-    "Absence of sanitizing solution in dishwashing machines or inadequate water temperature": 4,
-    "Failure to provide temperature monitoring screens or sanitizer concentration test strips": 3,
-    "Failure to clean water tanks or replace filters regularly": 3,
-    "Use of unsuitable or uncovered trash bins": 2,
-    "Failure to provide dedicated sinks for washing hands, utensils, vegetables, or meat": 3,
+    "11.1": 3,  # Failure to regularly clean floors, walls, and ceilings, and properly sanitize surfaces, equipment, utensils, and towels
+    "11.2": 2,  # Failure to clean floors, walls, and ceilings
+    "11.3": 3,  # Failure to maintain cleanliness in restrooms or waste collection areas
+    "11.4": 3,  # Failure to provide adequate cleaning agents, disinfectants, and cleaning tools or improper storage of these materials
+    "11.5": 2,  # Incorrect use of cleaning agents, disinfectants, or sanitizers
+    "11.6": 4,  # Absence of sanitizing solution in dishwashing machines or inadequate water temperature
+    "11.7": 3,  # Failure to provide temperature monitoring screens or sanitizer concentration test strips
+    "11.8": 3,  # Failure to clean water tanks or replace filters regularly
+    "11.9": 2,  # Use of unsuitable or uncovered trash bins
+    "11.10": 3,  # Failure to provide dedicated sinks for washing hands, utensils, vegetables, or meat
 
     # 12) Waste Disposal Violations
-    "Failure to provide adequate space for waste collection": 3,
-    "Improper disposal of liquid and solid waste": 3,
-    "Sewage leakage from designated drainage areas": 4,
-    "Blocked drainage pipe causing wastewater backup due to lack of maintenance": 3,
-    "Failure to provide or maintain grease traps": 3,
-    "Accumulation of waste, unused equipment, or overgrown vegetation inside or outside the establishment": 2,
-    "Improper floor slope preventing efficient drainage": 2,
-    "Dumping waste in public or unauthorized areas": 3,
-    "Dumping or abandoning construction materials and debris in unauthorized locations": 4,
+    "12.1": 3,  # Failure to provide adequate space for waste collection
+    "12.2": 3,  # Improper disposal of liquid and solid waste
+    "12.3": 4,  # Sewage leakage from designated drainage areas
+    "12.4": 3,  # Blocked drainage pipe causing wastewater backup due to lack of maintenance
+    "12.5": 3,  # Failure to provide or maintain grease traps
+    "12.6": 2,  # Accumulation of waste, unused equipment, or overgrown vegetation inside or outside the establishment
+    "12.7": 2,  # Improper floor slope preventing efficient drainage
+    "12.8": 3,  # Dumping waste in public or unauthorized areas
+    "12.9": 4,  # Dumping or abandoning construction materials and debris in unauthorized locations
 
     # 13) Food Transport Violations
-    "Operating a food distribution vehicle without a license": 3,
-    "Food transport vehicle is unclean, unsuitable, or does not meet specifications": 3,
-    "Failure to maintain cleanliness and safety of plastic crates used for dairy, bread, and juices": 3,
-    "Transporting food together with non-food items such as detergents or chemicals, or failing to separate returned/expired items": 4,
-    "Failure to maintain appropriate temperature for food transport, lack of a thermometer, or use of a defective thermometer": 4,
-    "Failure to submit required food samples to the laboratory": 3,
+    "13.1": 3,  # Operating a food distribution vehicle without a license
+    "13.2": 3,  # Food transport vehicle is unclean, unsuitable, or does not meet specifications
+    "13.3": 3,  # Failure to maintain cleanliness and safety of plastic crates used for dairy, bread, and juices
+    "13.4": 4,  # Transporting food together with non-food items such as detergents or chemicals, or failing to separate returned/expired items
+    "13.5": 4,  # Failure to maintain appropriate temperature for food transport, lack of a thermometer, or use of a defective thermometer
+    "13.6": 3,  # Failure to submit required food samples to the laboratory
 
     # 14) Establishment Structural Violations
-    "Insufficient space in the kitchen, lack of storage rooms or changing areas": 2,
-    "Failure to maintain the establishment or non-compliance of decor with health regulations": 3,
-    "Conducting maintenance or modifications without approval from the relevant authorities": 3,
-    "Using the premises as a residence or having sleeping areas not separated from food preparation areas": 4,
-    "Doors are not properly sealed or securely installed": 2,
-    "Leaving front or back doors open, auto-closing doors not functioning, or absence of air curtains": 2,
-    "Inadequate lighting and ventilation or unprotected light fixtures": 2,
-    "Failure to provide grease traps or appropriate exhaust systems": 3,
-    "Lack of clean and suitable hot or cold water supply for operations or ice from unapproved sources": 3,
-    "Failure to provide adequate sanitary facilities": 2,
-    "Failure to provide a designated sink for washing hands, food, or utensils": 3,
-    "Keeping animals inside food establishments": 4,
+    "14.1": 2,  # Insufficient space in the kitchen, lack of storage rooms or changing areas
+    "14.2": 3,  # Failure to maintain the establishment or non-compliance of decor with health regulations
+    "14.3": 3,  # Conducting maintenance or modifications without approval from the relevant authorities
+    "14.4": 4,  # Using the premises as a residence or having sleeping areas not separated from food preparation areas
+    "14.5": 2,  # Doors are not properly sealed or securely installed
+    "14.6": 2,  # Leaving front or back doors open, auto-closing doors not functioning, or absence of air curtains
+    "14.7": 2,  # Inadequate lighting and ventilation or unprotected light fixtures
+    "14.8": 3,  # Failure to provide grease traps or appropriate exhaust systems
+    "14.9": 3,  # Lack of clean and suitable hot or cold water supply for operations or ice from unapproved sources
+    "14.10": 2,  # Failure to provide adequate sanitary facilities
+    "14.11": 3,  # Failure to provide a designated sink for washing hands, food, or utensils
+    "14.12": 4,  # Keeping animals inside food establishments
 
     # 15) Food Packaging & Labeling Violations
-    "Incomplete food label, incorrect production/expiration dates, or missing health instructions": 3,
-    "Packing, distributing, or selling food in unauthorized or non-compliant containers": 3,
-    "Removing, altering, or replacing production and expiration date labels": 4,
-    "Repackaging food without authorization and without proper food labeling": 3,
-    "Using newspapers or printed materials for food storage or wrapping": 2,
-    "Packing and distributing drinking water in containers belonging to other companies": 3,
-    "Failure to include expiration date or food label on stored or displayed food": 2,
+    "15.1": 3,  # Incomplete food label, incorrect production/expiration dates, or missing health instructions
+    "15.2": 3,  # Packing, distributing, or selling food in unauthorized or non-compliant containers
+    "15.3": 4,  # Removing, altering, or replacing production and expiration date labels
+    "15.4": 3,  # Repackaging food without authorization and without proper food labeling
+    "15.5": 2,  # Using newspapers or printed materials for food storage or wrapping
+    "15.6": 3,  # Packing and distributing drinking water in containers belonging to other companies
+    "15.7": 2,  # Failure to include expiration date or food label on stored or displayed food
 
     # 16) General Regulatory Violations
-    "Failure to obtain or renew required training certificates for responsible personnel or workers": 2,
-    "Failure to provide required documents (business license, health cards, inspection records, training certificates, etc.)": 2,
-    "Failure to display 'No Smoking' signs": 2,
-    "Smoking inside the establishment": 3,
-    "Failure to cooperate with or show respect to the inspecting officer": 4,
-    "Food products under special promotions must have a minimum shelf life of one month": 3,
-    "Displaying or selling goods on sidewalks or outside designated areas": 2,
-    "Using non-compliant or defective weighing scales": 2,
-    "Failure to cover transport vehicles carrying goods": 2,
-    "Collecting scrap, waste, or boxes without a permit (subject to confiscation)": 2,
-    "Selling banned or non-compliant non-food products": 3,
-    "Selling hazardous toys, fireworks, or prohibited products": 4
+    "16.1": 2,  # Failure to obtain or renew required training certificates for responsible personnel or workers
+    "16.2": 2,  # Failure to provide required documents (business license, health cards, inspection records, training certificates, etc.)
+    "16.3": 2,  # Failure to display 'No Smoking' signs
+    "16.4": 3,  # Smoking inside the establishment
+    "16.5": 4,  # Failure to cooperate with or show respect to the inspecting officer
+    "16.6": 3,  # Food products under special promotions must have a minimum shelf life of one month
+    "16.7": 2,  # Displaying or selling goods on sidewalks or outside designated areas
+    "16.8": 2,  # Using non-compliant or defective weighing scales
+    "16.9": 2,  # Failure to cover transport vehicles carrying goods
+    "16.10": 2,  # Collecting scrap, waste, or boxes without a permit (subject to confiscation)
+    "16.11": 3,  # Selling banned or non-compliant non-food products
+    "16.12": 4  # Selling hazardous toys, fireworks, or prohibited products
 }
 
+
+###############################################################################
+# Compiled regulatory tables (dense arrays indexed by code position)
+###############################################################################
+DEFAULT_SEVERITY = 3
+
+def compile_regulatory_tables(rows, code_severity_map, default_severity=DEFAULT_SEVERITY):
+    """
+    Compiles the CSV rows and the code-keyed severity map once at import time:
+      - codes:       Code strings in CSV order; position == code index
+      - code_index:  {"1.1": 0, "1.2": 1, ...}
+      - type_index:  {normalized violation type: code index}
+      - severity:    int8 array of severities by code index
+      - fine_tiers:  int32 array (n_codes, 3) of first/second/third offense
+                     fines; non-numeric offenses ("Confiscation") are 0
+    Codes without a severity, and severities without a CSV row, are reported
+    here instead of silently falling back to the default during scoring.
+    """
+    codes = [row["code"] for row in rows]
+    code_index = {code: i for i, code in enumerate(codes)}
+    type_index = {}
+    severity = np.full(len(codes), default_severity, dtype=np.int8)
+    fine_tiers = np.zeros((len(codes), 3), dtype=np.int32)
+
+    missing_severity = []
+    for i, row in enumerate(rows):
+        type_index.setdefault(row["violation_type"], i)
+        if row["code"] in code_severity_map:
+            severity[i] = code_severity_map[row["code"]]
+        else:
+            missing_severity.append(row["code"])
+        for tier, off_str in enumerate(row["offenses"][:3]):
+            try:
+                fine_tiers[i, tier] = int(off_str)
+            except ValueError:
+                pass
+
+    if rows:
+        unknown_codes = [code for code in code_severity_map if code not in code_index]
+        if missing_severity:
+            print(f"[WARNING] No severity for regulatory codes {missing_severity}; using {default_severity}")
+        if unknown_codes:
+            print(f"[WARNING] Severity map has codes missing from the CSV: {unknown_codes}")
+
+    return {
+        "codes": codes,
+        "code_index": code_index,
+        "type_index": type_index,
+        "severity": severity,
+        "fine_tiers": fine_tiers
+    }
+
+REGULATORY_TABLES = compile_regulatory_tables(REGULATORY_ROWS, violation_code_severity_map)
+CODE_INDEX = REGULATORY_TABLES["code_index"]
+SEVERITY_BY_CODE_INDEX = REGULATORY_TABLES["severity"]
+FINE_TIERS = REGULATORY_TABLES["fine_tiers"]
+
+# Backward-compatible view keyed by violation type text
+violation_type_severity_map = {
+    row["violation_type"]: int(SEVERITY_BY_CODE_INDEX[CODE_INDEX[row["code"]]])
+    for row in REGULATORY_ROWS
+}
+
+def code_index_for_type(violation_type):
+    """Code index for a violation type string, or -1 if it isn't in the CSV."""
+    return REGULATORY_TABLES["type_index"].get(normalize_violation_type(violation_type), -1)
+
+def code_for_type(violation_type):
+    idx = code_index_for_type(violation_type)
+    return REGULATORY_TABLES["codes"][idx] if idx >= 0 else None
+
+def severity_for_type(violation_type, default=DEFAULT_SEVERITY):
+    idx = code_index_for_type(violation_type)
+    return int(SEVERITY_BY_CODE_INDEX[idx]) if idx >= 0 else default
+
+def gather_severities(code_indices, default=DEFAULT_SEVERITY):
+    """
+    Vectorized severity lookup: one gather over an array of code indices.
+    Indices of -1 (unknown type) get the default severity.
+    """
+    idx = np.asarray(code_indices, dtype=np.intp)
+    out = np.full(idx.shape, default, dtype=np.int8)
+    known = idx >= 0
+    out[known] = SEVERITY_BY_CODE_INDEX[idx[known]]
+    return out
+
+# Optional per-profile key "repeat_window_days" overrides the 60-day
+# repeated-category window (see repeat_window_days()).
 industry_profiles = {
     "Healthcare": {"compliance_factor": 1.5, "impact_factor": 1.4},
     "Restaurant": {"compliance_factor": 1.4, "impact_factor": 1.3},
@@ -217,6 +309,77 @@ industry_profiles = {
     "General Business": {"compliance_factor": 1.0, "impact_factor": 1.0},
 }
 
+###############################################################################
+# Monthly trend slope kernel (shared by both aggregators)
+###############################################################################
+def month_ordinals(timestamps):
+    """
+    Calendar month ordinals (months since 1970-01) for a sequence of timestamps,
+    computed on datetime64 integers instead of formatting "%Y-%m" strings.
+    """
+    ts = np.asarray(timestamps, dtype="datetime64[us]")
+    return ts.astype("datetime64[M]").astype(np.int64)
+
+def _slope_from_sums(k, sum_y, sum_xy):
+    """
+    Closed-form least-squares slope for x = 0..k-1:
+      slope = (sum(x*y) - mean_x * sum(y)) / sum((x - mean_x)^2)
+    with mean_x = (k - 1) / 2 and sum((x - mean_x)^2) = k * (k^2 - 1) / 12.
+    Works on scalars or arrays; k < 2 gives 0.
+    """
+    k = np.asarray(k, dtype=np.float64)
+    denom = k * (k * k - 1.0) / 12.0
+    numer = np.asarray(sum_xy, dtype=np.float64) - (k - 1.0) / 2.0 * np.asarray(sum_y, dtype=np.float64)
+    safe = np.where(denom > 0, denom, 1.0)
+    return np.where(k >= 2, numer / safe, 0.0)
+
+def monthly_trend_slope(timestamps):
+    """
+    Slope of violations-per-month over the months that have at least one
+    violation, taken in calendar order (same buckets as the old strftime
+    version). Returns 0.0 with fewer than two distinct months. Also accepts a
+    ViolationBatch.
+    """
+    months = month_ordinals(_batch_timestamps(timestamps))
+    if months.size < 2:
+        return 0.0
+    counts = np.bincount(months - months.min())
+    counts = counts[counts > 0]
+    k = counts.size
+    if k < 2:
+        return 0.0
+    x = np.arange(k, dtype=np.float64)
+    return float(_slope_from_sums(k, counts.sum(), x @ counts))
+
+def batch_monthly_trend_slopes(timestamps, offsets):
+    """
+    Segmented monthly_trend_slope(): `timestamps` is one concatenated array for
+    many businesses and business i owns timestamps[offsets[i]:offsets[i + 1]].
+    Returns a float64 array of len(offsets) - 1 slopes.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_seg = offsets.size - 1
+    if n_seg <= 0:
+        return np.zeros(0, dtype=np.float64)
+    months = month_ordinals(timestamps)
+    if months.size == 0:
+        return np.zeros(n_seg, dtype=np.float64)
+
+    seg = np.repeat(np.arange(n_seg, dtype=np.int64), np.diff(offsets))
+    rel = months - months.min()
+    span = int(rel.max()) + 1
+
+    # One sorted pass gives (segment, month) buckets with months ascending per segment
+    keys, counts = np.unique(seg * span + rel, return_counts=True)
+    bucket_seg = keys // span
+    first_bucket = np.searchsorted(bucket_seg, np.arange(n_seg))
+    x = np.arange(keys.size) - first_bucket[bucket_seg]
+
+    k = np.bincount(bucket_seg, minlength=n_seg)
+    sum_y = np.bincount(bucket_seg, weights=counts, minlength=n_seg)
+    sum_xy = np.bincount(bucket_seg, weights=x * counts, minlength=n_seg)
+    return _slope_from_sums(k, sum_y, sum_xy)
+
 ###############################################################################
 # Legacy placeholders
 ###############################################################################
@@ -231,26 +394,8 @@ def compute_aggregated_risk(violation_frequency, average_fine, average_severity,
     norm_sev = average_severity / 5.0
     imp_risk = (norm_fine + norm_sev) * 5
 
-    if len(violation_timestamps) < 2:
-        trend_risk = 0.0
-    else:
-        month_counts = defaultdict(int)
-        for ts in violation_timestamps:
-            m = ts.strftime("%Y-%m")
-            month_counts[m] += 1
-        sorted_keys = sorted(month_counts.keys())
-        counts = [month_counts[k] for k in sorted_keys]
-        if len(counts) < 2:
-            trend_risk = 0.0
-        else:
-            x = list(range(len(counts)))
-            mean_x = sum(x) / len(x)
-            mean_y = sum(counts) / len(counts)
-            numerator = sum(x[i]*counts[i] for i in range(len(x))) - len(x)*mean_x*mean_y
-            denominator = sum((xx - mean_x)**2 for xx in x)
-            slope = numerator / denominator if denominator else 0
-            slope = max(slope, 0.0)
-            trend_risk = slope * 2
+    slope = max(monthly_trend_slope(violation_timestamps), 0.0)
+    trend_risk = slope * 2
 
     base_score = freq_risk * 0.4 + imp_risk * 0.4 + trend_risk * 0.2
     return base_score * risk_modifier, freq_risk, imp_risk, trend_risk
@@ -258,44 +403,337 @@ def compute_aggregated_risk(violation_frequency, average_fine, average_severity,
 ###############################################################################
 # Repeated category factor
 ###############################################################################
-def compute_repeated_category_factor(cat_timestamps, days_window=60):
+DEFAULT_REPEAT_WINDOW_DAYS = 60
+REPEAT_MIN_COUNT = 3        # a category "repeats" when seen more than twice in the window
+REPEAT_FACTOR_STEP = 0.05
+REPEAT_FACTOR_CAP = 0.3
+
+def repeat_window_days(business_type):
+    """Repeated-category window for an industry (profile key "repeat_window_days")."""
+    prof = industry_profiles.get(business_type, {})
+    return prof.get("repeat_window_days", DEFAULT_REPEAT_WINDOW_DAYS)
+
+def encode_categories(categories):
+    """Small integer codes for a sequence of category names (codes, names)."""
+    names, codes = np.unique(np.asarray(categories, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(np.int32), names
+
+def repeated_category_factor_arrays(cat_codes, timestamps, days_window=DEFAULT_REPEAT_WINDOW_DAYS):
+    """
+    Array form of compute_repeated_category_factor() for one business:
+    sort by time, searchsorted for the window cutoff, bincount the
+    category codes inside it.
+    """
+    ts = np.asarray(timestamps, dtype="datetime64[us]")
+    if ts.size == 0:
+        return 0.0
+    codes = np.asarray(cat_codes, dtype=np.int64)
+    order = np.argsort(ts, kind="stable")
+    ts_sorted = ts[order]
+    cutoff = ts_sorted[-1] - np.timedelta64(days_window, "D")
+    start = np.searchsorted(ts_sorted, cutoff, side="left")
+    counts = np.bincount(codes[order][start:])
+    repeated = np.count_nonzero(counts >= REPEAT_MIN_COUNT)
+    return min(REPEAT_FACTOR_STEP * repeated, REPEAT_FACTOR_CAP)
+
+def compute_repeated_category_factor(cat_timestamps, days_window=DEFAULT_REPEAT_WINDOW_DAYS):
+    """Legacy entry point taking a list of (category, timestamp) tuples or a ViolationBatch."""
+    if isinstance(cat_timestamps, ViolationBatch):
+        return repeated_category_factor_arrays(cat_timestamps.cat_codes, cat_timestamps.timestamps, days_window)
     if not cat_timestamps:
         return 0.0
-    latest_time = max(ts for _, ts in cat_timestamps)
-    cutoff = latest_time - np.timedelta64(days_window, 'D')
-    cat_counts = defaultdict(int)
-    for (cat, ctime) in cat_timestamps:
-        if ctime >= cutoff:
-            cat_counts[cat] += 1
-    repeated_factor = 0.0
-    for c, count in cat_counts.items():
-        if count > 2:
-            repeated_factor += 0.05
-    return min(repeated_factor, 0.3)
+    categories, timestamps = zip(*cat_timestamps)
+    codes, _ = encode_categories(categories)
+    return repeated_category_factor_arrays(codes, timestamps, days_window)
+
+def _third_occurrence_ages(cat_codes, timestamps, offsets):
+    """
+    For every (business, category) pair seen at least REPEAT_MIN_COUNT times,
+    the age (in microseconds before that business's latest violation) of its
+    REPEAT_MIN_COUNT-th most recent occurrence. The category counts as
+    repeated for any window of at least that age, so one pass over the
+    violations answers every window size.
+    Returns (segment index, age) arrays, one entry per qualifying pair.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_seg = offsets.size - 1
+    lengths = np.diff(offsets)
+    ts_us = np.asarray(timestamps, dtype="datetime64[us]").astype(np.int64)
+    codes = np.asarray(cat_codes, dtype=np.int64)
+    if ts_us.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    seg = np.repeat(np.arange(n_seg, dtype=np.int64), lengths)
+    nonempty = lengths > 0
+    latest = np.zeros(n_seg, dtype=np.int64)
+    latest[nonempty] = np.maximum.reduceat(ts_us, offsets[:-1][nonempty])
+    age = latest[seg] - ts_us
+
+    order = np.lexsort((age, codes, seg))
+    s_seg, s_code, s_age = seg[order], codes[order], age[order]
+    new_group = np.ones(s_seg.size, dtype=bool)
+    new_group[1:] = (s_seg[1:] != s_seg[:-1]) | (s_code[1:] != s_code[:-1])
+    group_start = np.flatnonzero(new_group)
+    rank = np.arange(s_seg.size) - group_start[np.cumsum(new_group) - 1]
+    hit = rank == REPEAT_MIN_COUNT - 1
+    return s_seg[hit], s_age[hit]
+
+def batch_repeated_category_factors(cat_codes, timestamps, offsets, days_window=DEFAULT_REPEAT_WINDOW_DAYS):
+    """
+    Repeated-category factor for every business in one call. Business i owns
+    rows offsets[i]:offsets[i + 1]. `days_window` may be a scalar or one
+    window per business (e.g. mapped from repeat_window_days(business_type)).
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_seg = offsets.size - 1
+    third_seg, third_age = _third_occurrence_ages(cat_codes, timestamps, offsets)
+    window_us = np.broadcast_to(
+        np.asarray(days_window, dtype=np.int64) * 86_400_000_000, (n_seg,)
+    )
+    inside = third_age <= window_us[third_seg]
+    repeated = np.bincount(third_seg, weights=inside, minlength=n_seg)
+    return np.minimum(REPEAT_FACTOR_STEP * repeated, REPEAT_FACTOR_CAP)
+
+def repeated_category_factor_curve(cat_codes, timestamps, offsets, windows_days):
+    """
+    Factor for every business under every candidate window, shape
+    (n_businesses, n_windows), for tuning per-industry windows. The
+    violation-level work happens once in _third_occurrence_ages(); each extra
+    window only adds one query point per business to a single merge sort.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_seg = offsets.size - 1
+    windows_us = np.asarray(windows_days, dtype=np.int64).ravel() * 86_400_000_000
+    n_win = windows_us.size
+    third_seg, third_age = _third_occurrence_ages(cat_codes, timestamps, offsets)
+
+    q_seg = np.repeat(np.arange(n_seg, dtype=np.int64), n_win)
+    q_age = np.tile(windows_us, n_seg)
+    all_seg = np.concatenate([third_seg, q_seg])
+    all_age = np.concatenate([third_age, q_age])
+    is_query = np.concatenate([np.zeros(third_seg.size, dtype=bool), np.ones(q_seg.size, dtype=bool)])
+
+    # Ties sort pairs before queries, matching the inclusive cutoff
+    order = np.lexsort((is_query, all_age, all_seg))
+    pairs_so_far = np.cumsum(~is_query[order])
+    pairs_before_seg = np.concatenate([[0], np.cumsum(np.bincount(third_seg, minlength=n_seg))[:-1]])
+
+    q_pos = np.flatnonzero(is_query[order])
+    q_idx = order[q_pos] - third_seg.size
+    repeated = np.empty(q_seg.size, dtype=np.int64)
+    repeated[q_idx] = pairs_so_far[q_pos] - pairs_before_seg[q_seg[q_idx]]
+    return np.minimum(REPEAT_FACTOR_STEP * repeated, REPEAT_FACTOR_CAP).reshape(n_seg, n_win)
+
+###############################################################################
+# Repeated severity (same violation type again within 30 days)
+###############################################################################
+REPEAT_SEVERITY_WINDOW_DAYS = 30
+
+def repeated_severity_bumps(type_codes, timestamps, offsets, days_window=REPEAT_SEVERITY_WINDOW_DAYS):
+    """
+    For every violation, how many earlier violations of the same type the same
+    business had within the preceding `days_window` days (effective severity
+    = base severity + bump). "Earlier" is by timestamp, ties broken by input
+    order. Business i owns rows offsets[i]:offsets[i + 1].
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    codes = np.asarray(type_codes, dtype=np.int64)
+    ts_s = np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+    n = ts_s.size
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    seg = np.repeat(np.arange(offsets.size - 1, dtype=np.int64), np.diff(offsets))
+    order = np.lexsort((ts_s, codes, seg))
+    s_seg, s_code = seg[order], codes[order]
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (s_seg[1:] != s_seg[:-1]) | (s_code[1:] != s_code[:-1])
+    group = np.cumsum(new_group) - 1
+
+    # Composite (group, time) keys keep each group's window inside its own range
+    window_s = int(days_window) * 86_400
+    rel = ts_s[order] - ts_s.min() + window_s + 1
+    stride = int(rel.max()) + 1
+    keys = group * stride + rel
+    first_in_window = np.searchsorted(keys, keys - window_s, side="right")
+
+    bumps = np.empty(n, dtype=np.int64)
+    bumps[order] = np.arange(n) - first_in_window
+    return bumps
+
+###############################################################################
+# Time decay and open-violation penalty inputs
+###############################################################################
+DECAY_ALPHA = 0.1           # monthly fine decay used for decayed_fine
+OPEN_OVERDUE_DAYS = 30      # open violations older than this add a penalty
+OPEN_PENALTY_STEP = 0.02
+
+def days_since(timestamps, as_of):
+    """Whole days from each timestamp to `as_of` (floored, like timedelta.days)."""
+    ts = np.asarray(timestamps, dtype="datetime64[us]")
+    return (np.datetime64(as_of, "us") - ts) // np.timedelta64(1, "D")
+
+def decayed_fines(fines, days):
+    """fine * exp(-DECAY_ALPHA * months since the violation)."""
+    return np.asarray(fines, dtype=np.float64) * np.exp(-DECAY_ALPHA * (np.asarray(days) / 30.0))
+
+###############################################################################
+# Violation records for the scoring pipeline
+###############################################################################
+class ViolationRecord:
+    """
+    One violation as compute_risk_score_enhanced() sees it. Slotted, so it is
+    a fraction of the size of the equivalent dict; v["field"] and v.get()
+    still work for code written against the old dict records.
+    """
+    __slots__ = ("category", "base_severity", "effective_severity", "fine",
+                 "decayed_fine", "timestamp", "status", "days_since")
+
+    def __init__(self, category, base_severity, effective_severity, fine,
+                 decayed_fine, timestamp, status, days_since):
+        self.category = category
+        self.base_severity = base_severity
+        self.effective_severity = effective_severity
+        self.fine = fine
+        self.decayed_fine = decayed_fine
+        self.timestamp = timestamp
+        self.status = status
+        self.days_since = days_since
+
+    @classmethod
+    def from_dict(cls, d):
+        """Builds a record from an old-style dict; extra keys are ignored."""
+        return cls(*(d[name] for name in cls.__slots__))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"ViolationRecord({self.category!r}, {self.timestamp!r}, status={self.status!r})"
+
+class ViolationBatch:
+    """
+    One business's violations as parallel NumPy columns, so scoring never
+    builds a Python object per violation. Categories are codes into
+    `category_names`. Iterating (or indexing) yields ViolationRecords, and
+    every risk_calc function that takes violation records or their
+    timestamps also accepts a batch.
+    """
+    __slots__ = ("cat_codes", "category_names", "base_severities", "effective_severities",
+                 "fines", "decayed_fines", "timestamps", "is_open", "days_since")
+
+    def __init__(self, cat_codes, category_names, base_severities, effective_severities,
+                 fines, decayed_fines, timestamps, is_open, days_since):
+        self.cat_codes = np.asarray(cat_codes, dtype=np.int32)
+        self.category_names = list(category_names)
+        self.base_severities = np.asarray(base_severities, dtype=np.int64)
+        self.effective_severities = np.asarray(effective_severities, dtype=np.int64)
+        self.fines = np.asarray(fines, dtype=np.int64)
+        self.decayed_fines = np.asarray(decayed_fines, dtype=np.float64)
+        self.timestamps = np.asarray(timestamps, dtype="datetime64[us]")
+        self.is_open = np.asarray(is_open, dtype=bool)
+        self.days_since = np.asarray(days_since, dtype=np.int64)
+
+    @classmethod
+    def from_records(cls, records):
+        """Packs ViolationRecords or old-style dicts into a batch."""
+        records = list(records)
+        cat_codes, names = encode_categories([r["category"] for r in records])
+        return cls(
+            cat_codes, names,
+            [r["base_severity"] for r in records],
+            [r["effective_severity"] for r in records],
+            [r["fine"] for r in records],
+            [r["decayed_fine"] for r in records],
+            [r["timestamp"] for r in records],
+            [r["status"] == "Open" for r in records],
+            [r["days_since"] for r in records]
+        )
+
+    def at(self, as_of):
+        """The same violations with age and decayed fines recomputed relative to `as_of`."""
+        days = days_since(self.timestamps, as_of)
+        return ViolationBatch(
+            self.cat_codes, self.category_names, self.base_severities, self.effective_severities,
+            self.fines, decayed_fines(self.fines, days), self.timestamps, self.is_open, days
+        )
+
+    def __len__(self):
+        return self.timestamps.size
+
+    def __getitem__(self, i):
+        return ViolationRecord(
+            self.category_names[self.cat_codes[i]],
+            int(self.base_severities[i]),
+            int(self.effective_severities[i]),
+            int(self.fines[i]),
+            float(self.decayed_fines[i]),
+            self.timestamps[i].item(),
+            "Open" if self.is_open[i] else "Closed",
+            int(self.days_since[i])
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def open_overdue(self):
+        return self.is_open & (self.days_since > OPEN_OVERDUE_DAYS)
+
+def _batch_timestamps(violations):
+    """Timestamps of a ViolationBatch, or the argument unchanged."""
+    return violations.timestamps if isinstance(violations, ViolationBatch) else violations
 
 ###############################################################################
 # Enhanced aggregator
 ###############################################################################
-def compute_risk_score_enhanced(violations, business_type):
+def industry_modifier(business_type):
+    prof = industry_profiles.get(business_type, {"compliance_factor": 1.0, "impact_factor": 1.0})
+    return (prof["compliance_factor"] + prof["impact_factor"]) / 2.0
+
+def compute_risk_score_enhanced(violations, business_type, as_of=None):
     """
     Already described advanced aggregator with repeated severity, time-decay, open penalty, etc.
+    `violations` is a ViolationBatch (scored column-wise) or a list of
+    ViolationRecords / dicts. With `as_of`, decayed fines and ages are
+    recomputed relative to that date instead of taken from the records.
     """
-    if not violations:
+    if not len(violations):
         return 0.0
+    if as_of is not None:
+        if not isinstance(violations, ViolationBatch):
+            violations = ViolationBatch.from_records(violations)
+        violations = violations.at(as_of)
+    if isinstance(violations, ViolationBatch):
+        n = len(violations)
+        return float(batch_risk_scores_enhanced(
+            [0, n], violations.timestamps, violations.decayed_fines,
+            violations.effective_severities, violations.cat_codes,
+            violations.open_overdue, [business_type]
+        )[0])
 
     total_decayed_fines = 0.0
     severities = []
     violation_timestamps = []
-    cat_timestamps = []
+    categories = []
     open_violation_penalty = 0.0
 
     for v in violations:
         total_decayed_fines += v["decayed_fine"]
         severities.append(v["effective_severity"])
         violation_timestamps.append(v["timestamp"])
-        cat_timestamps.append((v["category"], np.datetime64(v["timestamp"])))
-        if v["status"] == "Open" and v["days_since"] > 30:
-            open_violation_penalty += 0.02
+        categories.append(v["category"])
+        if v["status"] == "Open" and v["days_since"] > OPEN_OVERDUE_DAYS:
+            open_violation_penalty += OPEN_PENALTY_STEP
 
     total_violations = len(violations)
     avg_sev = sum(severities) / len(severities)
@@ -312,49 +750,186 @@ def compute_risk_score_enhanced(violations, business_type):
     sev_norm = min(avg_sev / 5.0, 1.0)
     imp_risk = 0.5 * fine_norm + 0.5 * sev_norm
 
-    month_counts = defaultdict(int)
-    for t in violation_timestamps:
-        k = t.strftime("%Y-%m")
-        month_counts[k] += 1
-    sorted_keys = sorted(month_counts.keys())
-    counts = [month_counts[k] for k in sorted_keys]
-    if len(counts) < 2:
-        trend_risk = 0.0
-    else:
-        x = list(range(len(counts)))
-        mean_x = sum(x) / len(x)
-        mean_y = sum(counts) / len(counts)
-        numerator = sum(x[i]*counts[i] for i in range(len(x))) - len(x)*mean_x*mean_y
-        denominator = sum((xx - mean_x)**2 for xx in x)
-        slope = numerator / denominator if denominator else 0
-        slope = max(slope, 0.0)
-        trend_risk = min(slope / 5.0, 1.0)
+    slope = max(monthly_trend_slope(violation_timestamps), 0.0)
+    trend_risk = min(slope / 5.0, 1.0)
 
-    repeated_factor = compute_repeated_category_factor(cat_timestamps, 60)
+    cat_codes, _ = encode_categories(categories)
+    repeated_factor = repeated_category_factor_arrays(
+        cat_codes, violation_timestamps, repeat_window_days(business_type)
+    )
 
     base_score = freq_risk * 0.4 + imp_risk * 0.4 + trend_risk * 0.2
     base_score += repeated_factor
     base_score += open_violation_penalty
 
-    prof = industry_profiles.get(business_type, {"compliance_factor": 1.0, "impact_factor": 1.0})
-    industry_mod = (prof["compliance_factor"] + prof["impact_factor"]) / 2.0
-    final_score = base_score * industry_mod
+    final_score = base_score * industry_modifier(business_type)
     final_score *= 1.25
 
     return final_score
 
+###############################################################################
+# Batch (columnar) scoring
+###############################################################################
+def batch_risk_scores_enhanced(offsets, timestamps, decayed, effective_severities,
+                               cat_codes, open_overdue, business_types):
+    """
+    compute_risk_score_enhanced() for many businesses at once from columns.
+    Business i owns rows offsets[i]:offsets[i + 1]; `open_overdue` marks Open
+    violations older than OPEN_OVERDUE_DAYS; `business_types` has one entry per
+    business. Businesses without violations score 0.0.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_seg = offsets.size - 1
+    lengths = np.diff(offsets)
+    scores = np.zeros(n_seg, dtype=np.float64)
+    if n_seg <= 0 or offsets[-1] == 0:
+        return scores
+
+    ts = np.asarray(timestamps, dtype="datetime64[us]")
+    seg = np.repeat(np.arange(n_seg, dtype=np.int64), lengths)
+    nonempty = lengths > 0
+    starts = offsets[:-1][nonempty]
+    n = lengths.astype(np.float64)
+    safe_n = np.where(nonempty, n, 1.0)
+
+    sum_decayed = np.bincount(seg, weights=decayed, minlength=n_seg)
+    sum_sev = np.bincount(seg, weights=effective_severities, minlength=n_seg)
+    n_overdue = np.bincount(seg, weights=np.asarray(open_overdue, dtype=np.float64), minlength=n_seg)
+
+    ts_us = ts.astype(np.int64)
+    min_us = np.zeros(n_seg, dtype=np.int64)
+    max_us = np.zeros(n_seg, dtype=np.int64)
+    min_us[nonempty] = np.minimum.reduceat(ts_us, starts)
+    max_us[nonempty] = np.maximum.reduceat(ts_us, starts)
+    total_days = np.where(max_us > min_us, (max_us - min_us) // 86_400_000_000, 1)
+    months_in_period = np.where(total_days > 0, total_days / 30.0, 1.0)
+
+    freq_risk = 1 - np.exp(-(n / months_in_period))
+    fine_norm = np.minimum(sum_decayed / safe_n / 10000.0, 1.0)
+    sev_norm = np.minimum(sum_sev / safe_n / 5.0, 1.0)
+    imp_risk = 0.5 * fine_norm + 0.5 * sev_norm
+
+    slope = np.maximum(batch_monthly_trend_slopes(ts, offsets), 0.0)
+    trend_risk = np.minimum(slope / 5.0, 1.0)
+
+    types = list(business_types)
+    windows = np.array([repeat_window_days(t) for t in types], dtype=np.int64)
+    repeated = batch_repeated_category_factors(cat_codes, ts, offsets, windows)
+
+    base_score = freq_risk * 0.4 + imp_risk * 0.4 + trend_risk * 0.2
+    base_score += repeated
+    base_score += OPEN_PENALTY_STEP * n_overdue
+
+    modifiers = np.array([industry_modifier(t) for t in types], dtype=np.float64)
+    scores[nonempty] = (base_score * modifiers * 1.25)[nonempty]
+    return scores
+
+def score_violation_columns(offsets, timestamps, fines, base_severities, type_codes,
+                            cat_codes, is_open, business_types, as_of):
+    """
+    Full enhanced scoring from stored violation columns: raw fines, base
+    severities and open flags, with rows grouped by business and in insertion
+    order inside each business. Repeat bumps, decay and the overdue flag are
+    derived here relative to `as_of`.
+    """
+    ts = np.asarray(timestamps, dtype="datetime64[us]")
+    days = days_since(ts, as_of)
+    effective = np.asarray(base_severities, dtype=np.int64) + repeated_severity_bumps(type_codes, ts, offsets)
+    overdue = np.asarray(is_open, dtype=bool) & (days > OPEN_OVERDUE_DAYS)
+    return batch_risk_scores_enhanced(
+        offsets, ts, decayed_fines(fines, days), effective, cat_codes, overdue, business_types
+    )
+
+def score_change_bounds(scores, elapsed_days, business_types, newly_overdue):
+    """
+    (lower, upper) bounds on each business's enhanced score after `elapsed_days`
+    more days of decay, assuming its violations are unchanged. Only two terms
+    move with time: the average decayed fine shrinks by at most a factor
+    exp(-DECAY_ALPHA * months), which lowers fine_norm by at most that share of
+    its cap, and each open violation that becomes overdue (`newly_overdue`
+    per business) adds OPEN_PENALTY_STEP. Both are scaled by the industry
+    modifier like the score itself.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    elapsed = np.maximum(np.asarray(elapsed_days, dtype=np.float64), 0.0)
+    scale = np.array([industry_modifier(t) for t in business_types], dtype=np.float64) * 1.25
+    max_decay = 0.4 * 0.5 * (1.0 - np.exp(-DECAY_ALPHA * elapsed / 30.0)) * scale
+    penalty = OPEN_PENALTY_STEP * np.asarray(newly_overdue, dtype=np.float64) * scale
+    slack = 1e-9 * np.maximum(np.abs(scores), 1.0)
+    return scores + penalty - max_decay - slack, scores + penalty + slack
+
+def load_violation_snapshot(snapshot_dir, months=None):
+    """
+    Reads a Parquet snapshot written by snapshot.py (optionally only some
+    "YYYY-MM" months) into NumPy columns grouped by business, ready for
+    score_violation_columns(). Needs pyarrow.
+    """
+    from snapshot import read_snapshot_table, dictionary_codes
+
+    table = read_snapshot_table(
+        snapshot_dir, "violation",
+        columns=["id", "business_name", "violation_type", "category", "status",
+                 "severity", "fine", "timestamp"],
+        months=months
+    )
+    rc = read_snapshot_table(snapshot_dir, "risk_classification",
+                             columns=["business_name", "business_type"])
+
+    biz_codes, biz_names = dictionary_codes(table.column("business_name"))
+    type_codes, _ = dictionary_codes(table.column("violation_type"))
+    cat_codes, _ = dictionary_codes(table.column("category"))
+    status_codes, status_names = dictionary_codes(table.column("status"))
+    ids = table.column("id").to_numpy()
+
+    order = np.lexsort((ids, biz_codes))
+    biz_sorted = biz_codes[order]
+    present = np.unique(biz_sorted)
+    offsets = np.concatenate([np.searchsorted(biz_sorted, present), [biz_sorted.size]])
+
+    type_by_name = dict(zip(rc.column("business_name").to_pylist(), rc.column("business_type").to_pylist()))
+    names = [biz_names[i] for i in present]
+    open_code = status_names.index("Open") if "Open" in status_names else -1
+    return {
+        "business_names": names,
+        "business_types": [type_by_name.get(name) or "General Business" for name in names],
+        "offsets": offsets,
+        "ids": ids[order],
+        "timestamps": table.column("timestamp").to_numpy()[order].astype("datetime64[us]"),
+        "fines": table.column("fine").to_numpy()[order],
+        "severities": table.column("severity").to_numpy()[order],
+        "type_codes": type_codes[order],
+        "cat_codes": cat_codes[order],
+        "is_open": status_codes[order] == open_code
+    }
+
+def score_violation_snapshot(snapshot_dir, as_of, months=None):
+    """(business names, enhanced scores) for every business in a Parquet snapshot."""
+    cols = load_violation_snapshot(snapshot_dir, months)
+    scores = score_violation_columns(
+        cols["offsets"], cols["timestamps"], cols["fines"], cols["severities"],
+        cols["type_codes"], cols["cat_codes"], cols["is_open"], cols["business_types"], as_of
+    )
+    return cols["business_names"], scores
+
 ###############################################################################
 # Classification logic (user sets their own thresholds)
 ###############################################################################
+RISK_LEVELS = ("Low", "Medium", "High")
+RISK_THRESHOLDS = (1.0, 2.0)    # lowest Medium and High scores
+
 def classify_risk(score):
     # Example: Above 2 => High, above 1 => Medium, else Low
-    if score >= 2.0:
+    if score >= RISK_THRESHOLDS[1]:
         return "High"
-    elif score >= 1.0:
+    elif score >= RISK_THRESHOLDS[0]:
         return "Medium"
     else:
         return "Low"
 
+def classify_risk_levels(scores):
+    """classify_risk() over an array: index into RISK_LEVELS per score."""
+    return np.searchsorted(RISK_THRESHOLDS, np.asarray(scores, dtype=np.float64), side="right")
+
 ###############################################################################
 # A helper: fetch global stats for benchmarking & trend
 ###############################################################################
@@ -0,0 +1,196 @@
+##################################################################################
+# search_index.py
+#
+# Full-text business search. One document per business in an SQLite FTS5
+# table, rowid = risk_classification.id:
+#
+#   business_search(business_name, description, location,
+#                   violation_types, corrective_actions)
+#
+# violation_types / corrective_actions are the distinct values over the
+# business's violations. Triggers on risk_classification and violation
+# refresh the affected business's document, so the index stays in sync with
+# single-row writes; bulk loads (seed.py) call rebuild_search_index() once at
+# the end instead. Without FTS5 (or on another database) search_businesses()
+# falls back to ranked LIKE matching over the same fields.
+#
+#   flask --app app rebuild-search-index
+##################################################################################
+
+import re
+
+from models import db
+
+SEARCH_TABLE = "business_search"
+SEARCH_PAGE_DEFAULT = 20
+SEARCH_PAGE_MAX = 100
+# bm25 column weights, in SEARCH_TABLE column order
+SEARCH_WEIGHTS = (10.0, 2.0, 3.0, 1.5, 0.5)
+
+_TYPES_SQL = """
+    SELECT group_concat(DISTINCT vt.name) FROM violation v
+    JOIN violation_type vt ON vt.id = v.violation_type_id
+    WHERE v.business_name = {name}
+"""
+_ACTIONS_SQL = """
+    SELECT group_concat(DISTINCT v.corrective_actions) FROM violation v
+    WHERE v.business_name = {name} AND v.corrective_actions <> ''
+"""
+
+def _refresh_sql(name):
+    """Statements that rebuild one business's document; `name` is an SQL expression."""
+    return f"""
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = (SELECT id FROM risk_classification WHERE business_name = {name});
+        INSERT INTO {SEARCH_TABLE} (rowid, business_name, description, location, violation_types, corrective_actions)
+        SELECT rc.id, rc.business_name, rc.description, rc.location,
+               ({_TYPES_SQL.format(name='rc.business_name')}),
+               ({_ACTIONS_SQL.format(name='rc.business_name')})
+        FROM risk_classification rc WHERE rc.business_name = {name};
+    """
+
+TRIGGERS = {
+    "business_search_rc_insert": f"""
+        AFTER INSERT ON risk_classification BEGIN {_refresh_sql('NEW.business_name')} END""",
+    "business_search_rc_update": f"""
+        AFTER UPDATE OF business_name, description, location ON risk_classification BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+            {_refresh_sql('NEW.business_name')}
+        END""",
+    "business_search_rc_delete": f"""
+        AFTER DELETE ON risk_classification BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+        END""",
+    "business_search_violation_insert": f"""
+        AFTER INSERT ON violation BEGIN {_refresh_sql('NEW.business_name')} END""",
+    "business_search_violation_update": f"""
+        AFTER UPDATE OF business_name, violation_type_id, corrective_actions ON violation BEGIN
+            {_refresh_sql('OLD.business_name')}
+            {_refresh_sql('NEW.business_name')}
+        END""",
+    "business_search_violation_delete": f"""
+        AFTER DELETE ON violation BEGIN {_refresh_sql('OLD.business_name')} END""",
+}
+
+def fts5_available(conn):
+    if conn.dialect.name != "sqlite":
+        return False
+    return bool(conn.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+def search_index_exists(conn):
+    if conn.dialect.name != "sqlite":
+        return False
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).first() is not None
+
+def rebuild_search_index():
+    """
+    (Re)creates the FTS5 table and its triggers and fills it from the current
+    tables in one pass. Must run inside an app context. Returns the number of
+    indexed businesses, or None when FTS5 is unavailable.
+    """
+    conn = db.session.connection()
+    if not fts5_available(conn):
+        return None
+
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    conn.exec_driver_sql(f"""
+        CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+            business_name, description, location, violation_types, corrective_actions,
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+    """)
+    conn.exec_driver_sql(f"""
+        INSERT INTO {SEARCH_TABLE} (rowid, business_name, description, location, violation_types, corrective_actions)
+        SELECT rc.id, rc.business_name, rc.description, rc.location, t.types, a.actions
+        FROM risk_classification rc
+        LEFT JOIN (
+            SELECT v.business_name, group_concat(DISTINCT vt.name) AS types
+            FROM violation v JOIN violation_type vt ON vt.id = v.violation_type_id
+            GROUP BY v.business_name
+        ) t ON t.business_name = rc.business_name
+        LEFT JOIN (
+            SELECT business_name, group_concat(DISTINCT corrective_actions) AS actions
+            FROM violation WHERE corrective_actions <> ''
+            GROUP BY business_name
+        ) a ON a.business_name = rc.business_name
+    """)
+    for name, body in TRIGGERS.items():
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        conn.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+    count = conn.exec_driver_sql(f"SELECT COUNT(*) FROM {SEARCH_TABLE}").scalar()
+    db.session.commit()
+    return count
+
+def fts_query(q):
+    """
+    User text -> FTS5 MATCH expression: every word must match, the last one
+    as a prefix (search-as-you-type). Words are quoted, so FTS5 operators and
+    punctuation in the input are treated as plain text.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def _search_fts(conn, q, limit, offset):
+    match = fts_query(q)
+    if match is None:
+        return []
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    return conn.exec_driver_sql(f"""
+        SELECT rc.business_name, rc.risk_level, rc.total_violations, rc.business_type, rc.location, rc.description,
+               snippet({SEARCH_TABLE}, -1, '[', ']', '...', 10) AS snippet
+        FROM {SEARCH_TABLE} s
+        JOIN risk_classification rc ON rc.id = s.rowid
+        WHERE {SEARCH_TABLE} MATCH ?
+        ORDER BY bm25({SEARCH_TABLE}, {weights}), rc.id
+        LIMIT ? OFFSET ?
+    """, (match, limit, offset)).fetchall()
+
+def _search_like(conn, q, limit, offset):
+    # Portable fallback: name prefix, then name substring, then other fields
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return []
+    phrase = " ".join(words)
+    escaped = phrase.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    contains = f"%{escaped}%"
+    return conn.exec_driver_sql("""
+        SELECT rc.business_name, rc.risk_level, rc.total_violations, rc.business_type, rc.location, rc.description,
+               NULL AS snippet
+        FROM risk_classification rc
+        WHERE lower(rc.business_name) LIKE ? ESCAPE '\\'
+           OR lower(rc.description) LIKE ? ESCAPE '\\'
+           OR lower(rc.location) LIKE ? ESCAPE '\\'
+           OR EXISTS (
+                SELECT 1 FROM violation v JOIN violation_type vt ON vt.id = v.violation_type_id
+                WHERE v.business_name = rc.business_name
+                  AND (lower(vt.name) LIKE ? ESCAPE '\\' OR lower(v.corrective_actions) LIKE ? ESCAPE '\\')
+           )
+        ORDER BY CASE
+                    WHEN lower(rc.business_name) LIKE ? ESCAPE '\\' THEN 0
+                    WHEN lower(rc.business_name) LIKE ? ESCAPE '\\' THEN 1
+                    ELSE 2
+                 END, rc.business_name
+        LIMIT ? OFFSET ?
+    """, (contains, contains, contains, contains, contains,
+          f"{escaped}%", contains, limit, offset)).fetchall()
+
+def search_businesses(q, limit=SEARCH_PAGE_DEFAULT, offset=0):
+    """
+    Ranked business matches for free text `q`: (rows, has_more). Uses the
+    FTS5 index when it exists, otherwise the LIKE fallback.
+    """
+    conn = db.session.connection()
+    search = _search_fts if search_index_exists(conn) else _search_like
+    rows = search(conn, q, limit + 1, offset)
+    return rows[:limit], len(rows) > limit
+
+if __name__ == "__main__":
+    from app import app
+
+    with app.app_context():
+        print(rebuild_search_index())
@@ -3,53 +3,131 @@
 #
 # Seeds the DB with advanced aggregator + new extended commentary from generate_extended_report()
 # + multi-step violation_status_history table creation & seeding.
+#
+# Generation is reproducible: every business draws from its own NumPy Generator
+# (SeedSequence spawn key = business index), so a given seed yields the same
+# dataset whether it runs in 1 or N worker processes. Workers write .npz shards
+# which are merged into the DB in business order.
 # 
 # NO lines omitted, includes full expansions, advanced logic, multi-step statuses, etc.
 ##################################################################################
 
 import os
-import random
-import pandas as pd
+import shutil
+import tempfile
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-from models import db, Violation, RiskClassification
+from models import (
+    db, RiskClassification, Category, ViolationType, Location, ViolationStatus,
+    clear_lookup_caches
+)
 from risk_calc import (
-    compute_fine,
-    violation_type_severity_map,
+    REGULATORY_ROWS,
+    SEVERITY_BY_CODE_INDEX,
+    FINE_TIERS,
+    DEFAULT_SEVERITY,
+    days_since,
+    decayed_fines,
+    repeated_severity_bumps,
     compute_risk_score_enhanced,
+    ViolationBatch,
     classify_risk,
-    compute_aggregated_risk,
     compute_weighted_risk,
-    generate_insight,            # older simpler
     fetch_global_stats,          # new for benchmarking/trends
     generate_extended_report     # new multi-paragraph commentary
 )
 
+from search_index import rebuild_search_index
+
 # NEW: import text for raw SQL
 from sqlalchemy import text
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-file_path = os.path.join(BASE_DIR, "Violations_Dataset.csv")
-if os.path.isfile(file_path):
-    df = pd.read_csv(file_path)
-    # Group the dataset by Category for random pick
-    violation_data = df.groupby("Category")["Violation Type"].apply(list).to_dict()
-else:
-    violation_data = {}
-
-def get_violation_count():
+
+DEFAULT_SEED = 20250228
+SEED_START_DATE = datetime(2023, 1, 1)
+SEED_END_DATE = datetime(2025, 2, 28)
+SEED_TOTAL_DAYS = (SEED_END_DATE - SEED_START_DATE).days
+CLOSE_PROBABILITY = 0.2
+SHARD_SIZE = 2000           # businesses per shard (independent of worker count)
+INSERT_CHUNK = 50000        # rows per executemany batch when merging shards
+
+# risk_classification values for a business without violations (rescore.py
+# resets rows to these when a business's last violations are removed)
+NO_VIOLATION_SCORES = {
+    "total_violations": 0,
+    "total_fines": 0,
+    "last_violation_date": None,
+    "risk_level": "Low",
+    "weighted_risk_score": 0.0,
+    "advanced_risk_score": 0.0,
+    "industry_risk_factor": "Low",
+    "violation_frequency_score": 0.0,
+    "unpaid_fines": 0,
+    "average_fine": 0.0
+}
+
+def build_violation_catalog(rows):
+    """
+    Flattens the regulatory rows into arrays the generator can index:
+      - categories:      category names (sorted); position == category index
+      - type_names:      violation type text per regulatory code index
+      - type_codes:      regulatory Code per code index
+      - type_category:   category index of each code
+      - by_category:     (n_categories, max_types) code indices, -1 padded
+      - category_sizes:  number of codes in each category
+      - severity / fine_tiers: the compiled risk_calc tables
+    Falls back to a single generic type when the CSV is missing.
+    """
+    if not rows:
+        return {
+            "categories": ["General Regulatory Violations"],
+            "type_names": ["Failure to provide required documents"],
+            "type_codes": [None],
+            "type_category": np.zeros(1, dtype=np.int32),
+            "by_category": np.zeros((1, 1), dtype=np.int32),
+            "category_sizes": np.ones(1, dtype=np.int64),
+            "severity": np.full(1, DEFAULT_SEVERITY, dtype=np.int8),
+            "fine_tiers": np.zeros((1, 3), dtype=np.int32)
+        }
+
+    categories = sorted({row["category"] for row in rows})
+    cat_index = {name: i for i, name in enumerate(categories)}
+    members = [[] for _ in categories]
+    for i, row in enumerate(rows):
+        members[cat_index[row["category"]]].append(i)
+
+    by_category = np.full((len(categories), max(len(m) for m in members)), -1, dtype=np.int32)
+    for c, idxs in enumerate(members):
+        by_category[c, :len(idxs)] = idxs
+
+    return {
+        "categories": categories,
+        "type_names": [row["violation_type"] for row in rows],
+        "type_codes": [row["code"] for row in rows],
+        "type_category": np.array([cat_index[row["category"]] for row in rows], dtype=np.int32),
+        "by_category": by_category,
+        "category_sizes": np.array([len(m) for m in members], dtype=np.int64),
+        "severity": SEVERITY_BY_CODE_INDEX,
+        "fine_tiers": FINE_TIERS
+    }
+
+VIOLATION_CATALOG = build_violation_catalog(REGULATORY_ROWS)
+
+def get_violation_count(rng):
     # Probability distribution for how many violations each business might have
-    p = random.random()
+    p = rng.random()
     if p < 0.05:
-        return random.randint(60, 90)
+        return int(rng.integers(60, 91))
     elif p < 0.25:
-        return random.randint(20, 49)
+        return int(rng.integers(20, 50))
     elif p < 0.50:
-        return random.randint(6, 15)
+        return int(rng.integers(6, 16))
     elif p < 0.98:
-        return random.randint(1, 5)
+        return int(rng.integers(1, 6))
     else:
         return 0
 
@@ -60,8 +138,22 @@ INSPECTION_NOTES = [
     "Partial compliance improvement observed.",
     "Extensive check done, some areas still lacking."
 ]
-def get_inspection_note():
-    return random.choice(INSPECTION_NOTES)
+def get_inspection_note(rng):
+    return INSPECTION_NOTES[rng.integers(len(INSPECTION_NOTES))]
+
+# Departmental workflow steps for violation_status_history
+STATUS_STEPS = [
+    ("Open", "Violation just created; assigned to local inspector"),
+    ("Pending Payment", "Invoiced business for payment of fines; awaiting response"),
+    ("Assigned to Field Inspector", "Inspector visiting site for detailed check"),
+    ("Legal Review", "Sent case to legal department for compliance check"),
+    ("NOC Required", "Awaiting NOC from relevant authority"),
+    ("Closed", "All requirements fulfilled; violation case closed"),
+    ("Awaiting Documents", "Business asked to provide official documents"),
+    ("Inspection Scheduled", "Follow-up inspection scheduled next week"),
+    ("Escalated to Management", "High priority, manager involvement requested")
+]
+MAX_STATUS_STEPS = 5
 
 def determine_industry_label(score):
     # user logic: above 2 => high, above 1 => med, else low
@@ -620,10 +712,405 @@ good_companies = [
     "Fujairah Pearl Industries","Emirates Commercial Bank","Al Saqr Financial","Desert Capital Investment"
 ]
 
-def seed_db():
+def seed_business_names(num_businesses=None):
+    """
+    The business list used for seeding. With num_businesses larger than the
+    built-in list, names repeat with a " #2", " #3", ... suffix so fixtures
+    of any size keep realistic name -> industry/location mapping.
+    """
+    base = original_business_list + expanded_business_list
+    if num_businesses is None:
+        return list(base)
+    names = []
+    for i in range(num_businesses):
+        name = base[i % len(base)]
+        rnd = i // len(base)
+        names.append(name if rnd == 0 else f"{name} #{rnd + 1}")
+    return names
+
+def business_rng(seed, business_index):
+    # Equivalent to SeedSequence(seed).spawn(...)[business_index], without
+    # materializing every child: streams don't depend on shard or worker layout
+    return np.random.Generator(np.random.PCG64(
+        np.random.SeedSequence(seed, spawn_key=(business_index,))
+    ))
+
+###############################################################################
+# Per-business generation (pure NumPy, no DB access)
+###############################################################################
+def generate_business_violations(rng, catalog=VIOLATION_CATALOG):
+    """
+    Draws one business's violations and status-history steps from `rng`.
+    Returns a dict of arrays; timestamps are datetime64[us].
+    """
+    n = get_violation_count(rng)
+
+    cats = rng.integers(len(catalog["categories"]), size=n)
+    pick = (rng.random(n) * catalog["category_sizes"][cats]).astype(np.int64)
+    types = catalog["by_category"][cats, pick]
+
+    # Uniform pick among the numeric offense tiers, 0 if there are none
+    tiers = catalog["fine_tiers"][types]
+    numeric = tiers > 0
+    n_numeric = numeric.sum(axis=1)
+    tier_pick = (rng.random(n) * n_numeric).astype(np.int64)
+    tier_col = np.argmax(np.cumsum(numeric, axis=1) > tier_pick[:, None], axis=1)
+    fines = np.where(n_numeric > 0, tiers[np.arange(n), tier_col], 0).astype(np.int32)
+
+    days = rng.integers(0, SEED_TOTAL_DAYS + 1, size=n)
+    timestamps = np.datetime64(SEED_START_DATE, "us") + days.astype("timedelta64[D]")
+
+    closed = rng.random(n) < CLOSE_PROBABILITY
+    resolve_days = rng.integers(1, 16, size=n).astype("timedelta64[D]")
+    resolution = np.where(closed, timestamps + resolve_days, np.datetime64("NaT", "us"))
+
+    # Status history: 2-5 distinct steps; step times are the sorted random
+    # offsets, padded with +2h per step when there are fewer offsets than steps
+    steps = np.arange(MAX_STATUS_STEPS)
+    step_count = rng.integers(2, MAX_STATUS_STEPS + 1, size=n)
+    step_ids = np.argsort(rng.random((n, len(STATUS_STEPS))), axis=1)[:, :MAX_STATUS_STEPS]
+    ts_count = rng.integers(2, MAX_STATUS_STEPS + 1, size=n)
+    hours = rng.integers(1, 49, size=(n, MAX_STATUS_STEPS)) * (steps + 1)
+    hours = np.where(steps < ts_count[:, None], hours, np.iinfo(np.int64).max)
+    hours.sort(axis=1)
+    last_hour = hours[np.arange(n), ts_count - 1] if n else np.zeros(0, dtype=np.int64)
+    step_hours = np.where(steps < ts_count[:, None], hours, last_hour[:, None] + 2 * steps)
+    keep = steps < step_count[:, None]
+    hist_violation, _ = np.nonzero(keep)
+
+    return {
+        "types": types.astype(np.int32),
+        "categories": catalog["type_category"][types],
+        "fines": fines,
+        "timestamps": timestamps,
+        "closed": closed,
+        "resolution": resolution,
+        "note": int(rng.integers(len(INSPECTION_NOTES))),
+        "hist_violation": hist_violation.astype(np.int64),
+        "hist_step": step_ids[keep].astype(np.int8),
+        "hist_hours": step_hours[keep].astype(np.int64)
+    }
+
+def score_generated_business(gen, business_type, catalog=VIOLATION_CATALOG, as_of=SEED_END_DATE):
+    """
+    Runs the risk aggregators on one generated business, with time decay
+    relative to `as_of`. Returns the numbers the RiskClassification row and
+    report need.
+    """
+    n = gen["types"].size
+    ts = gen["timestamps"]
+    base_sev = catalog["severity"][gen["types"]].astype(np.int64)
+    eff_sev = base_sev + repeated_severity_bumps(gen["types"], ts, [0, n])
+
+    days = days_since(ts, as_of)
+    violations = ViolationBatch(
+        gen["categories"], catalog["categories"], base_sev, eff_sev,
+        gen["fines"], decayed_fines(gen["fines"], days), ts, ~gen["closed"], days
+    )
+
+    final_score = compute_risk_score_enhanced(violations, business_type)
+
+    # old aggregator
+    total_fines = int(gen["fines"].sum())
+    avg_fine = total_fines / n
+    avg_sev = float(base_sev.mean())
+    span = ts.max() - ts.min()
+    freq_days = int(span // np.timedelta64(1, "D")) if span > np.timedelta64(0, "us") else 1
+    months_in_period = freq_days / 30.0 if freq_days > 0 else 1.0
+    vio_freq = n / months_in_period
+    old_weighted = compute_weighted_risk(n, total_fines, vio_freq, avg_sev)
+
+    return {
+        "final_score": float(final_score),
+        "weighted": float(old_weighted),
+        "frequency": float(vio_freq),
+        "total_fines": total_fines,
+        "average_fine": float(avg_fine)
+    }
+
+def _generate_shard(spec):
+    """
+    Worker entry point: generate businesses [start, stop) and write one .npz
+    shard. Only module-level state is used, so it runs in any process.
+    """
+    seed, shard_no, start, names, shard_dir = spec
+    catalog = VIOLATION_CATALOG
+    n_cat = len(catalog["categories"])
+
+    cols = defaultdict(list)
+    biz = defaultdict(list)
+    violation_offset = 0
+    for i, name in enumerate(names):
+        gen = generate_business_violations(business_rng(seed, start + i), catalog)
+        n = gen["types"].size
+        info = get_business_info(name)
+
+        biz["count"].append(n)
+        biz["note"].append(gen["note"])
+        biz["cat_counts"].append(np.bincount(gen["categories"], minlength=n_cat))
+        biz["open"].append(int(n - gen["closed"].sum()))
+        if n:
+            scores = score_generated_business(gen, info["business_type"], catalog)
+            biz["last_ts"].append(gen["timestamps"].max())
+        else:
+            scores = {"final_score": 0.0, "weighted": 0.0, "frequency": 0.0, "total_fines": 0, "average_fine": 0.0}
+            biz["last_ts"].append(np.datetime64("NaT", "us"))
+        for key, value in scores.items():
+            biz[key].append(value)
+
+        for key in ("types", "fines", "timestamps", "closed", "resolution", "hist_step", "hist_hours"):
+            cols[key].append(gen[key])
+        cols["hist_violation"].append(gen["hist_violation"] + violation_offset)
+        violation_offset += n
+
+    path = os.path.join(shard_dir, f"shard-{shard_no:05d}.npz")
+    arrays = {f"v_{k}": np.concatenate(v) for k, v in cols.items()}
+    arrays.update({f"b_{k}": np.asarray(v) for k, v in biz.items() if k != "cat_counts"})
+    arrays["b_cat_counts"] = np.vstack(biz["cat_counts"]) if biz["cat_counts"] else np.zeros((0, n_cat), dtype=np.int64)
+    np.savez(path, **arrays)
+    return path
+
+def generate_shards(seed, names, shard_dir, workers=1, shard_size=SHARD_SIZE):
+    """
+    Generates every business into .npz shards under shard_dir and returns the
+    shard paths in business order. Shard contents only depend on the seed and
+    business list, never on the number of workers.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    specs = [
+        (seed, shard_no, start, names[start:start + shard_size], shard_dir)
+        for shard_no, start in enumerate(range(0, len(names), shard_size))
+    ]
+    if workers <= 1:
+        return [_generate_shard(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_generate_shard, specs))
+
+###############################################################################
+# Merging shards into the DB
+###############################################################################
+def _datetime_strings(values, unit="us"):
+    # unit="us" matches SQLAlchemy's SQLite DateTime format; unit="s" matches
+    # what sqlite3 writes for datetimes bound into raw text() inserts
+    out = np.char.replace(np.datetime_as_string(values, unit=unit), "T", " ").astype(object)
+    out[np.isnat(values)] = None
+    return out
+
+def _insert_lookups(names, catalog):
+    """
+    Inserts the lookup tables with fixed ids so encoded columns are identical
+    across runs. Returns the id arrays/maps the violation rows need.
+    """
+    conn = db.session.connection()
+    conn.execute(Category.__table__.insert(), [
+        {"id": i + 1, "name": name} for i, name in enumerate(catalog["categories"])
+    ])
+
+    type_ids = {}
+    type_rows = []
+    for name, code in zip(catalog["type_names"], catalog["type_codes"]):
+        if name not in type_ids:
+            type_ids[name] = len(type_ids) + 1
+            type_rows.append({"id": type_ids[name], "name": name, "code": code})
+    conn.execute(ViolationType.__table__.insert(), type_rows)
+
+    locations = sorted({get_business_info(name)["location"] for name in names})
+    location_ids = {loc: i + 1 for i, loc in enumerate(locations)}
+    conn.execute(Location.__table__.insert(), [
+        {"id": lid, "name": loc} for loc, lid in location_ids.items()
+    ])
+    conn.execute(ViolationStatus.__table__.insert(), [
+        {"id": 1, "name": "Open"}, {"id": 2, "name": "Closed"}
+    ])
+    clear_lookup_caches()
+
+    return {
+        "type_id_by_code": np.array([type_ids[name] for name in catalog["type_names"]], dtype=np.int64),
+        "location_ids": location_ids
+    }
+
+def executemany(sql, rows):
+    """Runs a raw `sql` statement once per row tuple, INSERT_CHUNK rows per batch."""
+    conn = db.session.connection()
+    for i in range(0, len(rows), INSERT_CHUNK):
+        conn.exec_driver_sql(sql, rows[i:i + INSERT_CHUNK])
+
+def merge_shards(shard_paths, names, catalog=VIOLATION_CATALOG):
+    """
+    Loads shards in order into violation, violation_status_history and
+    risk_classification (ids follow business order), then generates each
+    business's extended report against the final global stats.
+    """
+    lookups = _insert_lookups(names, catalog)
+    cat_names = catalog["categories"]
+
+    insert_violation_sql = (
+        "INSERT INTO violation (id, business_name, violation_type_id, category_id, severity, fine, "
+        "timestamp, location_id, month, month_key, resolution_date, corrective_actions, status_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    insert_history_sql = (
+        "INSERT INTO violation_status_history (violation_id, status, notes, updated_at) "
+        "VALUES (?, ?, ?, ?)"
+    )
+
+    next_violation_id = 1
+    biz_pos = 0
+    summaries = []
+    for path in shard_paths:
+        with np.load(path) as shard:
+            counts = shard["b_count"]
+            n_v = int(counts.sum())
+            shard_names = names[biz_pos:biz_pos + counts.size]
+            biz_pos += counts.size
+
+            infos = [get_business_info(name) for name in shard_names]
+            ids = np.arange(next_violation_id, next_violation_id + n_v)
+            types = shard["v_types"]
+            ts_str = _datetime_strings(shard["v_timestamps"])
+            owner = np.repeat(np.arange(counts.size), counts)
+            rows = list(zip(
+                ids.tolist(),
+                [shard_names[i] for i in owner.tolist()],
+                lookups["type_id_by_code"][types].tolist(),
+                (catalog["type_category"][types] + 1).tolist(),
+                catalog["severity"][types].astype(np.int64).tolist(),
+                shard["v_fines"].tolist(),
+                ts_str.tolist(),
+                [lookups["location_ids"][infos[i]["location"]] for i in owner.tolist()],
+                [t[:7] for t in ts_str.tolist()],
+                (shard["v_timestamps"].astype("datetime64[M]").astype(np.int64) + 1970 * 12).tolist(),
+                _datetime_strings(shard["v_resolution"]).tolist(),
+                [""] * n_v,
+                np.where(shard["v_closed"], 2, 1).tolist()
+            ))
+            executemany(insert_violation_sql, rows)
+
+            hist_vid = shard["v_hist_violation"]
+            hist_ts = shard["v_timestamps"][hist_vid] + shard["v_hist_hours"].astype("timedelta64[h]")
+            hist_rows = list(zip(
+                ids[hist_vid].tolist(),
+                [STATUS_STEPS[k][0] for k in shard["v_hist_step"].tolist()],
+                [STATUS_STEPS[k][1] for k in shard["v_hist_step"].tolist()],
+                _datetime_strings(hist_ts, unit="s").tolist()
+            ))
+            executemany(insert_history_sql, hist_rows)
+            next_violation_id += n_v
+
+            last_ts = shard["b_last_ts"].astype(datetime).tolist()
+            for i, name in enumerate(shard_names):
+                summaries.append({
+                    "name": name,
+                    "info": infos[i],
+                    "count": int(counts[i]),
+                    "note": int(shard["b_note"][i]),
+                    "open": int(shard["b_open"][i]),
+                    "cat_counts": shard["b_cat_counts"][i],
+                    "last_ts": last_ts[i],
+                    "final_score": float(shard["b_final_score"][i]),
+                    "weighted": float(shard["b_weighted"][i]),
+                    "frequency": float(shard["b_frequency"][i]),
+                    "total_fines": int(shard["b_total_fines"][i]),
+                    "average_fine": float(shard["b_average_fine"][i])
+                })
+        db.session.commit()
+
+    rc_rows = []
+    for s in summaries:
+        if s["count"] == 0:
+            rc_rows.append({
+                **NO_VIOLATION_SCORES,
+                "business_name": s["name"],
+                "inspection_history": "No violations recorded.",
+                "risk_model_details": "No violations, automatically Low risk.",
+                "description": s["info"]["description"],
+                "location": s["info"]["location"],
+                "business_type": s["info"]["business_type"]
+            })
+            continue
+        rc_rows.append({
+            "business_name": s["name"],
+            "total_violations": s["count"],
+            "total_fines": s["total_fines"],
+            "last_violation_date": s["last_ts"],
+            "risk_level": classify_risk(s["final_score"]),
+            "weighted_risk_score": s["weighted"],
+            "advanced_risk_score": s["final_score"],
+            "industry_risk_factor": determine_industry_label(s["final_score"]),
+            "violation_frequency_score": s["frequency"],
+            "inspection_history": INSPECTION_NOTES[s["note"]],
+            "unpaid_fines": int(s["total_fines"] * 0.25),
+            "average_fine": s["average_fine"],
+            "risk_model_details": None,
+            "description": s["info"]["description"],
+            "location": s["info"]["location"],
+            "business_type": s["info"]["business_type"]
+        })
+
+    # Good companies
+    for gbiz in good_companies:
+        info = get_business_info(gbiz)
+        rc_rows.append({
+            **NO_VIOLATION_SCORES,
+            "business_name": gbiz,
+            "inspection_history": "Explicit good co. w/ zero violations.",
+            "risk_model_details": "No violations found.",
+            "description": info["description"],
+            "location": info["location"],
+            "business_type": info["business_type"]
+        })
+    for i, row in enumerate(rc_rows):
+        row["id"] = i + 1
+        row["scored_as_of"] = SEED_END_DATE
+    for i in range(0, len(rc_rows), INSERT_CHUNK):
+        db.session.execute(RiskClassification.__table__.insert(), rc_rows[i:i + INSERT_CHUNK])
+    db.session.commit()
+
+    # Extended reports, benchmarked against the fully loaded tables
+    global_stats_by_type = {}
+    report_rows = []
+    for s, row in zip(summaries, rc_rows):
+        if s["count"] == 0:
+            continue
+        business_type = s["info"]["business_type"]
+        if business_type not in global_stats_by_type:
+            global_stats_by_type[business_type] = fetch_global_stats(business_type)
+
+        repeated_offenders = [cat_names[c] for c in np.flatnonzero(s["cat_counts"] > 3)]
+        top_idx = np.argsort(-s["cat_counts"], kind="stable")[:3]
+        top_categories = [(cat_names[c], int(s["cat_counts"][c])) for c in top_idx if s["cat_counts"][c] > 0]
+
+        report_rows.append((generate_extended_report(
+            business_name=s["name"],
+            final_score=s["final_score"],
+            risk_level=row["risk_level"],
+            top_categories=top_categories,
+            repeated_offenders=repeated_offenders,
+            total_violations=s["count"],
+            last_violation_date=s["last_ts"],
+            business_type=business_type,
+            global_stats=global_stats_by_type[business_type],
+            open_count=s["open"],
+            closed_count=s["count"] - s["open"]
+        ), row["id"]))
+    executemany("UPDATE risk_classification SET risk_model_details = ? WHERE id = ?", report_rows)
+    db.session.commit()
+
+def seed_db(seed=DEFAULT_SEED, workers=1, num_businesses=None, shard_dir=None):
+    """
+    Drops and rebuilds the database from the synthetic generator.
+      seed:            root seed; the same seed always gives the same dataset
+      workers:         generator processes (does not change the output)
+      num_businesses:  default is the built-in business list; larger values
+                       produce bigger fixtures (see seed_business_names)
+      shard_dir:       keep the generated .npz shards here (default: temp dir)
+    """
     print("🔨 [seed_db] Dropping + Creating the database now...")
+    db.session.execute(text("DROP TABLE IF EXISTS violation_status_history"))
+    db.session.commit()
     db.drop_all()
     db.create_all()
+    clear_lookup_caches()
 
     # ------------------------------------------------------------------------
     # Create a violation_status_history table for multi-step statuses, wrapped in text(...)
@@ -641,273 +1128,34 @@ def seed_db():
     db.session.execute(create_table_sql)
     db.session.commit()
 
-    def insert_violation_status_history(violation_id, timestamps):
-        """
-        Insert multiple departmental statuses for a single violation,
-        picking from a random set. Timestamps should be sorted ascending.
-        """
-        possible_steps = [
-            ("Open", "Violation just created; assigned to local inspector"),
-            ("Pending Payment", "Invoiced business for payment of fines; awaiting response"),
-            ("Assigned to Field Inspector", "Inspector visiting site for detailed check"),
-            ("Legal Review", "Sent case to legal department for compliance check"),
-            ("NOC Required", "Awaiting NOC from relevant authority"),
-            ("Closed", "All requirements fulfilled; violation case closed"),
-            ("Awaiting Documents", "Business asked to provide official documents"),
-            ("Inspection Scheduled", "Follow-up inspection scheduled next week"),
-            ("Escalated to Management", "High priority, manager involvement requested")
-        ]
-        num_steps = random.randint(2, 5)
-        used_steps = random.sample(possible_steps, num_steps)
-
-        sorted_ts = sorted(timestamps)
-        final_ts = []
-        for i in range(num_steps):
-            if i < len(sorted_ts):
-                final_ts.append(sorted_ts[i])
-            else:
-                # fallback if not enough timestamps
-                final_ts.append(sorted_ts[-1] + timedelta(hours=2 * i))
-
-        for i, (step, memo) in enumerate(used_steps):
-            insert_sql = text("""
-            INSERT INTO violation_status_history (violation_id, status, notes, updated_at)
-            VALUES (:vid, :sts, :nts, :upd)
-            """)
-            db.session.execute(insert_sql, {
-                "vid": violation_id,
-                "sts": step,
-                "nts": memo,
-                "upd": final_ts[i]
-            })
-        db.session.commit()
-
-    start_date = datetime(2023, 1, 1)
-    end_date = datetime(2025, 2, 28)
-    total_days = (end_date - start_date).days
-
-    all_businesses = original_business_list + expanded_business_list
-
-    for biz_name in all_businesses:
-        info = get_business_info(biz_name)
-        num_v = get_violation_count()
-
-        if num_v == 0:
-            rc0 = RiskClassification(
-                business_name=biz_name,
-                total_violations=0,
-                total_fines=0,
-                last_violation_date=None,
-                risk_level="Low",
-                weighted_risk_score=0.0,
-                advanced_risk_score=0.0,
-                industry_risk_factor="Low",
-                violation_frequency_score=0.0,
-                inspection_history="No violations recorded.",
-                unpaid_fines=0,
-                average_fine=0.0,
-                risk_model_details="No violations, automatically Low risk.",
-                description=info["description"],
-                location=info["location"],
-                business_type=info["business_type"]
-            )
-            db.session.add(rc0)
-            db.session.commit()
-            continue
-
-        total_fines = 0
-        v_timestamps = []
-        cat_counts = defaultdict(int)
-        severities = []
-
-        violation_records = []
-        recent_types = defaultdict(list)
-
-        open_count = 0
-        closed_count = 0
-
-        for _ in range(num_v):
-            if violation_data:
-                cat_choice = random.choice(list(violation_data.keys()))
-                vio_choice = random.choice(violation_data[cat_choice])
-            else:
-                cat_choice = "General Regulatory Violations"
-                vio_choice = "Failure to provide required documents"
-
-            base_f = compute_fine(cat_choice, vio_choice)
-            offset = random.randint(0, total_days)
-            v_date = start_date + timedelta(days=offset)
-
-            base_sev = violation_type_severity_map.get(vio_choice, 3)
-            # repeated severity logic
-            cutoff_30 = v_date - timedelta(days=30)
-            recent_types[vio_choice] = [ts for ts in recent_types[vio_choice] if ts > cutoff_30]
-            eff_sev = base_sev + len(recent_types[vio_choice])
-            recent_types[vio_choice].append(v_date)
-
-            # time decay
-            months_old = (end_date - v_date).days / 30.0
-            alpha = 0.1
-            decayed_f = base_f * np.exp(-alpha * months_old)
-
-            status = "Open"
-            resolution_date = None
-            if random.random() < 0.2:
-                status = "Closed"
-                resolution_date = v_date + timedelta(days=random.randint(1, 15))
-
-            if status == "Open":
-                open_count += 1
-            else:
-                closed_count += 1
-
-            new_v = Violation(
-                business_name=biz_name,
-                violation_type=vio_choice,
-                category=cat_choice,
-                severity=base_sev,
-                fine=base_f,
-                timestamp=v_date,
-                location=info["location"],
-                month=v_date.strftime("%Y-%m"),
-                resolution_date=resolution_date,
-                corrective_actions="",
-                status=status
-            )
-            db.session.add(new_v)
-
-            total_fines += base_f
-            v_timestamps.append(v_date)
-            cat_counts[cat_choice] += 1
-            severities.append(base_sev)
-
-            days_since = (end_date - v_date).days
-
-            violation_records.append({
-                "category": cat_choice,
-                "base_severity": base_sev,
-                "effective_severity": eff_sev,
-                "fine": base_f,
-                "decayed_fine": decayed_f,
-                "timestamp": v_date,
-                "status": status,
-                "days_since": days_since,
-                "seed_start": start_date
-            })
-
-        db.session.commit()
+    names = seed_business_names(num_businesses)
+    keep_shards = shard_dir is not None
+    shard_dir = shard_dir or tempfile.mkdtemp(prefix="seed-shards-")
+    try:
+        shard_paths = generate_shards(seed, names, shard_dir, workers)
+        merge_shards(shard_paths, names)
+    finally:
+        if not keep_shards:
+            shutil.rmtree(shard_dir, ignore_errors=True)
 
-        last_violation_dt = max(v_timestamps)
-        total_v = num_v
-        avg_fine = total_fines / num_v
-        avg_sev = sum(severities) / len(severities)
-
-        final_score = compute_risk_score_enhanced(violation_records, info["business_type"])
-        rlevel = classify_risk(final_score)
-
-        # old aggregator
-        min_dt = min(v_timestamps)
-        freq_days = (last_violation_dt - min_dt).days if last_violation_dt > min_dt else 1
-        months_in_period = freq_days / 30.0 if freq_days > 0 else 1.0
-        vio_freq = num_v / months_in_period
-        old_agg, old_fr, old_ir, old_tr = compute_aggregated_risk(vio_freq, avg_fine, avg_sev, v_timestamps, 1.0)
-        old_weighted = compute_weighted_risk(num_v, total_fines, vio_freq, avg_sev)
-
-        # repeated categories
-        cutoff60 = last_violation_dt - timedelta(days=60)
-        repeated_set = defaultdict(int)
-        # We'll do repeated categories logic differently, but let's keep it simpler:
-
-        repeated_offenders = []
-        for c_name, c_count in cat_counts.items():
-            if c_count > 3:
-                repeated_offenders.append(c_name)
-
-        # sort top categories by c_count descending
-        top_cat_list = sorted(cat_counts.items(), key=lambda x: x[1], reverse=True)
-        top_categories = top_cat_list[:3]
-
-        # new global stats fetch
-        global_stats = fetch_global_stats(info["business_type"])
-
-        extended_report_text = generate_extended_report(
-            business_name=biz_name,
-            final_score=final_score,
-            risk_level=rlevel,
-            top_categories=top_categories,
-            repeated_offenders=repeated_offenders,
-            total_violations=num_v,
-            last_violation_date=last_violation_dt,
-            business_type=info["business_type"],
-            global_stats=global_stats,
-            open_count=open_count,
-            closed_count=closed_count
-        )
-
-        rc_new = RiskClassification(
-            business_name=biz_name,
-            total_violations=num_v,
-            total_fines=total_fines,
-            last_violation_date=last_violation_dt,
-            risk_level=rlevel,
-            weighted_risk_score=old_weighted,
-            advanced_risk_score=final_score,
-            industry_risk_factor=determine_industry_label(final_score),
-            violation_frequency_score=vio_freq,
-            inspection_history=get_inspection_note(),
-            unpaid_fines=int(total_fines * 0.25),
-            average_fine=avg_fine,
-            risk_model_details=extended_report_text,
-            description=info["description"],
-            location=info["location"],
-            business_type=info["business_type"]
-        )
-        db.session.add(rc_new)
-        db.session.commit()
-
-        # Insert multi-step statuses for each violation
-        vio_list = Violation.query.filter_by(business_name=biz_name).all()
-        for viol_obj in vio_list:
-            # Generate random timestamps for departmental workflow
-            base_ts = viol_obj.timestamp
-            ts_count = random.randint(2, 5)
-            ts_list = []
-            for i in range(ts_count):
-                offset_hours = random.randint(1, 48) * (i + 1)
-                new_t = base_ts + timedelta(hours=offset_hours)
-                ts_list.append(new_t)
-            ts_list.sort()
-
-            insert_violation_status_history(viol_obj.id, ts_list)
-
-    # Good companies
-    for gbiz in good_companies:
-        info = get_business_info(gbiz)
-        rc_good = RiskClassification(
-            business_name=gbiz,
-            total_violations=0,
-            total_fines=0,
-            last_violation_date=None,
-            risk_level="Low",
-            weighted_risk_score=0.0,
-            advanced_risk_score=0.0,
-            industry_risk_factor="Low",
-            violation_frequency_score=0.0,
-            inspection_history="Explicit good co. w/ zero violations.",
-            unpaid_fines=0,
-            average_fine=0.0,
-            risk_model_details="No violations found.",
-            description=info["description"],
-            location=info["location"],
-            business_type=info["business_type"]
-        )
-        db.session.add(rc_good)
-    db.session.commit()
+    # Bulk-built once here; its triggers keep it in sync afterwards
+    rebuild_search_index()
 
     print("\n✅ [seed_db] Seeding completed with advanced logic + extended reports + multi-step statuses!")
     print("-------------------------------------------------------")
 
 if __name__ == "__main__":
-    from models import app
-    with app.app_context():
-        seed_db()
+    import argparse
+    from app import app
+    from profiling import PROFILE_MODES, profile_job
+
+    parser = argparse.ArgumentParser(description="Seed the violations database")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--businesses", type=int, default=None)
+    parser.add_argument("--shard-dir", default=None)
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None)
+    args = parser.parse_args()
+
+    with app.app_context(), profile_job("seed", mode=args.profile, out_dir=app.config['PROFILE_DIR']):
+        seed_db(seed=args.seed, workers=args.workers, num_businesses=args.businesses, shard_dir=args.shard_dir)
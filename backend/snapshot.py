@@ -0,0 +1,298 @@
+##################################################################################
+# snapshot.py
+#
+# Columnar snapshot export for analytics offload. Writes the violation,
+# risk_classification and violation_status_history tables to Parquet:
+#
+#   <out_dir>/snapshot-<YYYYmmdd-HHMMSS>/
+#       manifest.json
+#       violation/month=2024-04/part-0.parquet
+#       violation_status_history/month=2024-04/part-0.parquet
+#       risk_classification/part-0.parquet
+#   <out_dir>/LATEST                      -> name of the newest snapshot
+#
+# Columns are typed (int / float / timestamp[us]); category, violation type,
+# location and status are dictionary-encoded using the lookup tables as the
+# dictionaries, so codes are identical across month partitions.
+#
+# pyarrow is an optional dependency (pip install pyarrow); nothing else in the
+# backend imports this module at startup.
+#
+#   flask --app app snapshot [--out DIR] [--keep 3]
+#   python snapshot.py [--out DIR] [--keep 3]
+##################################################################################
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from models import db, Category, ViolationType, Location, ViolationStatus, month_from_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+    pq = None
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_SNAPSHOT_DIR = os.path.join(BASE_DIR, "instance", "snapshots")
+SNAPSHOT_FORMAT_VERSION = 1
+LATEST_POINTER = "LATEST"
+PARQUET_COMPRESSION = "zstd"
+
+# Low-cardinality text columns of the tables exported generically
+DICTIONARY_COLUMNS = {
+    "risk_classification": {"business_name", "business_type", "location", "risk_level", "advanced_risk_level"},
+    "violation_status_history": {"status"}
+}
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet snapshots need pyarrow: pip install pyarrow")
+
+###############################################################################
+# Column helpers
+###############################################################################
+def _timestamps(values):
+    """SQLite datetime strings (or None) -> timestamp[us] array."""
+    arr = np.array(values, dtype="datetime64[us]")
+    return pa.array(arr, type=pa.timestamp("us"), mask=np.isnat(arr))
+
+def _lookup_dictionary(model):
+    """(sorted ids, names) for a lookup table; position in `ids` is the dictionary code."""
+    rows = db.session.query(model.id, model.name).order_by(model.id).all()
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    return ids, pa.array([r[1] for r in rows], type=pa.string())
+
+def _dictionary_column(id_values, lookup):
+    ids, names = lookup
+    codes = np.searchsorted(ids, np.asarray(id_values, dtype=np.int64)).astype(np.int32)
+    return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), names)
+
+def dictionary_codes(column):
+    """
+    (int codes, names list) for a dictionary-encoded (or plain string) Arrow
+    column, with one dictionary shared across all chunks.
+    """
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    column = column.unify_dictionaries()
+    if column.num_chunks == 0:
+        return np.zeros(0, dtype=np.int64), []
+    dictionary = column.chunk(0).dictionary
+    codes = np.concatenate([
+        chunk.indices.to_numpy(zero_copy_only=False) for chunk in column.chunks
+    ]).astype(np.int64)
+    return codes, dictionary.to_pylist()
+
+def _arrow_type(declared):
+    """Arrow type for a declared SQLite column type (by type affinity)."""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    if "DATE" in declared or "TIME" in declared:
+        return pa.timestamp("us")
+    return pa.string()
+
+def _table_columns(conn, table):
+    """[(name, arrow type)] from the table's declared SQLite column types."""
+    info = conn.exec_driver_sql(f"PRAGMA table_info({table})").fetchall()
+    return [(row[1], _arrow_type(row[2])) for row in info]
+
+def _generic_arrow_table(table_name, columns, rows):
+    dict_cols = DICTIONARY_COLUMNS.get(table_name, set())
+    arrays, fields = [], []
+    for i, (name, arrow_type) in enumerate(columns):
+        values = [row[i] for row in rows]
+        if pa.types.is_timestamp(arrow_type):
+            arr = _timestamps(values)
+        else:
+            arr = pa.array(values, type=arrow_type)
+        if name in dict_cols:
+            arr = arr.dictionary_encode()
+        arrays.append(arr)
+        fields.append(pa.field(name, arr.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def _write_parquet(table, path, dictionary_columns):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(
+        table, path,
+        compression=PARQUET_COMPRESSION,
+        use_dictionary=list(dictionary_columns) or False
+    )
+
+###############################################################################
+# Table exporters
+###############################################################################
+VIOLATION_DICTIONARY_COLUMNS = ("business_name", "violation_type", "category", "location", "status")
+
+def _export_violations(conn, root):
+    lookups = {
+        "violation_type": _lookup_dictionary(ViolationType),
+        "category": _lookup_dictionary(Category),
+        "location": _lookup_dictionary(Location),
+        "status": _lookup_dictionary(ViolationStatus)
+    }
+    # month_key leads an index, so both the listing and each partition are range scans
+    month_keys = [r[0] for r in conn.exec_driver_sql(
+        "SELECT DISTINCT month_key FROM violation ORDER BY month_key"
+    ).fetchall()]
+
+    total = 0
+    for key in month_keys:
+        month = month_from_key(key)
+        rows = conn.exec_driver_sql("""
+            SELECT id, business_name, violation_type_id, category_id, location_id, status_id,
+                   severity, fine, timestamp, resolution_date, corrective_actions
+            FROM violation WHERE month_key = ? ORDER BY id
+        """, (key,)).fetchall()
+        if not rows:
+            continue
+        cols = list(zip(*rows))
+        table = pa.Table.from_pydict({
+            "id": pa.array(cols[0], type=pa.int64()),
+            "business_name": pa.array(cols[1], type=pa.string()).dictionary_encode(),
+            "violation_type": _dictionary_column(cols[2], lookups["violation_type"]),
+            "category": _dictionary_column(cols[3], lookups["category"]),
+            "location": _dictionary_column(cols[4], lookups["location"]),
+            "status": _dictionary_column(cols[5], lookups["status"]),
+            "severity": pa.array(cols[6], type=pa.int8()),
+            "fine": pa.array(cols[7], type=pa.int32()),
+            "timestamp": _timestamps(cols[8]),
+            "resolution_date": _timestamps(cols[9]),
+            "corrective_actions": pa.array(cols[10], type=pa.string())
+        })
+        _write_parquet(table, os.path.join(root, "violation", f"month={month}", "part-0.parquet"),
+                       VIOLATION_DICTIONARY_COLUMNS)
+        total += len(rows)
+    return {"rows": total, "partitions": len(month_keys)}
+
+def _export_status_history(conn, root):
+    table_name = "violation_status_history"
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).first()
+    if not exists:
+        return {"rows": 0, "partitions": 0}
+
+    columns = _table_columns(conn, table_name)
+    names = ", ".join(name for name, _ in columns)
+    months = [r[0] for r in conn.exec_driver_sql(
+        f"SELECT DISTINCT strftime('%Y-%m', updated_at) AS m FROM {table_name} ORDER BY m"
+    ).fetchall()]
+
+    total = 0
+    for month in months:
+        rows = conn.exec_driver_sql(
+            f"SELECT {names} FROM {table_name} WHERE strftime('%Y-%m', updated_at) = ? ORDER BY id",
+            (month,)
+        ).fetchall()
+        table = _generic_arrow_table(table_name, columns, rows)
+        _write_parquet(table, os.path.join(root, table_name, f"month={month}", "part-0.parquet"),
+                       DICTIONARY_COLUMNS[table_name])
+        total += len(rows)
+    return {"rows": total, "partitions": len(months)}
+
+def _export_risk_classification(conn, root):
+    table_name = "risk_classification"
+    columns = _table_columns(conn, table_name)
+    names = ", ".join(name for name, _ in columns)
+    rows = conn.exec_driver_sql(f"SELECT {names} FROM {table_name} ORDER BY id").fetchall()
+    table = _generic_arrow_table(table_name, columns, rows)
+    _write_parquet(table, os.path.join(root, table_name, "part-0.parquet"), DICTIONARY_COLUMNS[table_name])
+    return {"rows": len(rows), "partitions": 1}
+
+###############################################################################
+# Snapshot job
+###############################################################################
+def export_snapshot(out_dir=DEFAULT_SNAPSHOT_DIR, keep=3):
+    """
+    Writes a new snapshot directory under out_dir and points LATEST at it once
+    it is complete, so readers never see a half-written snapshot. Keeps the
+    newest `keep` snapshots. Must run inside an app context.
+    Returns the snapshot path.
+    """
+    require_pyarrow()
+    created = datetime.now()
+    name = f"snapshot-{created.strftime('%Y%m%d-%H%M%S')}"
+    final_dir = os.path.join(out_dir, name)
+    tmp_dir = os.path.join(out_dir, f".{name}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    try:
+        conn = db.session.connection()
+        tables = {
+            "violation": _export_violations(conn, tmp_dir),
+            "violation_status_history": _export_status_history(conn, tmp_dir),
+            "risk_classification": _export_risk_classification(conn, tmp_dir)
+        }
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": created.isoformat(timespec="seconds"),
+            "tables": tables
+        }
+        with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    finally:
+        db.session.rollback()   # read-only; release the connection
+
+    pointer_tmp = os.path.join(out_dir, LATEST_POINTER + ".tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as fh:
+        fh.write(name)
+    os.replace(pointer_tmp, os.path.join(out_dir, LATEST_POINTER))
+
+    snapshots = sorted(d for d in os.listdir(out_dir) if d.startswith("snapshot-"))
+    for old in snapshots[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(out_dir, old), ignore_errors=True)
+    return final_dir
+
+###############################################################################
+# Read path
+###############################################################################
+def resolve_snapshot(path=DEFAULT_SNAPSHOT_DIR):
+    """A snapshot directory, or a snapshots root whose LATEST pointer names one."""
+    if os.path.exists(os.path.join(path, "manifest.json")):
+        return path
+    pointer = os.path.join(path, LATEST_POINTER)
+    if not os.path.exists(pointer):
+        raise FileNotFoundError(f"No snapshot found under {path}")
+    with open(pointer, encoding="utf-8") as fh:
+        return os.path.join(path, fh.read().strip())
+
+def read_manifest(path=DEFAULT_SNAPSHOT_DIR):
+    with open(os.path.join(resolve_snapshot(path), "manifest.json"), encoding="utf-8") as fh:
+        return json.load(fh)
+
+def read_snapshot_table(path, table, columns=None, months=None):
+    """
+    One table of a snapshot as a pyarrow.Table. `months` ("YYYY-MM" strings)
+    prunes month partitions before any file is opened.
+    """
+    require_pyarrow()
+    table_dir = os.path.join(resolve_snapshot(path), table)
+    filters = [("month", "in", list(months))] if months else None
+    return pq.read_table(table_dir, columns=columns, filters=filters, partitioning="hive")
+
+if __name__ == "__main__":
+    import argparse
+    from app import app
+
+    parser = argparse.ArgumentParser(description="Export a Parquet snapshot of the violations database")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--keep", type=int, default=3)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(export_snapshot(args.out or app.config['SNAPSHOT_DIR'], keep=args.keep))
@@ -0,0 +1,31 @@
+// Helpers for `?format=columnar` API responses:
+//   { columns: [...], data: { col: [...] }, dictionaries: { col: [...] } }
+// Dictionary-encoded columns hold indexes into dictionaries[col].
+
+// Decoded values of one column
+export const columnValues = (payload, column) => {
+  const values = payload.data[column] || [];
+  const dictionary = payload.dictionaries && payload.dictionaries[column];
+  if (!dictionary) return values;
+  return values.map((code) => (code === null ? null : dictionary[code]));
+};
+
+// Row count of a columnar payload
+export const rowCount = (payload) => {
+  const first = payload.columns[0];
+  return first === undefined ? 0 : payload.data[first].length;
+};
+
+// Array of row objects, for widgets that still work row by row
+export const fromColumnar = (payload) => {
+  const decoded = payload.columns.map((column) => columnValues(payload, column));
+  const rows = new Array(rowCount(payload));
+  for (let i = 0; i < rows.length; i++) {
+    const row = {};
+    payload.columns.forEach((column, c) => {
+      row[column] = decoded[c][i];
+    });
+    rows[i] = row;
+  }
+  return rows;
+};
@@ -93,21 +93,27 @@ const BusinessOverview = () => {
   }, [businessName, selectedBusiness]);
 
   // ------------------------------------------------------------------------
-  // 4) Filter businesses based on search
+  // 4) Search businesses on the server (ranked full-text /search)
   // ------------------------------------------------------------------------
   useEffect(() => {
-    if (!searchQuery) {
+    if (!searchQuery.trim()) {
       setFilteredBusinesses(businesses);
       setItemsToShow(9); // reset to first "page" of load-more
       return;
     }
-    const lowerQuery = searchQuery.toLowerCase();
-    const filtered = businesses.filter((b) =>
-      b.business_name.toLowerCase().includes(lowerQuery)
-    );
-    setFilteredBusinesses(filtered);
-    setItemsToShow(9); // reset to initial items
-  }, [searchQuery, businesses]);
+    let cancelled = false; // ignore responses for superseded queries
+    axios
+      .get(`${API_URL}/search`, { params: { q: searchQuery, limit: 100 } })
+      .then((resp) => {
+        if (cancelled) return;
+        setFilteredBusinesses(resp.data.items);
+        setItemsToShow(9); // reset to initial items
+      })
+      .catch((err) => console.error("Error searching businesses:", err));
+    return () => {
+      cancelled = true;
+    };
+  }, [API_URL, searchQuery, businesses]);
 
   // ------------------------------------------------------------------------
   // 5) PDF & CSV Download
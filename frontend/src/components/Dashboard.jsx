@@ -1,4 +1,6 @@
-import React from "react";
+import React, { useEffect, useState } from "react";
+import axios from "axios";
+import API_URL from "../config";
 import { Squares2X2Icon } from "@heroicons/react/24/solid";
 import KPIWidgets from "./KPIWidgets";
 import GeoHotspots from "./GeoHotspots";
@@ -7,6 +9,20 @@ import HighRiskBusinesses from "./HighRiskBusinesses";
 import RiskDistributionChart from "./RiskDistributionChart";
 
 const Dashboard = () => {
+  // Every widget renders from one /dashboard/bootstrap response
+  const [bootstrap, setBootstrap] = useState(null);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    axios
+      .get(`${API_URL}/dashboard/bootstrap`)
+      .then((response) => setBootstrap(response.data))
+      .catch((err) => {
+        console.error("Error fetching dashboard:", err);
+        setError("Failed to load dashboard data.");
+      });
+  }, []);
+
   return (
     <div className="bg-neutralBg min-h-screen pt-8 pb-10">
       <div className="container">
@@ -27,32 +43,34 @@ const Dashboard = () => {
           impact, and trend analyses to provide a comprehensive view of business compliance.
         </p>
 
+        {error && <p className="text-center text-high mt-4">{error}</p>}
+
         {/* KPI Widgets Section */}
         <div className="mt-8">
-          <KPIWidgets />
+          <KPIWidgets kpis={bootstrap?.kpis} />
         </div>
 
         {/* Main Dashboard Grid */}
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mt-8">
           {/* High Risk Businesses */}
           <div className="card hover:shadow-xl transform transition-transform hover:scale-105">
-            <HighRiskBusinesses />
+            <HighRiskBusinesses businesses={bootstrap?.high_risk} />
           </div>
 
           {/* Mini Trend Chart */}
           <div className="card hover:shadow-xl transform transition-transform hover:scale-105">
-            <MiniTrendChart />
+            <MiniTrendChart trend={bootstrap?.trend} />
           </div>
 
           {/* Geo Hotspots */}
           <div className="card hover:shadow-xl transform transition-transform hover:scale-105">
-            <GeoHotspots />
+            <GeoHotspots hotspots={bootstrap?.hotspots} />
           </div>
         </div>
 
         {/* Risk Distribution Chart */}
         <div className="mt-8 card hover:shadow-xl transform transition-transform hover:scale-105">
-          <RiskDistributionChart />
+          <RiskDistributionChart distribution={bootstrap?.distribution} />
         </div>
       </div>
     </div>
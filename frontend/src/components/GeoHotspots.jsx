@@ -1,16 +1,7 @@
-import React, { useEffect, useState } from "react";
-import axios from "axios";
+import React from "react";
 
-const GeoHotspots = () => {
-  const [hotspots, setHotspots] = useState([]);
-  const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:5000";
-
-  useEffect(() => {
-    axios
-      .get(`${API_URL}/trends/geo-hotspots`)
-      .then((response) => setHotspots(response.data.slice(0, 5))) // Show top 5
-      .catch((error) => console.error("Error fetching geo-hotspots:", error));
-  }, [API_URL]);
+// `hotspots` comes from /dashboard/bootstrap (top 5 locations)
+const GeoHotspots = ({ hotspots = [] }) => {
 
   return (
     <div className="p-4 bg-white shadow-lg rounded-lg">
@@ -1,24 +1,12 @@
-import React, { useEffect, useState } from "react";
-import axios from "axios";
+import React from "react";
 import { useNavigate } from "react-router-dom";
 
-const HighRiskBusinesses = () => {
-  const [highRisk, setHighRisk] = useState([]);
-  const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:5000";
+// `businesses` comes from /dashboard/bootstrap: the top 3 High-risk
+// businesses, ranked server-side by advanced risk score (as /risk/top?k=3)
+const HighRiskBusinesses = ({ businesses }) => {
+  const highRisk = businesses || [];
   const navigate = useNavigate();
 
-  useEffect(() => {
-    axios.get(`${API_URL}/risk`)
-      .then((response) => {
-        const sortedBusinesses = response.data
-          .filter((business) => business.risk_level === "High")
-          .sort((a, b) => b.total_violations - a.total_violations)
-          .slice(0, 3);
-        setHighRisk(sortedBusinesses);
-      })
-      .catch((error) => console.error("Error fetching high risk businesses:", error));
-  }, [API_URL]);
-
   return (
     <div className="p-4 bg-white shadow-lg rounded-lg">
       {/* Heading: use text-secondary for a subtle, consistent heading style */}
@@ -1,29 +1,15 @@
-import React, { useEffect, useState } from "react";
-import axios from "axios";
+import React from "react";
 // For navigation within React Router
 import { useNavigate } from "react-router-dom";
 
-const KPIWidgets = () => {
-  const [kpiData, setKpiData] = useState({
-    totalViolations: 0,
-    totalFines: 0,
-    highRiskBusinesses: 0,
-  });
-
-  const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:5000";
+// `kpis` comes from /dashboard/bootstrap (totals aggregated in SQL)
+const KPIWidgets = ({ kpis }) => {
   const navigate = useNavigate();
-
-  useEffect(() => {
-    axios.get(`${API_URL}/risk`)
-      .then((response) => {
-        const riskData = response.data;
-        const totalViolations = riskData.reduce((sum, item) => sum + item.total_violations, 0);
-        const totalFines = riskData.reduce((sum, item) => sum + item.total_fines, 0);
-        const highRiskBusinesses = riskData.filter(item => item.risk_level === "High").length;
-        setKpiData({ totalViolations, totalFines, highRiskBusinesses });
-      })
-      .catch(error => console.error("Error fetching KPI data:", error));
-  }, [API_URL]);
+  const kpiData = {
+    totalViolations: kpis ? kpis.total_violations : 0,
+    totalFines: kpis ? kpis.total_fines : 0,
+    highRiskBusinesses: kpis ? kpis.high_risk_businesses : 0,
+  };
 
   return (
     <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
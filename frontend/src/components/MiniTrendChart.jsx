@@ -1,5 +1,4 @@
-import React, { useEffect, useState } from "react";
-import axios from "axios";
+import React from "react";
 import {
   LineChart,
   Line,
@@ -10,37 +9,12 @@ import {
 } from "recharts";
 import { useNavigate } from "react-router-dom";
 
-const MiniTrendChart = () => {
-  const [trendData, setTrendData] = useState([]);
-  const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:5000";
+// `trend` comes from /dashboard/bootstrap: monthly totals for the last 6
+// months, already aggregated and in order
+const MiniTrendChart = ({ trend }) => {
+  const trendData = trend || [];
   const navigate = useNavigate();
 
-  useEffect(() => {
-    axios
-      .get(`${API_URL}/trends/violations`)
-      .then((response) => {
-        const rawData = response.data || [];
-        const monthMap = {};
-
-        // Group and sum total_violations by month
-        rawData.forEach((item) => {
-          const m = item.month;
-          if (!monthMap[m]) {
-            monthMap[m] = { month: m, total_violations: 0 };
-          }
-          monthMap[m].total_violations += item.total_violations;
-        });
-
-        // Convert object to array, sort by month, then grab last 6
-        let aggregated = Object.values(monthMap);
-        aggregated.sort((a, b) => a.month.localeCompare(b.month));
-        const finalData = aggregated.slice(-6);
-
-        setTrendData(finalData);
-      })
-      .catch((error) => console.error("Error fetching trends:", error));
-  }, [API_URL]);
-
   // Handle clicks on the chart or data points
   const handleChartClick = (chartState) => {
     // If user clicks a data point, Recharts will provide activePayload
@@ -11,68 +11,90 @@ const RiskAnalysis = () => {
   // ---------------------------
   const [riskData, setRiskData] = useState([]);
   const [expandedRow, setExpandedRow] = useState(null);
+  const [details, setDetails] = useState({});
 
   // ---------------------------
-  // Sorting & Pagination
+  // Sorting, Search & Pagination (all server-side)
   // ---------------------------
   const [sortField, setSortField] = useState("business_name");
   const [sortOrder, setSortOrder] = useState("asc");
+  const [search, setSearch] = useState("");
+  // The query actually sent, updated once typing pauses
+  const [debouncedSearch, setDebouncedSearch] = useState("");
   const [currentPage, setCurrentPage] = useState(1);
   const [pageSize, setPageSize] = useState(10);
+  const [total, setTotal] = useState(0);
+  // cursors[i] is the `after` value that loads page i + 1 (null for page 1)
+  const [cursors, setCursors] = useState([null]);
 
   const navigate = useNavigate();
   const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:5000";
 
   // ---------------------------
-  // Fetch risk data from /risk
+  // Debounce the search box: one request per pause, not per keystroke
   // ---------------------------
   useEffect(() => {
-    axios
-      .get(`${API_URL}/risk`)
-      .then((response) => setRiskData(response.data))
-      .catch((error) => console.error("Error fetching risk data:", error));
-  }, [API_URL]);
+    const timer = setTimeout(() => {
+      if (search !== debouncedSearch) {
+        setDebouncedSearch(search);
+        resetPaging();
+      }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [search, debouncedSearch]);
 
   // ---------------------------
-  // Sorting Logic
+  // Fetch one page from /risk
   // ---------------------------
-  const sortedData = [...riskData].sort((a, b) => {
-    let valA, valB;
-    if (sortField === "business_name") {
-      valA = a.business_name.toLowerCase();
-      valB = b.business_name.toLowerCase();
-    } else if (sortField === "total_violations") {
-      valA = a.total_violations;
-      valB = b.total_violations;
-    } else if (sortField === "risk_level") {
-      // Map High/Medium/Low to numeric
-      const priority = { High: 3, Medium: 2, Low: 1 };
-      valA = priority[a.risk_level] || 0;
-      valB = priority[b.risk_level] || 0;
-    } else {
-      // Fallback if needed
-      valA = a[sortField];
-      valB = b[sortField];
-    }
+  useEffect(() => {
+    const params = { sort: sortField, order: sortOrder, limit: pageSize };
+    if (debouncedSearch) params.q = debouncedSearch;
+    const after = cursors[currentPage - 1];
+    if (after) params.after = after;
 
-    if (valA < valB) return sortOrder === "asc" ? -1 : 1;
-    if (valA > valB) return sortOrder === "asc" ? 1 : -1;
-    return 0;
-  });
+    let cancelled = false; // ignore responses for superseded queries / pages
+    axios
+      .get(`${API_URL}/risk`, { params })
+      .then((response) => {
+        if (cancelled) return;
+        setRiskData(response.data.items);
+        setTotal(response.data.total);
+        setCursors((prev) => {
+          const next = prev.slice(0, currentPage);
+          next[currentPage] = response.data.next;
+          return next;
+        });
+      })
+      .catch((error) => console.error("Error fetching risk data:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [API_URL, sortField, sortOrder, debouncedSearch, pageSize, currentPage]);
 
-  // ---------------------------
-  // Pagination Logic
-  // ---------------------------
-  const startIndex = (currentPage - 1) * pageSize;
-  const endIndex = startIndex + pageSize;
-  const pagedData = sortedData.slice(startIndex, endIndex);
-  const totalPages = Math.ceil(sortedData.length / pageSize);
+  const resetPaging = () => {
+    setCurrentPage(1);
+    setCursors([null]);
+  };
+
+  const pagedData = riskData;
+  const totalPages = Math.max(Math.ceil(total / pageSize), 1);
 
   // ---------------------------
-  // Row Expansion
+  // Row Expansion (report text is loaded on demand)
   // ---------------------------
   const toggleRow = (bizName) => {
     setExpandedRow(expandedRow === bizName ? null : bizName);
+    if (expandedRow !== bizName && details[bizName] === undefined) {
+      axios
+        .get(`${API_URL}/api/generate_report/${encodeURIComponent(bizName)}`)
+        .then((response) =>
+          setDetails((prev) => ({
+            ...prev,
+            [bizName]: response.data.report_data["Risk Model Details"],
+          }))
+        )
+        .catch((error) => console.error("Error fetching risk details:", error));
+    }
   };
 
   // ---------------------------
@@ -81,7 +103,7 @@ const RiskAnalysis = () => {
   const handleSortColumn = (field, direction) => {
     setSortField(field);
     setSortOrder(direction);
-    setCurrentPage(1);
+    resetPaging();
   };
 
   const renderArrowsForColumn = (field) => {
@@ -135,6 +157,17 @@ const RiskAnalysis = () => {
         principles, and regression‑based forecasting—to derive an aggregated risk score.
       </p>
 
+      {/* Search (business name, matched on the server) */}
+      <div className="flex justify-end mb-4">
+        <input
+          type="text"
+          value={search}
+          onChange={(e) => setSearch(e.target.value)}
+          placeholder="Search businesses..."
+          className="border rounded p-2 text-secondary w-64"
+        />
+      </div>
+
       {/* Table / Data */}
       {pagedData.length === 0 ? (
         <p className="text-center text-secondary-light">
@@ -205,7 +238,7 @@ const RiskAnalysis = () => {
                   {expandedRow === r.business_name && (
                     <tr className="bg-neutralBg">
                       <td colSpan="3" className="border px-4 py-3 text-sm text-secondary">
-                        <strong>Risk Insights:</strong> {r.risk_model_details}
+                        <strong>Risk Insights:</strong> {details[r.business_name] ?? "Loading..."}
                       </td>
                     </tr>
                   )}
@@ -229,8 +262,8 @@ const RiskAnalysis = () => {
           Page {currentPage} of {totalPages}
         </span>
         <button
-          onClick={() => setCurrentPage((prev) => Math.min(prev + 1, totalPages))}
-          disabled={currentPage === totalPages}
+          onClick={() => setCurrentPage((prev) => prev + 1)}
+          disabled={!cursors[currentPage]}
           className="px-3 py-1 bg-gray-300 rounded hover:bg-gray-400 disabled:opacity-50"
         >
           Next
@@ -240,7 +273,7 @@ const RiskAnalysis = () => {
           value={pageSize}
           onChange={(e) => {
             setPageSize(parseInt(e.target.value));
-            setCurrentPage(1);
+            resetPaging();
           }}
           className="ml-4 border rounded p-1 text-secondary"
         >
@@ -1,5 +1,4 @@
-import React, { useEffect, useState } from "react";
-import axios from "axios";
+import React from "react";
 import {
   PieChart,
   Pie,
@@ -37,87 +36,13 @@ const GEO_COLORS = [
 // Helper to get color for a given index in the hotspots array
 const getHotspotColor = (index) => GEO_COLORS[index % GEO_COLORS.length];
 
-const RiskDistributionChart = () => {
-  const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:5000";
-
-  // States
-  const [openClosedData, setOpenClosedData] = useState([]);
-  const [riskDistribution, setRiskDistribution] = useState([]);
-  const [hotspotsData, setHotspotsData] = useState([]);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    // 1) Open vs. Closed
-    axios.get(`${API_URL}/violations`)
-      .then((resp) => {
-        const violations = resp.data;
-        let openCount = 0;
-        let closedCount = 0;
-        violations.forEach((v) => {
-          if (v.status === "Open") openCount++;
-          else if (v.status === "Closed") closedCount++;
-        });
-        setOpenClosedData([
-          { name: "Open", value: openCount },
-          { name: "Closed", value: closedCount }
-        ]);
-      })
-      .catch((err) => {
-        console.error("[RiskDistributionChart] Error fetching violations:", err);
-        setError("Failed to load open/closed data.");
-      });
-
-    // 2) Risk distribution
-    axios.get(`${API_URL}/risk`)
-      .then((response) => {
-        const counts = { High: 0, Medium: 0, Low: 0 };
-        response.data.forEach((item) => {
-          if (counts[item.risk_level] !== undefined) {
-            counts[item.risk_level] += 1;
-          }
-        });
-        const distribution = [
-          { name: "High", value: counts.High },
-          { name: "Medium", value: counts.Medium },
-          { name: "Low", value: counts.Low },
-        ];
-        setRiskDistribution(distribution);
-      })
-      .catch((err) => {
-        console.error("[RiskDistributionChart] Error fetching risk data:", err);
-        setError("Failed to load risk distribution data.");
-      });
-
-    // 3) Geo Hotspots
-    axios.get(`${API_URL}/trends/geo-hotspots`)
-      .then((resp) => {
-        // e.g. [ { location: "Downtown", total_violations: 10 }, ... ]
-        const raw = resp.data || [];
-
-        // Sort descending by total violations
-        const sorted = [...raw].sort((a, b) => b.total_violations - a.total_violations);
-
-        // Take top 3
-        const topThree = sorted.slice(0, 3).map((item) => ({
-          name: item.location,
-          value: item.total_violations
-        }));
-
-        // Sum the remainder into "Other"
-        const remainder = sorted.slice(3);
-        const otherSum = remainder.reduce((acc, item) => acc + item.total_violations, 0);
-
-        let finalData = [...topThree];
-        if (otherSum > 0) {
-          finalData.push({ name: "Other", value: otherSum });
-        }
-        setHotspotsData(finalData);
-      })
-      .catch((err) => {
-        console.error("[RiskDistributionChart] Error fetching geo-hotspots:", err);
-        setError("Failed to load geographic hotspots data.");
-      });
-  }, [API_URL]);
+// `distribution` comes from /dashboard/bootstrap (same shape as /dashboard/distribution):
+// { status: [{ name: "Open", value }, ...], risk_levels: [...],
+//   locations: [top three..., { name: "Other", value }] }
+const RiskDistributionChart = ({ distribution }) => {
+  const openClosedData = distribution ? distribution.status : [];
+  const riskDistribution = distribution ? distribution.risk_levels : [];
+  const hotspotsData = distribution ? distribution.locations : [];
 
   // Sum function
   const sumData = (arr) => arr.reduce((sum, d) => sum + d.value, 0);
@@ -229,7 +154,6 @@ const RiskDistributionChart = () => {
       <h2 className="text-lg font-bold text-primary mb-4 text-center">
         Advanced Analytics
       </h2>
-      {error && <p className="text-center text-high mb-2">{error}</p>}
 
       {/* 3 Pie Charts in a row (stack on mobile) */}
       <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
@@ -13,6 +13,7 @@ import {
   Bar
 } from "recharts";
 import API_URL from "../config";
+import { fromColumnar } from "../columnar";
 import { useNavigate } from "react-router-dom";
 
 // For heading icon consistency (if you want an icon next to the text):
@@ -80,9 +81,11 @@ const ViolationTrends = () => {
             ? `${API_URL}/trends/violations/all`
             : `${API_URL}/trends/violations`;
 
-        const response = await axios.get(endpoint);
-        console.log("[ViolationTrends] fetched trends:", response.data);
-        setTrendData(response.data);
+        // Columnar payloads are a fraction of the size of row objects
+        const response = await axios.get(endpoint, { params: { format: "columnar" } });
+        const rows = fromColumnar(response.data);
+        console.log("[ViolationTrends] fetched trends:", rows.length);
+        setTrendData(rows);
       } catch (error) {
         console.error("[ViolationTrends] error fetching trends:", error);
       }